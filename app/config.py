@@ -1,15 +1,101 @@
 import json
 import os
 
-from web3 import Web3
+from dotenv import load_dotenv
 
-BESU_URL = "http://localhost:8545"
-ETH_SIGNER_URL = "http://localhost:8555"
+load_dotenv()
 
-w3 = Web3(Web3.HTTPProvider(ETH_SIGNER_URL))
 base_dir = os.path.abspath(os.path.dirname(__file__))
 
-assert w3.is_connected(), "Cannot connect to Ethereum Node!"
+BESU_URL = "http://localhost:8545"
+ETH_SIGNER_URL = os.getenv("ETH_SIGNER_URL", "http://localhost:8555")
+
+# Besu RPC endpoints, comma separated. Reads are spread over healthy nodes,
+# writes are pinned to one node per signing account
+BESU_URLS = [
+    url.strip() for url in os.getenv("BESU_URLS", BESU_URL).split(",") if url.strip()
+]
+RPC_PROBE_INTERVAL = float(os.getenv("RPC_PROBE_INTERVAL", "5"))
+RPC_MAX_LATENCY = float(os.getenv("RPC_MAX_LATENCY", "2"))
+RPC_MAX_ERROR_RATE = float(os.getenv("RPC_MAX_ERROR_RATE", "0.5"))
+
+# Connection pool used by the async blockchain client
+RPC_CONNECTION_POOL_SIZE = int(os.getenv("RPC_CONNECTION_POOL_SIZE", "20"))
+RPC_TIMEOUT = float(os.getenv("RPC_TIMEOUT", "30"))
+
+# Page sizes for paginated contract reads
+DEFAULT_PAGE_SIZE = int(os.getenv("DEFAULT_PAGE_SIZE", "100"))
+MAX_PAGE_SIZE = int(os.getenv("MAX_PAGE_SIZE", "500"))
+
+# Chain indexer: mirrors DataStored events into chain_readings and, when
+# enabled, serves sensor data reads from that table instead of the node
+CHAIN_INDEX_ENABLED = os.getenv("CHAIN_INDEX_ENABLED", "false").lower() == "true"
+INDEXER_POLL_INTERVAL = float(os.getenv("INDEXER_POLL_INTERVAL", "2"))
+INDEXER_CONFIRMATIONS = int(os.getenv("INDEXER_CONFIRMATIONS", "0"))
+INDEXER_BLOCK_RANGE = int(os.getenv("INDEXER_BLOCK_RANGE", "1000"))
+INDEXER_START_BLOCK = int(os.getenv("INDEXER_START_BLOCK", "0"))
+
+# Read cache of decoded sensor data, invalidated per farm as new blocks arrive;
+# READ_CACHE_SIZE=0 disables it
+READ_CACHE_SIZE = int(os.getenv("READ_CACHE_SIZE", "1024"))
+BLOCK_POLL_INTERVAL = float(os.getenv("BLOCK_POLL_INTERVAL", "2"))
+
+# Chain vs database reconciliation job; readings newer than the grace period may
+# still be in flight and are left out of the comparison
+RECONCILE_WORKERS = int(os.getenv("RECONCILE_WORKERS", "8"))
+RECONCILE_GRACE_SECONDS = int(os.getenv("RECONCILE_GRACE_SECONDS", "600"))
+# Largest gap between a reading's block timestamp and its report's created_at;
+# each side is matched against this much more of the other one
+RECONCILE_SKEW_SECONDS = int(os.getenv("RECONCILE_SKEW_SECONDS", "300"))
+RECONCILE_SAMPLE_SIZE = int(os.getenv("RECONCILE_SAMPLE_SIZE", "20"))
+
+# Columnar .npz snapshots of sensor history for offline analysis
+SNAPSHOT_DIR = os.getenv("SNAPSHOT_DIR", os.path.join(base_dir, "../data/snapshots"))
+SNAPSHOT_PART_ROWS = int(os.getenv("SNAPSHOT_PART_ROWS", "100000"))
+# Reports younger than this wait for the next snapshot, like ROLLUP_LAG_SECONDS
+SNAPSHOT_LAG_SECONDS = int(os.getenv("SNAPSHOT_LAG_SECONDS", "60"))
+
+# Gas settings for storeData / storeDataBatch transactions
+STORE_DATA_GAS = 3000000
+BATCH_GAS_LIMIT = int(os.getenv("BATCH_GAS_LIMIT", "8000000"))
+BATCH_GAS_PER_READING = int(os.getenv("BATCH_GAS_PER_READING", "150000"))
+
+# Background receipt watcher settings
+RECEIPT_POLL_INTERVAL = float(os.getenv("RECEIPT_POLL_INTERVAL", "2"))
+RECEIPT_TIMEOUT = int(os.getenv("RECEIPT_TIMEOUT", "600"))
+
+# Ingestion mode for POST /api/farm: "direct" writes to the chain in the request,
+# "queue" appends to the durable ingestion queue and acknowledges right away,
+# "merkle" stores readings in farm_reports and anchors batch Merkle roots on-chain
+INGESTION_MODE = os.getenv("INGESTION_MODE", "direct")
+INGESTION_QUEUE_PATH = os.getenv(
+    "INGESTION_QUEUE_PATH", os.path.join(base_dir, "../data/ingestion_queue.db")
+)
+INGESTION_WORKERS = int(os.getenv("INGESTION_WORKERS", "2"))
+INGESTION_BATCH_SIZE = int(os.getenv("INGESTION_BATCH_SIZE", "50"))
+INGESTION_MAX_ATTEMPTS = int(os.getenv("INGESTION_MAX_ATTEMPTS", "10"))
+# Rows per INSERT/commit when writing farm reports in bulk
+REPORT_INSERT_CHUNK_SIZE = int(os.getenv("REPORT_INSERT_CHUNK_SIZE", "5000"))
+
+# farm_reports partition maintenance, monthly partitions on created_at
+REPORT_PARTITION_MONTHS_AHEAD = int(os.getenv("REPORT_PARTITION_MONTHS_AHEAD", "3"))
+# Months of reports kept besides the current one, 0 keeps everything
+REPORT_RETENTION_MONTHS = int(os.getenv("REPORT_RETENTION_MONTHS", "0"))
+# "archive" moves expired partitions into farm_reports_archive_<YYYYMM> tables, "drop" deletes them
+REPORT_RETENTION_ACTION = os.getenv("REPORT_RETENTION_ACTION", "archive")
+
+# Hourly/daily rollups of farm_reports
+ROLLUP_ENABLED = os.getenv("ROLLUP_ENABLED", "true").lower() == "true"
+ROLLUP_POLL_INTERVAL = float(os.getenv("ROLLUP_POLL_INTERVAL", "60"))
+ROLLUP_BATCH_SIZE = int(os.getenv("ROLLUP_BATCH_SIZE", "5000"))
+# Reports younger than this are left for the next run, so a transaction
+# committing late with an older created_at is not skipped past
+ROLLUP_LAG_SECONDS = int(os.getenv("ROLLUP_LAG_SECONDS", "60"))
+
+# Merkle anchoring settings
+ANCHOR_GAS = 200000
+MERKLE_ANCHOR_INTERVAL = float(os.getenv("MERKLE_ANCHOR_INTERVAL", "60"))
+MERKLE_BATCH_SIZE = int(os.getenv("MERKLE_BATCH_SIZE", "1000"))
 
 # Load ABI from IoTStorage.json
 contract_path = os.path.join(base_dir, "../contract/IoTStorage.json")
@@ -17,16 +103,42 @@ with open(contract_path, "r") as f:
     contract_json = json.load(f)
     CONTRACT_ABI = contract_json["contracts"]["IoTStorage.sol"]["IoTStorage"]["abi"]
 
+# Readings are written with bytes32 ids and packed integer fields, an ABI
+# compiled from an older contract would fail on every call
+_store_data_abi = next(
+    (item for item in CONTRACT_ABI if item.get("name") == "storeData"), None
+)
+if not _store_data_abi or [arg["type"] for arg in _store_data_abi["inputs"]] != [
+    "bytes32", "uint32", "uint16", "uint32", "bytes32", "uint32"
+]:
+    raise RuntimeError(
+        f"{contract_path} does not match contract/IoTStorage.sol, "
+        "run contract/compile_contract.py"
+    )
+
 # Load contract_address from contract_address.json
-contract_path = os.path.join(base_dir, "../contract/contract_address.json")
+contract_path = os.getenv(
+    "CONTRACT_ADDRESS_PATH", os.path.join(base_dir, "../contract/contract_address.json")
+)
 with open(contract_path, "r") as f:
     contract_address_json = json.load(f)
     CONTRACT_ADDRESS = contract_address_json["contract_address"]
 
 # Load contract_address from contract_address.json
-account_address_path = os.path.join(base_dir, "../scripts/account_info.json")
+account_address_path = os.getenv(
+    "ACCOUNT_INFO_PATH", os.path.join(base_dir, "../scripts/account_info.json")
+)
 with open(account_address_path, "r") as f:
     account_address_json = json.load(f)
     ACCOUNT_ADDRESS = account_address_json["address"]
     PRIVATE_KEY = account_address_json["private_key"]
     PASSWORD = account_address_json["password"]
+
+# Load the signing account pool from accounts.json (see scripts/new_account.py --count),
+# falling back to the single account above
+accounts_path = os.getenv("ACCOUNTS_PATH", os.path.join(base_dir, "../scripts/accounts.json"))
+if os.path.exists(accounts_path):
+    with open(accounts_path, "r") as f:
+        SIGNER_PRIVATE_KEYS = [account["private_key"] for account in json.load(f)]
+else:
+    SIGNER_PRIVATE_KEYS = [PRIVATE_KEY]
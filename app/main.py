@@ -4,7 +4,9 @@ from fastapi import FastAPI, Request, status
 from fastapi.exceptions import HTTPException
 from fastapi.responses import RedirectResponse
 from fastapi.staticfiles import StaticFiles
+from starlette.concurrency import run_in_threadpool
 
+from app.config import INGESTION_MODE, CHAIN_INDEX_ENABLED, ROLLUP_ENABLED
 from app.routers.admin.admin_routes import router as admin_router
 from app.routers.api_routes import router as api_router
 from app.routers.auth_routes import router as auth_router
@@ -12,7 +14,16 @@ from app.routers.mock_data_api import router as mock_data_router
 from app.routers.qr_routes import router as qr_router
 from app.routers.template_routes import router as template_router
 from app.routers.user_farm_routes import router as user_farm_router
+from app.services.async_blockchain import AsyncBlockchainService
+from app.services.block_tracker import BlockTracker
+from app.services.chain_ids import ChainIdDictionary
+from app.services.chain_indexer import ChainIndexer
 from app.services.database import engine, Base
+from app.services.ingestion_queue import IngestionQueue
+from app.services.merkle_service import MerkleAnchorService
+from app.services.receipt_watcher import ReceiptWatcher
+from app.services.rollup_service import ReportRollupJob
+from app.services.rpc_pool import RpcEndpointPool
 
 # Initialize database tables
 Base.metadata.create_all(bind=engine)
@@ -33,6 +44,39 @@ async def unauthorized_exception_handler(_: Request, exc: HTTPException):
     raise exc
 
 
+@app.on_event("startup")
+async def start_background_services():
+    # Hashed chain ids are then decoded without a database round trip
+    await run_in_threadpool(ChainIdDictionary().load)
+    RpcEndpointPool().start()
+    ReceiptWatcher().start()
+    BlockTracker().start()
+    if INGESTION_MODE == "queue":
+        IngestionQueue().start()
+    if INGESTION_MODE == "merkle":
+        MerkleAnchorService().start()
+    if CHAIN_INDEX_ENABLED:
+        ChainIndexer().start()
+    if ROLLUP_ENABLED:
+        ReportRollupJob().start()
+
+
+@app.on_event("shutdown")
+async def stop_background_services():
+    RpcEndpointPool().stop()
+    ReceiptWatcher().stop()
+    BlockTracker().stop()
+    await AsyncBlockchainService().close()
+    if INGESTION_MODE == "queue":
+        IngestionQueue().stop()
+    if INGESTION_MODE == "merkle":
+        MerkleAnchorService().stop()
+    if CHAIN_INDEX_ENABLED:
+        ChainIndexer().stop()
+    if ROLLUP_ENABLED:
+        ReportRollupJob().stop()
+
+
 # Load environment variables
 load_dotenv()
 
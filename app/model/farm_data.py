@@ -2,6 +2,7 @@ from typing import Optional
 
 from pydantic import BaseModel
 from sqlalchemy import (
+    BigInteger,
     Boolean,
     Column,
     DateTime,
@@ -10,6 +11,7 @@ from sqlalchemy import (
     text,
     Integer,
     ForeignKey,
+    Index,
 )
 from sqlalchemy.orm import relationship
 from sqlalchemy.sql import func
@@ -73,7 +75,145 @@ class FarmReport(Base):
     humidity = Column(Float, nullable=False)
     water_level = Column(Float, nullable=False)
     light_level = Column(Float, nullable=False)
+    # Part of the primary key because the table is partitioned by month on it
+    created_at = Column(
+        DateTime,
+        primary_key=True,
+        nullable=False,
+        server_default=text("CURRENT_TIMESTAMP"),
+    )
+    updated_at = Column(
+        DateTime,
+        server_default=text("CURRENT_TIMESTAMP"),
+        onupdate=func.current_timestamp(),
+    )
+
+    # Reports are still identified by id alone, created_at is filled in by the database
+    __mapper_args__ = {"primary_key": [id]}
+
+    # Reports are looked up by farm, product or both, newest first
+    __table_args__ = (
+        # Unfiltered scans in (created_at, id) order: report pages and rollups
+        Index("ix_farm_reports_created_at", "created_at"),
+        Index("ix_farm_reports_farm_id_created_at", "farm_id", "created_at"),
+        Index("ix_farm_reports_product_id_created_at", "product_id", "created_at"),
+        Index(
+            "ix_farm_reports_farm_id_product_id_created_at",
+            "farm_id",
+            "product_id",
+            "created_at",
+        ),
+    )
+
+
+class MerkleBatch(Base):
+    __tablename__ = "merkle_batches"
+
+    id = Column(Integer, primary_key=True, autoincrement=True)
+    root = Column(String(66), nullable=False)
+    leaf_count = Column(Integer, nullable=False)
+    # Index of the root in the contract's anchors array
+    anchor_id = Column(Integer, nullable=True)
+    tx_hash = Column(String(66), nullable=True)
+    anchored_at = Column(DateTime, nullable=True)
+    created_at = Column(DateTime, server_default=text("CURRENT_TIMESTAMP"))
+    # Leaf and node hashing scheme of the batch, see merkle_service.MERKLE_HASH_VERSION
+    hash_version = Column(Integer, nullable=False, server_default=text("1"))
+
+
+class MerkleLeaf(Base):
+    __tablename__ = "merkle_leaves"
+
+    report_id = Column(String(255), primary_key=True)
+    farm_id = Column(String(255), nullable=False, index=True)
+    leaf_hash = Column(String(66), nullable=False)
+    # Unset until the anchor job puts the leaf into a batch
+    batch_id = Column(Integer, ForeignKey("merkle_batches.id"), nullable=True, index=True)
+    leaf_index = Column(Integer, nullable=True)
+    created_at = Column(DateTime, server_default=text("CURRENT_TIMESTAMP"))
+
+
+class ChainReading(Base):
+    """Sensor reading mirrored from an IoTStorage DataStored event"""
+
+    __tablename__ = "chain_readings"
+
+    # Position of the reading in the contract's farms array
+    index = Column(BigInteger, primary_key=True, autoincrement=False)
+    farm_id = Column(String(255), nullable=False)
+    product_id = Column(String(255), nullable=True)
+    timestamp = Column(BigInteger, nullable=False)
+    temperature = Column(Float, nullable=False)
+    humidity = Column(Integer, nullable=False)
+    water_level = Column(Integer, nullable=False)
+    light_level = Column(Integer, nullable=False)
+    block_number = Column(BigInteger, nullable=False)
+    tx_hash = Column(String(66), nullable=False)
+    log_index = Column(Integer, nullable=False)
+
+    __table_args__ = (
+        Index("ix_chain_readings_farm_id_index", "farm_id", "index"),
+        Index("ix_chain_readings_farm_id_timestamp", "farm_id", "timestamp"),
+    )
+
+
+class ChainIndexCheckpoint(Base):
+    __tablename__ = "chain_index_checkpoints"
+
+    name = Column(String(64), primary_key=True)
+    block_number = Column(BigInteger, nullable=False)
+    updated_at = Column(
+        DateTime,
+        server_default=text("CURRENT_TIMESTAMP"),
+        onupdate=func.current_timestamp(),
+    )
+
+
+class ChainIdentifier(Base):
+    """Off-chain dictionary of ids too long to fit a bytes32 on chain"""
+
+    __tablename__ = "chain_identifiers"
+
+    id_hash = Column(String(66), primary_key=True)
+    value = Column(String(255), nullable=False)
     created_at = Column(DateTime, server_default=text("CURRENT_TIMESTAMP"))
+
+
+class FarmReportRollup(Base):
+    """Aggregates of farm_reports per farm over one hour or one day
+
+    Sums are stored instead of averages so buckets can be merged incrementally.
+    """
+
+    __tablename__ = "farm_report_rollups"
+
+    farm_id = Column(String(255), primary_key=True)
+    # "hour" or "day"
+    granularity = Column(String(8), primary_key=True)
+    bucket_start = Column(DateTime, primary_key=True)
+    count = Column(Integer, nullable=False, default=0)
+    temperature_min = Column(Float, nullable=False)
+    temperature_max = Column(Float, nullable=False)
+    temperature_sum = Column(Float, nullable=False)
+    humidity_min = Column(Float, nullable=False)
+    humidity_max = Column(Float, nullable=False)
+    humidity_sum = Column(Float, nullable=False)
+    water_level_min = Column(Float, nullable=False)
+    water_level_max = Column(Float, nullable=False)
+    water_level_sum = Column(Float, nullable=False)
+    light_level_min = Column(Float, nullable=False)
+    light_level_max = Column(Float, nullable=False)
+    light_level_sum = Column(Float, nullable=False)
+
+
+class RollupWatermark(Base):
+    """Last farm report, by (created_at, id), folded into the rollups"""
+
+    __tablename__ = "rollup_watermarks"
+
+    name = Column(String(64), primary_key=True)
+    created_at = Column(DateTime, nullable=True)
+    report_id = Column(String(255), nullable=True)
     updated_at = Column(
         DateTime,
         server_default=text("CURRENT_TIMESTAMP"),
@@ -2,14 +2,17 @@ from typing import Optional
 from fastapi import APIRouter, Depends, Form, Request, status
 from fastapi.responses import HTMLResponse, RedirectResponse
 from fastapi.templating import Jinja2Templates
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import Session
 
+from app.config import MAX_PAGE_SIZE
 from app.constants.template_constant import ADMIN_ERROR_TEMPLATE
 from app.model.user import User
 from app.model.farm_data import Farm
 from app.services.security import check_admin_role
-from app.services.blockchain import BlockchainService
-from app.services.database import get_db
+from app.services.async_blockchain import AsyncBlockchainService
+from app.services.database import get_async_db, get_db
+from app.services.farm_service import AsyncFarmService
 from datetime import datetime
 
 router = APIRouter(tags=["farm"])
@@ -22,30 +25,22 @@ FARM_MANAGEMENT_TEMPLATE = "pages/admin/farm/farm_management.html";
 FARM_MANAGEMENT_ROUTE = "/admin/farm-management"
 
 
-def _process_farm_data(farm_data):
-    """Helper function to process farm data and return formatted info"""
-    # Sort by timestamp (desc) to get the latest
-    farm_data.sort(key=lambda x: x["timestamp"], reverse=True)
-    latest_data = farm_data[0]
+def _process_farm_summary(summary):
+    """Helper function to format a farm summary for the dashboard"""
+    latest_data = summary["latest"]
 
     # Format the timestamp
-    timestamp = int(latest_data["timestamp"])
-    formatted_time = datetime.fromtimestamp(timestamp).strftime("%Y-%m-%d %H:%M:%S")
-
-    # Get product IDs for this farm
-    product_ids = {
-        data["product_id"]
-        for data in farm_data
-        if "product_id" in data and data["product_id"]
-    }
+    formatted_time = datetime.fromtimestamp(int(summary["last_timestamp"])).strftime(
+        "%Y-%m-%d %H:%M:%S"
+    )
 
     return {
-        "farmId": latest_data["farm_id"],
-        "dataCount": len(farm_data),
+        "farmId": summary["farm_id"],
+        "dataCount": summary["data_count"],
         "lastUpdate": formatted_time,
         "lastTemperature": latest_data.get("temperature", "N/A"),
         "lastHumidity": latest_data.get("humidity", "N/A"),
-        "productIds": list(product_ids),
+        "lastProductId": latest_data.get("product_id", "N/A"),
         "waterLevel": latest_data.get("water_level", "N/A"),
         "lightLevel": latest_data.get("light_level", "N/A"),
     }
@@ -55,32 +50,28 @@ def _process_farm_data(farm_data):
 async def farm_management(
     request: Request,
     current_user: User = Depends(check_admin_role),
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_async_db),
 ):
     """Farm management page - Only admin can access"""
     try:
-        blockchain_service = BlockchainService()
-
-        # Get all blockchain data
-        all_blockchain_data = blockchain_service.get_all_sensor_data()
-        # Group data by farm ID
-        farm_data_map = {}
-        for data in all_blockchain_data:
-            if "farm_id" in data:
-                farm_id = data["farm_id"]
-                farm_data_map.setdefault(farm_id, []).append(data)
-
-        # Process each farm's data
-        all_farms = [
-            _process_farm_data(farm_data)
-            for farm_data in farm_data_map.values()
-            if farm_data
-        ]
+        blockchain_service = AsyncBlockchainService()
+
+        # Page through the contract's per-farm summaries
+        all_farms = []
+        offset = 0
+        while True:
+            page = await blockchain_service.get_farm_summaries(offset, MAX_PAGE_SIZE)
+            if not page:
+                break
+            all_farms.extend(_process_farm_summary(summary) for summary in page["items"])
+            offset += len(page["items"])
+            if not page["items"] or offset >= page["total"]:
+                break
 
         print(f"Found {len(all_farms)} farms with data")
 
         # Get all farms from database
-        db_farms = db.query(Farm).all()
+        db_farms = await AsyncFarmService.get_all_farms(db)
 
         return templates.TemplateResponse(
             FARM_MANAGEMENT_TEMPLATE,
@@ -1,27 +1,48 @@
-from fastapi import APIRouter, Depends, HTTPException, status
+import csv
+import io
+import json
+from datetime import datetime, timedelta
+from typing import Literal, Optional
+
+from fastapi import APIRouter, Depends, HTTPException, Query, Response, status
+from fastapi.responses import JSONResponse, StreamingResponse
 from pydantic import BaseModel
+from starlette.concurrency import run_in_threadpool
+from app.config import INGESTION_MODE, DEFAULT_PAGE_SIZE, MAX_PAGE_SIZE
 from app.services.security import get_optional_user
-from app.services.farm_report_service import FarmReportService
+from app.services.farm_report_service import AsyncFarmReportService
 
 from app.routers.farm_routes import router as farm_api_router
 from app.model.farm_data import FarmData, Farm
 from app.model.user import User
 from app.services.security import get_current_active_user
 from app.utils import generate_random_report_id
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import Session
-from app.services.database import get_db
+from app.services.database import get_async_db, get_db, get_pool_metrics
+from app.services.farm_service import AsyncFarmService
+from app.services.pagination import InvalidCursor
+from app.services.product_service import AsyncProductService
 
 # Initialize API router
 router = APIRouter(prefix="/api", tags=["api"])
 router.include_router(farm_api_router)
 
 # Import necessary services
-from app.services.blockchain import BlockchainService
+from app.services.async_blockchain import AsyncBlockchainService
 from app.services.generate_qr import GenerateQRService
+from app.services.ingestion_queue import IngestionQueue
+from app.services.merkle_service import MerkleService
+from app.services.read_cache import SensorDataCache
+from app.services.reconciliation_service import ReconciliationService
+from app.services.receipt_watcher import ReceiptWatcher
+from app.services.rpc_pool import RpcEndpointPool
+from app.services.snapshot_service import SnapshotService
 
 # Initialize services
-blockchain_service = BlockchainService()
+blockchain_service = AsyncBlockchainService()
 generate_qr_service = GenerateQRService()
+receipt_watcher = ReceiptWatcher()
 
 
 class ContactForm(BaseModel):
@@ -38,20 +59,249 @@ class FarmCreate(BaseModel):
 
 @router.get("/farm/{farm_id}")
 async def get_farm_data(
-    farm_id: str, current_user: User = Depends(get_optional_user)
+    farm_id: str,
+    response: Response,
+    offset: Optional[int] = Query(None, ge=0),
+    limit: int = Query(DEFAULT_PAGE_SIZE, ge=1, le=MAX_PAGE_SIZE),
+    from_ts: Optional[int] = Query(None, alias="from", ge=0),
+    to_ts: Optional[int] = Query(None, alias="to", ge=0),
+    current_user: User = Depends(get_optional_user),
 ):
-    """API returns farm data in JSON format - Requires authentication"""
-    data = blockchain_service.get_sensor_data_by_farm_id(farm_id)
+    """API returns one page of farm data in JSON format - Requires authentication
+
+    Without offset the latest page is returned. from/to (unix seconds, inclusive)
+    restrict the readings to a time range, offset and X-Total-Count then count
+    within that range. The total number of readings is sent in the
+    X-Total-Count header.
+    """
+    if from_ts is not None or to_ts is not None:
+        page = await blockchain_service.get_sensor_data_range(
+            farm_id, from_ts, to_ts, offset, limit
+        )
+    else:
+        page = await blockchain_service.get_sensor_data_page(farm_id, offset, limit)
 
-    if not data:
+    if not page or not page["items"]:
         raise HTTPException(status_code=404, detail=f"No data found for farm {farm_id}")
 
-    return data
+    response.headers["X-Total-Count"] = str(page["total"])
+    response.headers["X-Offset"] = str(page["offset"])
+    return page["items"]
+
+
+EXPORT_COLUMNS = [
+    "timestamp",
+    "farmId",
+    "temperature",
+    "humidity",
+    "waterLevel",
+    "productId",
+    "lightLevel",
+]
+
+
+async def _export_rows(pages, export_format):
+    """Serialize pages of readings into NDJSON lines or CSV rows"""
+    if export_format == "csv":
+        buffer = io.StringIO()
+        writer = csv.DictWriter(buffer, fieldnames=EXPORT_COLUMNS)
+        writer.writeheader()
+        yield buffer.getvalue()
+
+    try:
+        async for items in pages:
+            if export_format == "csv":
+                buffer = io.StringIO()
+                writer = csv.DictWriter(buffer, fieldnames=EXPORT_COLUMNS)
+                writer.writerows(items)
+                yield buffer.getvalue()
+            else:
+                yield "".join(json.dumps(item) + "\n" for item in items)
+    except Exception as e:
+        # Headers are already sent, the truncated body is all we can signal
+        print(f"Error exporting farm data: {str(e)}")
+
+
+@router.get("/farm/{farm_id}/export")
+async def export_farm_data(
+    farm_id: str,
+    fmt: Literal["ndjson", "csv"] = Query("ndjson", alias="format"),
+    current_user: User = Depends(get_optional_user),
+):
+    """API streams a farm's full history as NDJSON or CSV, one contract page at a time"""
+    pages = blockchain_service.iter_sensor_data(farm_id)
+    # Read the first page up front so a missing farm still gets a proper 404
+    try:
+        first_page = await anext(pages)
+    except StopAsyncIteration:
+        raise HTTPException(status_code=404, detail=f"No data found for farm {farm_id}")
+    except RuntimeError as e:
+        await pages.aclose()
+        raise HTTPException(
+            status_code=503,
+            detail=f"Error reading farm data: {str(e)}",
+        )
+
+    async def all_pages():
+        yield first_page
+        async for items in pages:
+            yield items
+
+    media_type = "text/csv" if fmt == "csv" else "application/x-ndjson"
+    return StreamingResponse(
+        _export_rows(all_pages(), fmt),
+        media_type=media_type,
+        headers={
+            "Content-Disposition": f'attachment; filename="{farm_id}.{fmt}"'
+        },
+    )
+
+
+@router.get("/farm/{farm_id}/rollups")
+async def get_farm_rollups(
+    farm_id: str,
+    granularity: Literal["hour", "day"] = "hour",
+    start: Optional[datetime] = None,
+    end: Optional[datetime] = None,
+    db: AsyncSession = Depends(get_async_db),
+    current_user: User = Depends(get_optional_user),
+):
+    """API returns hourly or daily min/max/avg/count of a farm's sensor metrics
+
+    start/end default to the last 30 days and are compared with report
+    created_at, in the database's local time.
+    """
+    # Aware timestamps are converted to local time rather than just losing their offset
+    if start and start.tzinfo:
+        start = start.astimezone().replace(tzinfo=None)
+    if end and end.tzinfo:
+        end = end.astimezone().replace(tzinfo=None)
+    end = end or datetime.now()
+    start = start or end - timedelta(days=30)
+    if start > end:
+        raise HTTPException(status_code=400, detail="start must not be after end")
+
+    rollups = await AsyncFarmReportService.get_rollups(db, farm_id, granularity, start, end)
+    return {
+        "farm_id": farm_id,
+        "granularity": granularity,
+        "start": start.isoformat(),
+        "end": end.isoformat(),
+        "items": rollups,
+    }
+
+
+def _report_dict(report):
+    return {
+        "id": report.id,
+        "farm_id": report.farm_id,
+        "product_id": report.product_id,
+        "temperature": report.temperature,
+        "humidity": report.humidity,
+        "water_level": report.water_level,
+        "light_level": report.light_level,
+        "created_at": report.created_at.isoformat(),
+    }
+
+
+def _farm_dict(farm):
+    return {
+        "id": farm.id,
+        "name": farm.name,
+        "description": farm.description,
+        "user_id": farm.user_id,
+        "is_harvested": farm.is_harvested,
+        "created_at": str(farm.created_at),
+    }
+
+
+def _product_dict(product):
+    return {
+        "id": product.id,
+        "name": product.name,
+        "description": product.description,
+        "is_harvested": product.is_harvested,
+        "created_at": str(product.created_at),
+    }
+
+
+async def _cursor_page(loader, serialize):
+    """Run a cursor page loader and shape its result, a bad cursor is a 400"""
+    try:
+        items, next_cursor = await loader()
+    except InvalidCursor:
+        raise HTTPException(status_code=400, detail="Invalid cursor")
+    return {"items": [serialize(item) for item in items], "next_cursor": next_cursor}
+
+
+@router.get("/reports")
+async def list_reports(
+    farm_id: Optional[str] = None,
+    product_id: Optional[str] = None,
+    cursor: Optional[str] = None,
+    limit: int = Query(DEFAULT_PAGE_SIZE, ge=1, le=MAX_PAGE_SIZE),
+    db: AsyncSession = Depends(get_async_db),
+    current_user: User = Depends(get_current_active_user),
+):
+    """API returns farm reports oldest first, one cursor page at a time
+
+    Pass the next_cursor of a response as cursor to get the following page,
+    next_cursor is null on the last page.
+    """
+    if farm_id and product_id:
+        loader = lambda: AsyncFarmReportService.get_reports_by_farm_and_product_page(
+            db, farm_id, product_id, cursor, limit
+        )
+    elif farm_id:
+        loader = lambda: AsyncFarmReportService.get_reports_by_farm_page(
+            db, farm_id, cursor, limit
+        )
+    elif product_id:
+        loader = lambda: AsyncFarmReportService.get_reports_by_product_page(
+            db, product_id, cursor, limit
+        )
+    else:
+        loader = lambda: AsyncFarmReportService.get_reports_page(db, cursor, limit)
+    return await _cursor_page(loader, _report_dict)
+
+
+@router.get("/farms")
+async def list_farms(
+    cursor: Optional[str] = None,
+    limit: int = Query(DEFAULT_PAGE_SIZE, ge=1, le=MAX_PAGE_SIZE),
+    db: AsyncSession = Depends(get_async_db),
+    current_user: User = Depends(get_current_active_user),
+):
+    """API returns farms ordered by ID, one cursor page at a time"""
+    return await _cursor_page(
+        lambda: AsyncFarmService.get_farms_page(db, cursor, limit), _farm_dict
+    )
+
+
+@router.get("/products")
+async def list_products(
+    is_harvested: Optional[bool] = None,
+    cursor: Optional[str] = None,
+    limit: int = Query(DEFAULT_PAGE_SIZE, ge=1, le=MAX_PAGE_SIZE),
+    db: AsyncSession = Depends(get_async_db),
+    current_user: User = Depends(get_current_active_user),
+):
+    """API returns products ordered by ID, one cursor page at a time"""
+    return await _cursor_page(
+        lambda: AsyncProductService.get_products_page(db, cursor, limit, is_harvested),
+        _product_dict,
+    )
 
 
 @router.post("/farm")
-async def store_farm_data(data: FarmData, db: Session = Depends(get_db)):
-    """API stores sensor data into blockchain - Requires authentication"""
+async def store_farm_data(
+    data: FarmData, wait: bool = True, db: AsyncSession = Depends(get_async_db)
+):
+    """API stores sensor data into blockchain - Requires authentication
+
+    With wait=false the transaction hash is returned as soon as it is broadcast,
+    poll /api/tx/{tx_hash} for its status.
+    """
     try:
         # Prepare data to store into blockchain
         farm_payload = {
@@ -63,14 +313,55 @@ async def store_farm_data(data: FarmData, db: Session = Depends(get_db)):
             "light_level": data.light_level,
         }
         
-        current_farm = db.query(Farm).filter(Farm.id == data.farm_id).first()
+        current_farm = await AsyncFarmService.get_farm(db, data.farm_id)
         if current_farm and current_farm.is_harvested:
             raise HTTPException(status_code=400, detail=f"Farm {data.farm_id} is harvested")
 
+        if INGESTION_MODE == "queue":
+            # Durably queue the reading, workers write it to the chain and database
+            farm_payload["report_id"] = generate_random_report_id()
+            # SQLite write and fsync, kept off the event loop
+            queue_id = await run_in_threadpool(IngestionQueue().enqueue, farm_payload)
+            return JSONResponse(
+                status_code=status.HTTP_202_ACCEPTED,
+                content={
+                    "success": True,
+                    "message": "Data queued",
+                    "queue_id": queue_id,
+                    "farm_id": data.farm_id,
+                },
+            )
+
+        if INGESTION_MODE == "merkle":
+            # Keep the reading off-chain, its batch root is anchored periodically
+            report = await AsyncFarmReportService.create_report(
+                db=db,
+                report_id=generate_random_report_id(),
+                farm_id=data.farm_id,
+                product_id=data.product_id,
+                temperature=data.temperature,
+                humidity=data.humidity,
+                water_level=data.water_level,
+                light_level=data.light_level,
+            )
+            leaf = await MerkleService.add_leaf_async(db, report)
+            return {
+                "success": True,
+                "message": "Data stored, waiting to be anchored",
+                "report_id": report.id,
+                "leaf": leaf.leaf_hash,
+                "farm_id": data.farm_id,
+            }
+
         # Call service to store data
-        tx_hash = blockchain_service.store_sensor_data(
-            farm_payload.get("farm_id"), farm_payload
-        )
+        if wait:
+            tx_hash = await blockchain_service.store_sensor_data(
+                farm_payload.get("farm_id"), farm_payload
+            )
+        else:
+            tx_hash = await blockchain_service.submit_sensor_data(
+                farm_payload.get("farm_id"), farm_payload
+            )
 
         if not tx_hash:
             raise HTTPException(
@@ -78,7 +369,10 @@ async def store_farm_data(data: FarmData, db: Session = Depends(get_db)):
                 detail="Cannot store data into blockchain. Please check connection and try again.",
             )
 
-        FarmReportService.create_report(
+        if not wait:
+            receipt_watcher.track(tx_hash, farm_payload.get("farm_id"))
+
+        await AsyncFarmReportService.create_report(
             db=db,
             report_id=generate_random_report_id(),
             farm_id=data.farm_id,
@@ -92,16 +386,60 @@ async def store_farm_data(data: FarmData, db: Session = Depends(get_db)):
         # Return success with transaction hash
         return {
             "success": True,
-            "message": "Data stored successfully",
+            "message": "Data stored successfully" if wait else "Data submitted",
             "transaction_hash": tx_hash,
+            "status": "mined" if wait else "pending",
             "farm_id": data.farm_id,
         }
 
+    except HTTPException:
+        raise
     except Exception as e:
         # Handle other errors
         raise HTTPException(status_code=500, detail=f"Error storing data: {str(e)}")
 
 
+@router.get("/farm/{farm_id}/proof/{report_id}")
+async def get_report_proof(
+    farm_id: str, report_id: str, db: AsyncSession = Depends(get_async_db)
+):
+    """API returns the Merkle inclusion proof of a report anchored on-chain"""
+    proof = await MerkleService.get_proof_async(db, farm_id, report_id)
+
+    if not proof:
+        raise HTTPException(
+            status_code=404,
+            detail=f"No anchored report {report_id} found for farm {farm_id}",
+        )
+
+    return proof
+
+
+@router.get("/tx/{tx_hash}")
+async def get_transaction_status(tx_hash: str):
+    """API returns the status of a submitted transaction: pending, mined or failed"""
+    status_info = receipt_watcher.get_status(tx_hash)
+
+    if status_info is None:
+        # Not submitted by this process, ask the node directly
+        try:
+            statuses = await blockchain_service.get_transaction_statuses([tx_hash])
+            status_info = statuses.get(tx_hash)
+        except Exception as e:
+            raise HTTPException(
+                status_code=500, detail=f"Error checking transaction: {str(e)}"
+            )
+
+    if not status_info:
+        raise HTTPException(status_code=404, detail=f"Transaction {tx_hash} not found")
+
+    return {
+        "transaction_hash": tx_hash,
+        "status": status_info["status"],
+        "block_number": status_info.get("block_number"),
+    }
+
+
 @router.post("/send-contact")
 async def send_contact_email(contact: ContactForm):
     """API processes sending email from contact form"""
@@ -198,6 +536,120 @@ async def debug_farms(
     return {"success": True, "count": len(farms_data), "farms": farms_data}
 
 
+@router.get("/debug/rpc")
+async def debug_rpc_endpoints(current_user: User = Depends(get_current_active_user)):
+    """API để debug trạng thái các RPC endpoint"""
+    # Kiểm tra quyền admin
+    if current_user.role != "admin":
+        raise HTTPException(
+            status_code=status.HTTP_403_FORBIDDEN, detail="Không có quyền truy cập"
+        )
+
+    return {"success": True, "endpoints": RpcEndpointPool().status()}
+
+
+@router.get("/debug/db-pool")
+async def debug_db_pool(current_user: User = Depends(get_current_active_user)):
+    """API để debug trạng thái pool kết nối database"""
+    # Kiểm tra quyền admin
+    if current_user.role != "admin":
+        raise HTTPException(
+            status_code=status.HTTP_403_FORBIDDEN, detail="Không có quyền truy cập"
+        )
+
+    return {"success": True, "pool": get_pool_metrics()}
+
+
+@router.get("/debug/cache")
+async def debug_read_cache(current_user: User = Depends(get_current_active_user)):
+    """API để debug bộ nhớ đệm dữ liệu cảm biến"""
+    # Kiểm tra quyền admin
+    if current_user.role != "admin":
+        raise HTTPException(
+            status_code=status.HTTP_403_FORBIDDEN, detail="Không có quyền truy cập"
+        )
+
+    return {"success": True, "cache": SensorDataCache().stats()}
+
+
+@router.get("/debug/reconcile")
+async def get_reconciliation_report(current_user: User = Depends(get_current_active_user)):
+    """API trả về kết quả đối soát blockchain và database gần nhất"""
+    # Kiểm tra quyền admin
+    if current_user.role != "admin":
+        raise HTTPException(
+            status_code=status.HTTP_403_FORBIDDEN, detail="Không có quyền truy cập"
+        )
+
+    reconciliation = ReconciliationService()
+    return {
+        "success": True,
+        "running": reconciliation.running,
+        "report": reconciliation.last_report,
+    }
+
+
+@router.post("/debug/reconcile", status_code=status.HTTP_202_ACCEPTED)
+async def start_reconciliation(
+    farm_id: Optional[list[str]] = Query(None),
+    repair: bool = False,
+    current_user: User = Depends(get_current_active_user),
+):
+    """API chạy đối soát blockchain và database trong nền"""
+    # Kiểm tra quyền admin
+    if current_user.role != "admin":
+        raise HTTPException(
+            status_code=status.HTTP_403_FORBIDDEN, detail="Không có quyền truy cập"
+        )
+
+    if not ReconciliationService().start(farm_id, repair):
+        raise HTTPException(
+            status_code=status.HTTP_409_CONFLICT, detail="Reconciliation is already running"
+        )
+    return {"success": True, "running": True}
+
+
+@router.get("/debug/snapshot")
+async def get_snapshot_status(
+    source: Literal["chain", "reports"] = "chain",
+    current_user: User = Depends(get_current_active_user),
+):
+    """API trả về trạng thái snapshot dữ liệu cảm biến"""
+    # Kiểm tra quyền admin
+    if current_user.role != "admin":
+        raise HTTPException(
+            status_code=status.HTTP_403_FORBIDDEN, detail="Không có quyền truy cập"
+        )
+
+    snapshot = SnapshotService()
+    return {
+        "success": True,
+        "running": snapshot.running,
+        "last_result": snapshot.last_result,
+        "manifest": SnapshotService.load_manifest(source),
+    }
+
+
+@router.post("/debug/snapshot", status_code=status.HTTP_202_ACCEPTED)
+async def start_snapshot(
+    source: Literal["chain", "reports"] = "chain",
+    farm_id: Optional[list[str]] = Query(None),
+    current_user: User = Depends(get_current_active_user),
+):
+    """API ghi snapshot dữ liệu cảm biến dạng cột (.npz) trong nền"""
+    # Kiểm tra quyền admin
+    if current_user.role != "admin":
+        raise HTTPException(
+            status_code=status.HTTP_403_FORBIDDEN, detail="Không có quyền truy cập"
+        )
+
+    if not SnapshotService().start(source, farm_id):
+        raise HTTPException(
+            status_code=status.HTTP_409_CONFLICT, detail="A snapshot is already running"
+        )
+    return {"success": True, "running": True}
+
+
 @router.post("/farms/add")
 async def add_farm(
     farm: FarmCreate,
@@ -5,11 +5,13 @@ from fastapi import APIRouter, Depends, HTTPException, status, Response, Request
 from fastapi.responses import HTMLResponse
 from fastapi.security import OAuth2PasswordRequestForm
 from fastapi.templating import Jinja2Templates
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import Session
 
-from app.model.farm_data import Farm, FarmReport
 from app.model.user import User, UserCreate, Token, UserResponse
-from app.services.database import get_db
+from app.services.database import get_async_db, get_db
+from app.services.farm_report_service import AsyncFarmReportService
+from app.services.farm_service import AsyncFarmService
 from app.services.security import (
     get_password_hash,
     authenticate_user,
@@ -89,21 +91,15 @@ def login_for_access_token(
 async def read_users_me(
         request: Request,
         current_user: User = Depends(get_current_active_user),
-        db: Session = Depends(get_db)
+        db: AsyncSession = Depends(get_async_db)
 ):
     """Get current user information with farms"""
-    # Get user's farms using the relationship
-    farms = db.query(Farm).filter(Farm.user_id == current_user.id).all()
-    farm_reports = {}
-
-    # Get latest farm report for each farm
-    for farm in farms:
-        latest_report = db.query(FarmReport).filter(
-            FarmReport.farm_id == farm.id
-        ).order_by(FarmReport.created_at.desc()).first()
-
-        if latest_report:
-            farm_reports[farm.id] = latest_report
+    farms = await AsyncFarmService.get_farms_by_user(db, current_user.id)
+
+    # Latest report of every farm in one query
+    farm_reports = await AsyncFarmReportService.get_latest_reports(
+        db, [farm.id for farm in farms]
+    )
 
     # Render template with user and farm data
     return templates.TemplateResponse(
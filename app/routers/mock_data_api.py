@@ -49,10 +49,14 @@ async def generate_mock_data(request: MockDataRequest, db: Session = Depends(get
             status_code=400, detail="Cannot generate more than 100 records at once"
         )
 
-    results = []
-    errors = []
+    current_farm = db.query(Farm).filter(Farm.id == request.farm_id).first()
+    if current_farm and current_farm.is_harvested:
+        raise HTTPException(
+            status_code=400, detail=f"Farm {request.farm_id} is harvested"
+        )
 
-    for i in range(request.count):
+    payloads = []
+    for _ in range(request.count):
         # Generate random data within specified ranges
         mock_data = FarmData(
             farm_id=request.farm_id,
@@ -66,45 +70,63 @@ async def generate_mock_data(request: MockDataRequest, db: Session = Depends(get
         )
 
         # Prepare payload for blockchain
-        farm_payload = {
-            "temperature": mock_data.temperature,
-            "farm_id": mock_data.farm_id,
-            "humidity": mock_data.humidity,
-            "water_level": mock_data.water_level,
-            "product_id": mock_data.product_id,
-            "light_level": mock_data.light_level,
-        }
+        payloads.append(
+            {
+                "temperature": mock_data.temperature,
+                "farm_id": mock_data.farm_id,
+                "humidity": mock_data.humidity,
+                "water_level": mock_data.water_level,
+                "product_id": mock_data.product_id,
+                "light_level": mock_data.light_level,
+            }
+        )
 
-        try:
-            current_farm = db.query(Farm).filter(Farm.id == mock_data.farm_id).first()
-            if current_farm and current_farm.is_harvested:
-                raise HTTPException(
-                    status_code=400, detail=f"Farm {mock_data.farm_id} is harvested"
-                )
-            # Call service to store data
-            tx_hash = blockchain_service.store_sensor_data(
-                mock_data.farm_id, farm_payload
-            )
+    # Store all readings through the batch path
+    batch_results = blockchain_service.store_sensor_data_batch(payloads)
 
-            FarmReportService.create_report(
-                db=db,
-                report_id=generate_random_product_id(),
-                farm_id=mock_data.farm_id,
-                product_id=mock_data.product_id,
-                temperature=mock_data.temperature,
-                humidity=mock_data.humidity,
-                water_level=mock_data.water_level,
-                light_level=mock_data.light_level,
-            )
+    results = []
+    errors = []
+    report_rows = []
+    stored = []
+    for i, (farm_payload, batch_result) in enumerate(zip(payloads, batch_results)):
+        if not batch_result["success"]:
+            errors.append(f"Failed to store data batch {i + 1}")
+            continue
+
+        stored.append(i)
+        report_rows.append(
+            {
+                "id": generate_random_product_id(),
+                "farm_id": farm_payload["farm_id"],
+                "product_id": farm_payload["product_id"],
+                "temperature": farm_payload["temperature"],
+                "humidity": farm_payload["humidity"],
+                "water_level": farm_payload["water_level"],
+                "light_level": farm_payload["light_level"],
+            }
+        )
+        results.append(
+            {
+                "success": True,
+                "data": farm_payload,
+                "transaction_hash": batch_result["transaction_hash"],
+            }
+        )
 
-            if tx_hash:
-                results.append(
-                    {"success": True, "data": farm_payload, "transaction_hash": tx_hash}
-                )
-            else:
-                errors.append(f"Failed to store data batch {i + 1}")
-        except Exception as e:
-            errors.append(f"Error in batch {i + 1}: {str(e)}")
+    # One insert and commit for every report of the batch
+    try:
+        FarmReportService.create_reports_bulk(db, report_rows)
+    except Exception as e:
+        db.rollback()
+        print(f"Bulk report insert failed, retrying one by one: {str(e)}")
+        # The readings are on chain either way, only the failing reports are reported
+        for i, row, result in zip(stored, report_rows, results):
+            try:
+                FarmReportService.create_reports_bulk(db, [row])
+            except Exception as e:
+                db.rollback()
+                result["db_error"] = str(e)
+                errors.append(f"Error saving report {i + 1}: {str(e)}")
 
     # Return result summary
     return {
@@ -127,12 +149,9 @@ async def generate_bulk_mock_data(
             status_code=400, detail="Cannot process more than 100 records at once"
         )
 
-    results = []
-    errors = []
-
-    for i, data in enumerate(request):
-        # Prepare payload for blockchain
-        farm_payload = {
+    # Prepare payloads for blockchain
+    payloads = [
+        {
             "temperature": data.temperature,
             "farm_id": data.farm_id,
             "humidity": data.humidity,
@@ -140,19 +159,27 @@ async def generate_bulk_mock_data(
             "product_id": data.product_id,
             "light_level": data.light_level,
         }
+        for data in request
+    ]
 
-        try:
-            # Call service to store data
-            tx_hash = blockchain_service.store_sensor_data(data.farm_id, farm_payload)
-
-            if tx_hash:
-                results.append(
-                    {"success": True, "data": farm_payload, "transaction_hash": tx_hash}
-                )
-            else:
-                errors.append(f"Failed to store data item {i + 1}")
-        except Exception as e:
-            errors.append(f"Error in item {i + 1}: {str(e)}")
+    # Store all readings through the batch path
+    batch_results = blockchain_service.store_sensor_data_batch(payloads)
+
+    results = []
+    errors = []
+    for i, (farm_payload, batch_result) in enumerate(zip(payloads, batch_results)):
+        if batch_result["success"]:
+            results.append(
+                {
+                    "success": True,
+                    "data": farm_payload,
+                    "transaction_hash": batch_result["transaction_hash"],
+                }
+            )
+        else:
+            errors.append(
+                f"Failed to store data item {i + 1}: {batch_result.get('error', '')}"
+            )
 
     # Return result summary
     return {
@@ -4,6 +4,7 @@ from fastapi.templating import Jinja2Templates
 
 from app.constants.template_constant import LOGIN_TEMPLATE, REGISTER_TEMPLATE, ERROR_TEMPLATE, FARM_DATA_TEMPLATE, \
     HOME_TEMPLATE
+from app.config import MAX_PAGE_SIZE
 from app.model.user import User
 from app.services.security import get_optional_user
 
@@ -39,12 +40,13 @@ async def farm_data(
 ):
     """Display farm information by device_id - Requires authentication"""
     # Import here to avoid circular import
-    from app.services.blockchain import BlockchainService
+    from app.services.async_blockchain import AsyncBlockchainService
 
-    blockchain_service = BlockchainService()
+    blockchain_service = AsyncBlockchainService()
 
-    # Get data from blockchain
-    data = blockchain_service.get_sensor_data_by_farm_id(farm_id)
+    # Get the latest page of data from blockchain
+    page = await blockchain_service.get_sensor_data_page(farm_id, None, MAX_PAGE_SIZE)
+    data = page["items"] if page else None
 
     if not data:
         return templates.TemplateResponse(
@@ -64,5 +66,6 @@ async def farm_data(
             "current_user": current_user,
             "farm_id": farm_id,
             "data": data,
+            "total_count": page["total"],
         },
     )
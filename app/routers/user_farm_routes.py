@@ -3,11 +3,14 @@ import os
 from fastapi import APIRouter, Depends, HTTPException, Request, status, Form
 from fastapi.responses import RedirectResponse, HTMLResponse
 from fastapi.templating import Jinja2Templates
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import Session
 
-from app.model.farm_data import Farm, Product
+from app.model.farm_data import Farm
 from app.model.user import User
-from app.services.database import get_db
+from app.services.database import get_async_db, get_db
+from app.services.farm_service import AsyncFarmService
+from app.services.product_service import AsyncProductService
 from app.services.security import get_current_active_user
 
 router = APIRouter(prefix="/user-farms", tags=["user-farms"])
@@ -91,19 +94,19 @@ async def unlink_farm(
 async def my_farms(
         request: Request,
         current_user: User = Depends(get_current_active_user),
-        db: Session = Depends(get_db),
+        db: AsyncSession = Depends(get_async_db),
 ):
     """View all farms linked to the current user"""
     # Get user's farms
-    user_farms = db.query(Farm).filter(Farm.user_id == current_user.id).all()
+    user_farms = await AsyncFarmService.get_farms_by_user(db, current_user.id)
 
-    # For each farm, get product info to determine if harvested
+    # Products of all farms in one query, to determine if harvested
+    products = await AsyncProductService.get_products_by_ids(
+        db, [farm.id for farm in user_farms]
+    )
+    harvested = {product.id: product.is_harvested for product in products}
     for farm in user_farms:
-        product = db.query(Product).filter(Product.id == farm.id).first()
-        if product:
-            setattr(farm, "is_harvested", product.is_harvested)
-        else:
-            setattr(farm, "is_harvested", False)
+        setattr(farm, "is_harvested", harvested.get(farm.id, False))
 
     return templates.TemplateResponse(
         "my_farms.html",
@@ -0,0 +1,475 @@
+import asyncio
+import time
+
+import aiohttp
+from starlette.concurrency import run_in_threadpool
+from web3 import AsyncWeb3
+from web3.exceptions import ContractLogicError
+
+from app.config import (
+    CONTRACT_ABI,
+    CONTRACT_ADDRESS,
+    SIGNER_PRIVATE_KEYS,
+    STORE_DATA_GAS,
+    RPC_CONNECTION_POOL_SIZE,
+    RPC_TIMEOUT,
+    DEFAULT_PAGE_SIZE,
+    MAX_PAGE_SIZE,
+    CHAIN_INDEX_ENABLED,
+)
+from app.services.blockchain import (
+    MAX_TIMESTAMP,
+    encode_reading,
+    format_farm_data,
+    format_all_data,
+    format_farm_summaries,
+    format_latest_pages,
+)
+from app.services.chain_ids import encode_id
+from app.services.chain_index_service import (
+    INDEX_UNAVAILABLE,
+    ChainIndexService,
+    read_chain_index,
+)
+from app.services.read_cache import SensorDataCache
+from app.services.rpc_pool import RpcEndpointPool
+from app.services.signer_pool import SignerPool
+
+
+class AsyncBlockchainService:
+    """AsyncWeb3 counterpart of BlockchainService for use inside async route handlers"""
+
+    _instance = None
+
+    def __new__(cls):
+        if cls._instance is None:
+            cls._instance = super(AsyncBlockchainService, cls).__new__(cls)
+            cls._instance.initialized = False
+            cls._instance._init_lock = None
+            cls._instance.session = None
+        return cls._instance
+
+    async def initialize(self):
+        """Initialize blockchain connection on a pooled aiohttp session"""
+        if self.initialized:
+            return
+        if self._init_lock is None:
+            self._init_lock = asyncio.Lock()
+
+        async with self._init_lock:
+            if self.initialized:
+                return
+            try:
+                self.session = aiohttp.ClientSession(
+                    connector=aiohttp.TCPConnector(limit=RPC_CONNECTION_POOL_SIZE),
+                    timeout=aiohttp.ClientTimeout(total=RPC_TIMEOUT),
+                )
+                # One AsyncWeb3 client per RPC endpoint, all sharing the session;
+                # endpoint health is tracked by the shared RpcEndpointPool
+                self.rpc_pool = RpcEndpointPool()
+                self.clients = {}
+                for endpoint in self.rpc_pool.endpoints:
+                    provider = AsyncWeb3.AsyncHTTPProvider(endpoint.url)
+                    await provider.cache_async_session(self.session)
+                    self.clients[endpoint.url] = AsyncWeb3(provider)
+                primary_url = self.rpc_pool.read_endpoint().url
+                self.web3 = self.clients[primary_url]
+
+                if not await self.web3.is_connected():
+                    print("Cannot connect to blockchain")
+                    await self.session.close()
+                    return
+
+                # Create signing accounts, nonce lanes are shared with the sync service
+                self.signer_pool = SignerPool(SIGNER_PRIVATE_KEYS)
+                self.account = self.signer_pool.default_account
+                self.chain_id = await self.web3.eth.chain_id
+
+                # Initialize contract, one instance per endpoint
+                self.contracts = {
+                    url: client.eth.contract(
+                        address=client.to_checksum_address(CONTRACT_ADDRESS),
+                        abi=CONTRACT_ABI,
+                    )
+                    for url, client in self.clients.items()
+                }
+                self.contract = self.contracts[primary_url]
+
+                print(f"Connected to blockchain (async), account address: {self.account.address}")
+                self.initialized = True
+
+            except Exception as e:
+                print(f"Error initializing async blockchain: {str(e)}")
+                if self.session:
+                    await self.session.close()
+                self.initialized = False
+
+    async def close(self):
+        """Close the pooled HTTP session"""
+        if self.session and not self.session.closed:
+            await self.session.close()
+        self.initialized = False
+
+    def _read_client(self):
+        """Return the AsyncWeb3 client of the next healthy endpoint"""
+        return self.clients[self.rpc_pool.read_endpoint().url]
+
+    async def _call_view(self, function_name, *args):
+        """Run a contract view on a healthy node, failing over to the next one on error"""
+        last_error = None
+        for endpoint in self.rpc_pool.read_endpoints():
+            contract = self.contracts[endpoint.url]
+            start = time.perf_counter()
+            try:
+                result = await getattr(contract.functions, function_name)(*args).call()
+                endpoint.record(True, time.perf_counter() - start)
+                return result
+            except ContractLogicError:
+                # The node answered, the call itself reverted
+                endpoint.record(True, time.perf_counter() - start)
+                raise
+            except Exception as e:
+                endpoint.record(False)
+                last_error = e
+        raise last_error
+
+    async def submit_sensor_data(self, farm_id, data):
+        """Sign and broadcast sensor data without waiting for it to be mined"""
+        await self.initialize()
+        if not self.initialized:
+            print("Blockchain not initialized")
+            return None
+
+        try:
+            # Encoding may register a hashed id in the database
+            args = await run_in_threadpool(encode_reading, farm_id, data)
+            stored_func = self.contract.functions.storeData(*args)
+            tx_hash = await self._send_transaction(
+                stored_func, STORE_DATA_GAS, self.signer_pool.account_for(farm_id)
+            )
+            return self.web3.to_hex(tx_hash)
+
+        except Exception as e:
+            print(f"Error storing data into blockchain: {str(e)}")
+            return None
+
+    async def store_sensor_data(self, farm_id, data):
+        """Store sensor data into blockchain and wait for the receipt"""
+        tx_hash = await self.submit_sensor_data(farm_id, data)
+        if not tx_hash:
+            return None
+
+        try:
+            tx_receipt = await self._read_client().eth.wait_for_transaction_receipt(tx_hash)
+            SensorDataCache().invalidate_farm(farm_id)
+            return self.web3.to_hex(tx_receipt.transactionHash)
+
+        except Exception as e:
+            print(f"Error waiting for transaction {tx_hash}: {str(e)}")
+            return None
+
+    async def get_transaction_statuses(self, tx_hashes):
+        """Look up receipts for many transactions in one JSON-RPC batch request
+
+        Transactions the node does not know are missing from the result.
+        """
+        await self.initialize()
+        statuses = {}
+        if not self.initialized or not tx_hashes:
+            return statuses
+
+        # The transaction itself is fetched along with its receipt, to tell a
+        # pending transaction from one the node has never seen
+        responses = await self._read_client().provider.make_batch_request(
+            [
+                request
+                for tx_hash in tx_hashes
+                for request in (
+                    ("eth_getTransactionReceipt", [tx_hash]),
+                    ("eth_getTransactionByHash", [tx_hash]),
+                )
+            ]
+        )
+        if isinstance(responses, dict):
+            raise ValueError(f"Batch receipt request failed: {responses.get('error')}")
+        for tx_hash, receipt_response, tx_response in zip(
+            tx_hashes, responses[::2], responses[1::2]
+        ):
+            receipt = receipt_response.get("result")
+            if not receipt:
+                if tx_response.get("result"):
+                    statuses[tx_hash] = {"status": "pending", "block_number": None}
+                # Unknown transactions are left out
+                continue
+            statuses[tx_hash] = {
+                "status": "mined" if int(receipt["status"], 16) == 1 else "failed",
+                "block_number": int(receipt["blockNumber"], 16),
+            }
+        return statuses
+
+    async def _send_transaction(self, contract_func, gas, account=None):
+        """Build, sign and send a contract transaction using a locally allocated nonce"""
+        account = account or self.account
+        nonce_manager = self.signer_pool.nonce_manager(account)
+        # Keep each account on one node so its nonces reach a single txpool in order
+        endpoint = self.rpc_pool.write_endpoint(account.address)
+        client = self.clients[endpoint.url]
+        start = time.perf_counter()
+        nonce = await nonce_manager.allocate_async(client)
+        try:
+            transaction = await contract_func.build_transaction(
+                {
+                    "from": account.address,
+                    "nonce": nonce,
+                    "gas": gas,
+                    "gasPrice": self.web3.to_wei("0", "gwei"),
+                    "chainId": self.chain_id,
+                }
+            )
+            signed_tx = account.sign_transaction(transaction)
+            tx_hash = await client.eth.send_raw_transaction(signed_tx.raw_transaction)
+            endpoint.record(True, time.perf_counter() - start)
+            return tx_hash
+        except Exception:
+            endpoint.record(False)
+            # The reserved nonce may now be a gap, re-read it from the node next time
+            nonce_manager.resync()
+            raise
+        finally:
+            nonce_manager.release()
+
+    async def get_sensor_data_by_farm_id(self, farm_id):
+        """Get sensor data from blockchain by farm_id, through the read cache"""
+        return await SensorDataCache().get_or_load_async(
+            ("farm", farm_id), lambda: self._load_sensor_data_by_farm_id(farm_id)
+        )
+
+    async def _load_sensor_data_by_farm_id(self, farm_id):
+        if CHAIN_INDEX_ENABLED:
+            indexed = await run_in_threadpool(
+                read_chain_index, ChainIndexService.get_readings_by_farm, farm_id
+            )
+            if indexed is not INDEX_UNAVAILABLE:
+                return indexed or None
+
+        await self.initialize()
+        if not self.initialized:
+            print("Blockchain not initialized")
+            return None
+
+        try:
+            raw_data = await self._call_view("getDataByFarmId", encode_id(farm_id))
+            if not raw_data:
+                print(f"No data found for farm {farm_id}")
+                return None
+
+            return await run_in_threadpool(format_farm_data, raw_data)
+
+        except Exception as e:
+            print(f"Error getting data from blockchain: {str(e)}")
+            return None
+
+    async def get_all_sensor_data(self):
+        """Get all sensor data from blockchain, through the read cache"""
+        return await SensorDataCache().get_or_load_async(
+            ("all", None), self._load_all_sensor_data
+        )
+
+    async def _load_all_sensor_data(self):
+        if CHAIN_INDEX_ENABLED:
+            indexed = await run_in_threadpool(read_chain_index, ChainIndexService.get_all_readings)
+            if indexed is not INDEX_UNAVAILABLE:
+                return indexed or None
+
+        await self.initialize()
+        if not self.initialized:
+            print("Blockchain not initialized")
+            return None
+
+        try:
+            raw_data = await self._call_view("getAllData")
+            if not raw_data:
+                print("No data found")
+                return None
+
+            return await run_in_threadpool(format_all_data, raw_data)
+        except Exception as e:
+            print(f"Error getting all data from blockchain: {str(e)}")
+            return None
+
+    async def get_sensor_data_page(self, farm_id, offset=None, limit=DEFAULT_PAGE_SIZE):
+        """Get one page of a farm's sensor data, the latest page when offset is None"""
+        limit = max(1, min(limit, MAX_PAGE_SIZE))
+        return await SensorDataCache().get_or_load_async(
+            ("page", farm_id, offset, limit),
+            lambda: self._load_sensor_data_page(farm_id, offset, limit),
+        )
+
+    async def _load_sensor_data_page(self, farm_id, offset, limit):
+        if CHAIN_INDEX_ENABLED:
+            indexed = await run_in_threadpool(
+                read_chain_index, ChainIndexService.get_readings_page, farm_id, offset, limit
+            )
+            if indexed is not INDEX_UNAVAILABLE:
+                return indexed
+
+        await self.initialize()
+        if not self.initialized:
+            print("Blockchain not initialized")
+            return None
+
+        try:
+            if offset is None:
+                total = await self._call_view("getDataCountByFarmId", encode_id(farm_id))
+                offset = max(0, total - limit)
+            raw_data, total = await self._call_view(
+                "getDataByFarmIdPaged", encode_id(farm_id), offset, limit
+            )
+
+            return {
+                "items": await run_in_threadpool(format_farm_data, raw_data),
+                "total": total,
+                "offset": offset,
+                "limit": limit,
+            }
+
+        except Exception as e:
+            print(f"Error getting data page from blockchain: {str(e)}")
+            return None
+
+    async def get_farm_summaries(self, offset=0, limit=DEFAULT_PAGE_SIZE):
+        """Get one page of per-farm summaries (count, first/last timestamp, latest reading)"""
+        limit = max(1, min(limit, MAX_PAGE_SIZE))
+        return await SensorDataCache().get_or_load_async(
+            ("summaries", None, offset, limit),
+            lambda: self._load_farm_summaries(offset, limit),
+        )
+
+    async def _load_farm_summaries(self, offset, limit):
+        if CHAIN_INDEX_ENABLED:
+            indexed = await run_in_threadpool(
+                read_chain_index, ChainIndexService.get_farm_summaries, offset, limit
+            )
+            if indexed is not INDEX_UNAVAILABLE:
+                return indexed
+
+        await self.initialize()
+        if not self.initialized:
+            print("Blockchain not initialized")
+            return None
+
+        try:
+            raw_data, total = await self._call_view("getFarmSummaries", offset, limit)
+            return {
+                "items": await run_in_threadpool(format_farm_summaries, raw_data),
+                "total": total,
+                "offset": offset,
+                "limit": limit,
+            }
+
+        except Exception as e:
+            print(f"Error getting farm summaries from blockchain: {str(e)}")
+            return None
+
+    async def get_sensor_data_for_farms(self, farm_ids, limit=DEFAULT_PAGE_SIZE):
+        """Get the latest page of sensor data of many farms in one contract call"""
+        limit = max(1, min(limit, MAX_PAGE_SIZE))
+        keys = {farm_id: ("page", farm_id, None, limit) for farm_id in farm_ids}
+        return await SensorDataCache().get_or_load_many_async(
+            keys, lambda missing: self._load_sensor_data_for_farms(missing, limit)
+        )
+
+    async def _load_sensor_data_for_farms(self, farm_ids, limit):
+        if CHAIN_INDEX_ENABLED:
+            indexed = await run_in_threadpool(
+                read_chain_index, ChainIndexService.get_latest_pages, farm_ids, limit
+            )
+            if indexed is not INDEX_UNAVAILABLE:
+                return indexed
+
+        await self.initialize()
+        if not self.initialized:
+            print("Blockchain not initialized")
+            return None
+
+        try:
+            pages, totals = await self._call_view(
+                "getLatestDataByFarmIds", [encode_id(farm_id) for farm_id in farm_ids], limit
+            )
+            return await run_in_threadpool(
+                format_latest_pages, farm_ids, pages, totals, limit
+            )
+
+        except Exception as e:
+            print(f"Error getting data of several farms from blockchain: {str(e)}")
+            return None
+
+    async def get_sensor_data_range(
+        self, farm_id, from_ts=None, to_ts=None, offset=None, limit=DEFAULT_PAGE_SIZE
+    ):
+        """Get one page of a farm's readings with from_ts <= timestamp <= to_ts"""
+        limit = max(1, min(limit, MAX_PAGE_SIZE))
+        from_ts = max(0, from_ts or 0)
+        to_ts = MAX_TIMESTAMP if to_ts is None else min(max(0, to_ts), MAX_TIMESTAMP)
+        return await SensorDataCache().get_or_load_async(
+            ("range", farm_id, from_ts, to_ts, offset, limit),
+            lambda: self._load_sensor_data_range(farm_id, from_ts, to_ts, offset, limit),
+        )
+
+    async def _load_sensor_data_range(self, farm_id, from_ts, to_ts, offset, limit):
+        if CHAIN_INDEX_ENABLED:
+            indexed = await run_in_threadpool(
+                read_chain_index,
+                ChainIndexService.get_readings_range,
+                farm_id,
+                from_ts,
+                to_ts,
+                offset,
+                limit,
+            )
+            if indexed is not INDEX_UNAVAILABLE:
+                return indexed
+
+        await self.initialize()
+        if not self.initialized:
+            print("Blockchain not initialized")
+            return None
+
+        try:
+            encoded_id = encode_id(farm_id)
+            if offset is None:
+                total = await self._call_view(
+                    "getDataCountByFarmIdInRange", encoded_id, from_ts, to_ts
+                )
+                offset = max(0, total - limit)
+            raw_data, total = await self._call_view(
+                "getDataByFarmIdInRange", encoded_id, from_ts, to_ts, offset, limit
+            )
+
+            return {
+                "items": await run_in_threadpool(format_farm_data, raw_data),
+                "total": total,
+                "offset": offset,
+                "limit": limit,
+            }
+
+        except Exception as e:
+            print(f"Error getting data range from blockchain: {str(e)}")
+            return None
+
+    async def iter_sensor_data(self, farm_id, page_size=MAX_PAGE_SIZE):
+        """Yield a farm's full history page by page, oldest first, bypassing the read cache
+
+        Raises RuntimeError when a page cannot be read.
+        """
+        page_size = max(1, min(page_size, MAX_PAGE_SIZE))
+        offset = 0
+        while True:
+            page = await self._load_sensor_data_page(farm_id, offset, page_size)
+            if page is None:
+                raise RuntimeError(f"Cannot read data of farm {farm_id} at offset {offset}")
+            if page["items"]:
+                yield page["items"]
+            offset += len(page["items"])
+            if len(page["items"]) < page_size or offset >= page["total"]:
+                return
@@ -0,0 +1,72 @@
+import threading
+
+from app.config import BLOCK_POLL_INTERVAL, CHAIN_INDEX_ENABLED, INDEXER_BLOCK_RANGE
+from app.services.blockchain import BlockchainService
+from app.services.chain_ids import decode_id
+from app.services.read_cache import SensorDataCache
+
+
+class BlockTracker:
+    """Follows the chain head and invalidates cached reads of farms written in new blocks"""
+
+    _instance = None
+
+    def __new__(cls):
+        if cls._instance is None:
+            cls._instance = super(BlockTracker, cls).__new__(cls)
+            cls._instance.cache = SensorDataCache()
+            cls._instance._stop_event = threading.Event()
+            cls._instance._thread = None
+        return cls._instance
+
+    def start(self):
+        """Start following the chain head and enable the read cache"""
+        if self.cache.max_size <= 0 or (self._thread and self._thread.is_alive()):
+            return
+        self._stop_event.clear()
+        self._thread = threading.Thread(target=self._run, name="block-tracker", daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        """Stop following the chain head, the cache is disabled with it"""
+        self._stop_event.set()
+        self.cache.active = False
+        self.cache.clear()
+        if self._thread:
+            self._thread.join(timeout=BLOCK_POLL_INTERVAL * 2)
+
+    def _run(self):
+        while not self._stop_event.is_set():
+            try:
+                self.poll()
+            except Exception as e:
+                # Without a trustworthy head the cache could serve stale data
+                print(f"Error tracking chain head: {str(e)}")
+                self.cache.active = False
+                self.cache.clear()
+            self._stop_event.wait(BLOCK_POLL_INTERVAL)
+
+    def poll(self):
+        """Check for new blocks and invalidate the farms they stored data for"""
+        blockchain_service = BlockchainService()
+        if not getattr(blockchain_service, "initialized", False):
+            return
+
+        head = blockchain_service.get_block_number()
+        last_seen = self.cache.latest_block
+        if last_seen is None or not self.cache.active:
+            # Nothing cached is known to be current, start from an empty cache
+            self.cache.clear()
+        elif head > last_seen and not CHAIN_INDEX_ENABLED:
+            # With the chain index enabled reads come from the database and the
+            # indexer invalidates farms once their rows are committed
+            if head - last_seen > INDEXER_BLOCK_RANGE:
+                self.cache.clear()
+            else:
+                events = blockchain_service.get_data_stored_events(last_seen + 1, head)
+                self.cache.invalidate_farms(
+                    decode_id(event["args"]["farmId"]) for event in events
+                )
+
+        self.cache.latest_block = head
+        self.cache.active = True
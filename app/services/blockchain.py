@@ -1,11 +1,130 @@
+import time
+
 from dotenv import load_dotenv
-from web3 import Web3
+from web3.exceptions import ContractLogicError
 
-from app.config import CONTRACT_ABI, BESU_URL, CONTRACT_ADDRESS, PRIVATE_KEY
+from app.config import (
+    CONTRACT_ABI,
+    CONTRACT_ADDRESS,
+    SIGNER_PRIVATE_KEYS,
+    STORE_DATA_GAS,
+    BATCH_GAS_LIMIT,
+    BATCH_GAS_PER_READING,
+    ANCHOR_GAS,
+    DEFAULT_PAGE_SIZE,
+    MAX_PAGE_SIZE,
+    CHAIN_INDEX_ENABLED,
+)
+from app.services.chain_ids import encode_id, decode_id
+from app.services.chain_index_service import (
+    INDEX_UNAVAILABLE,
+    ChainIndexService,
+    read_chain_index,
+)
+from app.services.read_cache import SensorDataCache
+from app.services.rpc_pool import RpcEndpointPool
+from app.services.signer_pool import SignerPool
 
 # Load environment variables
 load_dotenv()
 
+# Reading timestamps are uint64 on chain
+MAX_TIMESTAMP = 2**64 - 1
+
+
+def encode_reading(farm_id, data):
+    """Convert a sensor payload into storeData arguments"""
+    return (
+        encode_id(farm_id, register=True),
+        int(float(data.get("temperature", 0)) * 100),
+        int(data.get("humidity")),
+        int(data.get("water_level")),
+        encode_id(data.get("product_id"), register=True),
+        int(data.get("light_level")),
+    )
+
+
+def decode_reading(item):
+    """Unpack a raw Reading struct (timestamp, temperature, humidity, water level,
+    light level, farm id, product id) into plain values"""
+    timestamp, temperature, humidity, water_level, light_level, farm_id, product_id = item
+    return (
+        timestamp,
+        decode_id(farm_id),
+        temperature / 100,
+        humidity,
+        water_level,
+        decode_id(product_id),
+        light_level,
+    )
+
+
+def format_farm_data(raw_data):
+    """Convert raw Reading structs into dicts keyed like the farm data page expects"""
+    formatted_data = []
+    for item in raw_data:
+        timestamp, farm_id, temperature, humidity, water_level, product_id, light_level = (
+            decode_reading(item)
+        )
+        formatted_item = {
+            "timestamp": timestamp,
+            "farmId": farm_id,
+            "temperature": temperature,
+            "humidity": humidity,
+            "waterLevel": water_level,
+            "productId": product_id,
+            "lightLevel": light_level,
+        }
+        formatted_data.append(formatted_item)
+    return formatted_data
+
+
+def format_all_data(raw_data):
+    """Convert raw Reading structs into snake_case dicts"""
+    formatted_data = []
+    for item in raw_data:
+        timestamp, farm_id, temperature, humidity, water_level, product_id, light_level = (
+            decode_reading(item)
+        )
+        formatted_item = {
+            "timestamp": timestamp,
+            "farm_id": farm_id,
+            "temperature": temperature,
+            "humidity": humidity,
+            "water_level": water_level,
+            "product_id": product_id,
+            "light_level": light_level,
+        }
+        formatted_data.append(formatted_item)
+    return formatted_data
+
+
+def format_farm_summaries(raw_data):
+    """Convert raw FarmSummaryView structs into snake_case dicts"""
+    return [
+        {
+            "farm_id": decode_id(item[0]),
+            "data_count": item[1],
+            "first_timestamp": item[2],
+            "last_timestamp": item[3],
+            "latest": format_all_data([item[4]])[0],
+        }
+        for item in raw_data
+    ]
+
+
+def format_latest_pages(farm_ids, pages, totals, limit):
+    """Convert getLatestDataByFarmIds results into {farm_id: page}"""
+    return {
+        farm_id: {
+            "items": format_farm_data(raw_data),
+            "total": total,
+            "offset": max(0, total - limit),
+            "limit": limit,
+        }
+        for farm_id, raw_data, total in zip(farm_ids, pages, totals)
+    }
+
 
 class BlockchainService:
     _instance = None
@@ -19,132 +138,551 @@ class BlockchainService:
     def _initialize_blockchain(self):
         """Initialize blockchain connection"""
         try:
-            provider_url = BESU_URL
             contract_address = CONTRACT_ADDRESS
-            private_key = PRIVATE_KEY
 
-            # Connect Web3
-            self.web3 = Web3(Web3.HTTPProvider(provider_url))
+            # Connect Web3 through the pool of RPC endpoints
+            self.rpc_pool = RpcEndpointPool()
+            connected = [
+                endpoint for endpoint in self.rpc_pool.endpoints if endpoint.web3.is_connected()
+            ]
 
-            if not self.web3.is_connected():
+            if not connected:
                 print("Cannot connect to blockchain")
                 return
 
-            # Create account from private key
-            self.account = self.web3.eth.account.from_key(private_key)
+            self.web3 = connected[0].web3
 
-            # Initialize contract
-            self.contract = self.web3.eth.contract(
-                address=self.web3.to_checksum_address(contract_address),
-                abi=CONTRACT_ABI,
-            )
+            # Create signing accounts, farms are spread over them by farm_id
+            self.signer_pool = SignerPool(SIGNER_PRIVATE_KEYS)
+            self.account = self.signer_pool.default_account
+            self.chain_id = self.web3.eth.chain_id
+
+            # Initialize contract, one instance per endpoint
+            self.contracts = {
+                endpoint.url: endpoint.web3.eth.contract(
+                    address=endpoint.web3.to_checksum_address(contract_address),
+                    abi=CONTRACT_ABI,
+                )
+                for endpoint in self.rpc_pool.endpoints
+            }
+            self.contract = self.contracts[connected[0].url]
 
-            print(f"Connected to blockchain, account address: {self.account.address}")
+            print(
+                f"Connected to blockchain, account address: {self.account.address}, "
+                f"signer pool size: {len(self.signer_pool.accounts)}, "
+                f"rpc endpoints: {len(self.rpc_pool.endpoints)}"
+            )
             self.initialized = True
 
         except Exception as e:
             print(f"Error initializing blockchain: {str(e)}")
             self.initialized = False
 
+    def _call_view(self, function_name, *args):
+        """Run a contract view on a healthy node, failing over to the next one on error"""
+        last_error = None
+        for endpoint in self.rpc_pool.read_endpoints():
+            contract = self.contracts[endpoint.url]
+            start = time.perf_counter()
+            try:
+                result = getattr(contract.functions, function_name)(*args).call()
+                endpoint.record(True, time.perf_counter() - start)
+                return result
+            except ContractLogicError:
+                # The node answered, the call itself reverted
+                endpoint.record(True, time.perf_counter() - start)
+                raise
+            except Exception as e:
+                endpoint.record(False)
+                last_error = e
+        raise last_error
+
+    def get_block_number(self):
+        """Get the latest block number from a healthy node"""
+        return self.rpc_pool.read_endpoint().web3.eth.block_number
+
+    def get_data_stored_events(self, from_block, to_block):
+        """Get decoded DataStored events in a block range"""
+        endpoint = self.rpc_pool.read_endpoint()
+        start = time.perf_counter()
+        try:
+            events = self.contracts[endpoint.url].events.DataStored.get_logs(
+                from_block=from_block, to_block=to_block
+            )
+            endpoint.record(True, time.perf_counter() - start)
+            return events
+        except Exception:
+            endpoint.record(False)
+            raise
+
+    def submit_sensor_data(self, farm_id, data):
+        """Sign and broadcast sensor data without waiting for it to be mined"""
+        if not getattr(self, "initialized", False):
+            print("Blockchain not initialized")
+            return None
+
+        try:
+            # Build storeData transaction
+            stored_func = self.contract.functions.storeData(
+                *encode_reading(farm_id, data)
+            )
+            tx_hash = self._send_transaction(
+                stored_func, STORE_DATA_GAS, self.signer_pool.account_for(farm_id)
+            )
+            return self.web3.to_hex(tx_hash)
+
+        except Exception as e:
+            print(f"Error storing data into blockchain: {str(e)}")
+            return None
+
     def store_sensor_data(self, farm_id, data):
         """Store sensor data into blockchain"""
+        tx_hash = self.submit_sensor_data(farm_id, data)
+        if not tx_hash:
+            return None
+
+        try:
+            tx_receipt = self.rpc_pool.read_endpoint().web3.eth.wait_for_transaction_receipt(
+                tx_hash
+            )
+            SensorDataCache().invalidate_farm(farm_id)
+            return self.web3.to_hex(tx_receipt.transactionHash)
+
+        except Exception as e:
+            print(f"Error waiting for transaction {tx_hash}: {str(e)}")
+            return None
+
+    def store_sensor_data_batch(self, readings):
+        """Store many readings through storeDataBatch, return one result per reading
+
+        A failed result is retryable when the node could not be reached or the
+        transaction was not mined in time, and not when the node rejected it.
+        """
+        results = [
+            {"success": False, "transaction_hash": None, "retryable": False} for _ in readings
+        ]
+        if not getattr(self, "initialized", False):
+            print("Blockchain not initialized")
+            for result in results:
+                result.update(error="Blockchain not initialized", retryable=True)
+            return results
+
+        # Encode readings, invalid ones stay marked as failed
+        encoded = []
+        for position, data in enumerate(readings):
+            try:
+                farm_id = data.get("farm_id")
+                encoded.append((position, farm_id, encode_reading(farm_id, data)))
+            except Exception as e:
+                results[position]["error"] = f"Invalid reading: {str(e)}"
+
+        # Group readings by the signing account of their farm
+        lanes = {}
+        for position, farm_id, args in encoded:
+            account = self.signer_pool.account_for(farm_id)
+            lanes.setdefault(account.address, (account, []))[1].append(
+                (position, farm_id, args)
+            )
+
+        # Split each lane into chunks that fit the per-transaction gas budget
+        chunk_size = max(1, BATCH_GAS_LIMIT // BATCH_GAS_PER_READING - 1)
+        chunks = []
+        for account, lane in lanes.values():
+            chunks.extend(
+                (account, lane[i: i + chunk_size]) for i in range(0, len(lane), chunk_size)
+            )
+
+        # Send every chunk back to back, then wait for all receipts
+        tx_hashes = []
+        send_errors = []
+        for account, chunk in chunks:
+            columns = list(zip(*(args for _, _, args in chunk)))
+            try:
+                batch_func = self.contract.functions.storeDataBatch(
+                    *[list(column) for column in columns]
+                )
+                gas = min(BATCH_GAS_LIMIT, BATCH_GAS_PER_READING * (len(chunk) + 1))
+                tx_hash = self._send_transaction(batch_func, gas, account)
+                tx_hashes.append(self.web3.to_hex(tx_hash))
+                send_errors.append(None)
+            except Exception as e:
+                print(f"Error storing data batch into blockchain: {str(e)}")
+                tx_hashes.append(None)
+                send_errors.append(e)
+
+        receipts = self.wait_for_receipts(tx_hashes)
+        written_farms = set()
+        for (_, chunk), tx_hash, receipt, error in zip(chunks, tx_hashes, receipts, send_errors):
+            success = bool(receipt) and receipt["status"] == 1
+            if success:
+                message, retryable = None, False
+            elif error is not None:
+                # A revert is final, anything else is the node being unreachable or busy
+                message = f"Batch transaction failed: {str(error)}"
+                retryable = not isinstance(error, ContractLogicError)
+            elif receipt:
+                message, retryable = "Batch transaction reverted", False
+            else:
+                message, retryable = "Batch transaction not mined in time", True
+            for position, farm_id, _ in chunk:
+                results[position]["success"] = success
+                results[position]["transaction_hash"] = tx_hash
+                if success:
+                    written_farms.add(farm_id)
+                else:
+                    results[position]["error"] = message
+                    results[position]["retryable"] = retryable
+        SensorDataCache().invalidate_farms(written_farms)
+
+        return results
+
+    def anchor_merkle_root(self, root, leaf_count):
+        """Anchor a batch Merkle root on-chain, return (tx_hash, anchor_id)"""
         if not getattr(self, "initialized", False):
             print("Blockchain not initialized")
             return None
 
         try:
-            temperature = int(float(data.get("temperature", 0)) * 100)
-            humidity = int(data.get("humidity"))
-            water_level = int(data.get("water_level"))
-            light_level = int(data.get("light_level"))
-            nonce = self.web3.eth.get_transaction_count(self.account.address)
-            # Build deployment transaction
-            stored_func = self.contract.functions.storeData(
-                farm_id,
-                temperature,
-                humidity,
-                water_level,
-                data.get("product_id"),
-                light_level,
+            anchor_func = self.contract.functions.anchorRoot(
+                self.web3.to_bytes(hexstr=root), leaf_count
+            )
+            tx_hash = self._send_transaction(anchor_func, ANCHOR_GAS)
+            tx_receipt = self.rpc_pool.read_endpoint().web3.eth.wait_for_transaction_receipt(
+                tx_hash
             )
-            transaction = stored_func.build_transaction(
+            if tx_receipt["status"] != 1:
+                print(f"Anchor transaction {self.web3.to_hex(tx_hash)} reverted")
+                return None
+
+            events = self.contract.events.RootAnchored().process_receipt(tx_receipt)
+            anchor_id = events[0]["args"]["anchorId"] if events else None
+            return self.web3.to_hex(tx_hash), anchor_id
+
+        except Exception as e:
+            print(f"Error anchoring Merkle root: {str(e)}")
+            return None
+
+    def wait_for_receipts(self, tx_hashes, timeout=120):
+        """Wait for a list of broadcast transactions, return receipts in the same order"""
+        receipts = []
+        for tx_hash in tx_hashes:
+            if not tx_hash:
+                receipts.append(None)
+                continue
+            try:
+                web3 = self.rpc_pool.read_endpoint().web3
+                receipts.append(web3.eth.wait_for_transaction_receipt(tx_hash, timeout=timeout))
+            except Exception as e:
+                print(f"Error waiting for transaction {tx_hash}: {str(e)}")
+                receipts.append(None)
+        return receipts
+
+    def get_transaction_statuses(self, tx_hashes):
+        """Look up receipts for many transactions in one JSON-RPC batch request
+
+        Transactions the node does not know are missing from the result.
+        """
+        statuses = {}
+        if not getattr(self, "initialized", False) or not tx_hashes:
+            return statuses
+
+        endpoint = self.rpc_pool.read_endpoint()
+        # The transaction itself is fetched along with its receipt, to tell a
+        # pending transaction from one the node has never seen
+        responses = endpoint.web3.provider.make_batch_request(
+            [
+                request
+                for tx_hash in tx_hashes
+                for request in (
+                    ("eth_getTransactionReceipt", [tx_hash]),
+                    ("eth_getTransactionByHash", [tx_hash]),
+                )
+            ]
+        )
+        if isinstance(responses, dict):
+            raise ValueError(f"Batch receipt request failed: {responses.get('error')}")
+        for tx_hash, receipt_response, tx_response in zip(
+            tx_hashes, responses[::2], responses[1::2]
+        ):
+            receipt = receipt_response.get("result")
+            if not receipt:
+                if tx_response.get("result"):
+                    statuses[tx_hash] = {"status": "pending", "block_number": None}
+                # Unknown transactions are left out
+                continue
+            statuses[tx_hash] = {
+                "status": "mined" if int(receipt["status"], 16) == 1 else "failed",
+                "block_number": int(receipt["blockNumber"], 16),
+            }
+        return statuses
+
+    def _send_transaction(self, contract_func, gas, account=None):
+        """Build, sign and send a contract transaction using a locally allocated nonce"""
+        account = account or self.account
+        nonce_manager = self.signer_pool.nonce_manager(account)
+        # Keep each account on one node so its nonces reach a single txpool in order
+        endpoint = self.rpc_pool.write_endpoint(account.address)
+        start = time.perf_counter()
+        nonce = nonce_manager.allocate(endpoint.web3)
+        try:
+            transaction = contract_func.build_transaction(
                 {
-                    "from": self.account.address,
+                    "from": account.address,
                     "nonce": nonce,
-                    "gas": 3000000,
+                    "gas": gas,
                     "gasPrice": self.web3.to_wei("0", "gwei"),
-                    "chainId": self.web3.eth.chain_id,
+                    "chainId": self.chain_id,
                 }
             )
-            print("transaction: ", transaction)
             # Sign transaction locally
-            signed_tx = self.account.sign_transaction(transaction)
+            signed_tx = account.sign_transaction(transaction)
             # Send signed transaction
-            tx_hash = self.web3.eth.send_raw_transaction(signed_tx.raw_transaction)
-            tx_receipt = self.web3.eth.wait_for_transaction_receipt(tx_hash)
-            return tx_receipt.transactionHash.hex()
-
-        except Exception as e:
-            print(f"Error storing data into blockchain: {str(e)}")
-            return None
+            tx_hash = endpoint.web3.eth.send_raw_transaction(signed_tx.raw_transaction)
+            endpoint.record(True, time.perf_counter() - start)
+            return tx_hash
+        except Exception:
+            endpoint.record(False)
+            # The reserved nonce may now be a gap, re-read it from the node next time
+            nonce_manager.resync()
+            raise
+        finally:
+            nonce_manager.release()
 
     def get_sensor_data_by_farm_id(self, farm_id):
-        """Get sensor data from blockchain by farm_id"""
+        """Get sensor data from blockchain by farm_id, through the read cache"""
+        return SensorDataCache().get_or_load(
+            ("farm", farm_id), lambda: self._load_sensor_data_by_farm_id(farm_id)
+        )
+
+    def _load_sensor_data_by_farm_id(self, farm_id):
+        if CHAIN_INDEX_ENABLED:
+            indexed = read_chain_index(ChainIndexService.get_readings_by_farm, farm_id)
+            if indexed is not INDEX_UNAVAILABLE:
+                return indexed or None
+
         if not getattr(self, "initialized", False):
             print("Blockchain not initialized")
             return None
 
         try:
-            raw_data = self.contract.functions.getDataByFarmId(farm_id).call()
+            raw_data = self._call_view("getDataByFarmId", encode_id(farm_id))
             if not raw_data:
                 print(f"No data found for farm {farm_id}")
                 return None
 
-            formatted_data = []
-            for item in raw_data:
-                formatted_item = {
-                    "timestamp": item[0],
-                    "farmId": item[1],
-                    "temperature": item[2] / 100,
-                    "humidity": item[3],
-                    "waterLevel": item[4],
-                    "productId": item[5],
-                    "lightLevel": item[6],
-                }
-                formatted_data.append(formatted_item)
-
-            return formatted_data  # Return formatted data
+            return format_farm_data(raw_data)  # Return formatted data
 
         except Exception as e:
             print(f"Error getting data from blockchain: {str(e)}")
             return None
 
     def get_all_sensor_data(self):
-        """Get all sensor data from blockchain"""
+        """Get all sensor data from blockchain, through the read cache"""
+        return SensorDataCache().get_or_load(
+            ("all", None), self._load_all_sensor_data
+        )
+
+    def _load_all_sensor_data(self):
+        if CHAIN_INDEX_ENABLED:
+            indexed = read_chain_index(ChainIndexService.get_all_readings)
+            if indexed is not INDEX_UNAVAILABLE:
+                return indexed or None
+
         if not getattr(self, "initialized", False):
             print("Blockchain not initialized")
             return None
 
         try:
-            raw_data = self.contract.functions.getAllData().call()
+            raw_data = self._call_view("getAllData")
             if not raw_data:
                 print("No data found")
                 return None
 
-            formatted_data = []
-            for item in raw_data:
-                formatted_item = {
-                    "timestamp": item[0],
-                    "farm_id": item[1],
-                    "temperature": item[2] / 100,
-                    "humidity": item[3],
-                    "water_level": item[4],
-                    "product_id": item[5],
-                    "light_level": item[6],
-                }
-                formatted_data.append(formatted_item)
-
-            return formatted_data
+            return format_all_data(raw_data)
         except Exception as e:
             print(f"Error getting all data from blockchain: {str(e)}")
             return None
+
+    def get_sensor_data_page(self, farm_id, offset=None, limit=DEFAULT_PAGE_SIZE):
+        """Get one page of a farm's sensor data, the latest page when offset is None"""
+        limit = max(1, min(limit, MAX_PAGE_SIZE))
+        return SensorDataCache().get_or_load(
+            ("page", farm_id, offset, limit),
+            lambda: self._load_sensor_data_page(farm_id, offset, limit),
+        )
+
+    def _load_sensor_data_page(self, farm_id, offset, limit):
+        if CHAIN_INDEX_ENABLED:
+            indexed = read_chain_index(ChainIndexService.get_readings_page, farm_id, offset, limit)
+            if indexed is not INDEX_UNAVAILABLE:
+                return indexed
+
+        if not getattr(self, "initialized", False):
+            print("Blockchain not initialized")
+            return None
+
+        try:
+            if offset is None:
+                total = self._call_view("getDataCountByFarmId", encode_id(farm_id))
+                offset = max(0, total - limit)
+            raw_data, total = self._call_view(
+                "getDataByFarmIdPaged", encode_id(farm_id), offset, limit
+            )
+
+            return {
+                "items": format_farm_data(raw_data),
+                "total": total,
+                "offset": offset,
+                "limit": limit,
+            }
+
+        except Exception as e:
+            print(f"Error getting data page from blockchain: {str(e)}")
+            return None
+
+    def iter_chain_history(self, farm_id, page_size=MAX_PAGE_SIZE, offset=0):
+        """Yield a farm's history from the contract page by page, oldest first
+
+        Meant for background jobs: bypasses the read cache and the chain index,
+        and raises instead of returning None on errors. Reading starts at the
+        given position in the farm's history.
+        """
+        if not getattr(self, "initialized", False):
+            raise RuntimeError("Blockchain not initialized")
+
+        encoded_id = encode_id(farm_id)
+        page_size = max(1, min(page_size, MAX_PAGE_SIZE))
+        while True:
+            raw_data, total = self._call_view(
+                "getDataByFarmIdPaged", encoded_id, offset, page_size
+            )
+            if raw_data:
+                yield format_farm_data(raw_data)
+            offset += len(raw_data)
+            if len(raw_data) < page_size or offset >= total:
+                return
+
+    def get_chain_farm_ids(self):
+        """Get the id of every farm with data on chain, straight from the contract"""
+        if not getattr(self, "initialized", False):
+            raise RuntimeError("Blockchain not initialized")
+
+        farm_ids = []
+        while True:
+            raw_data, total = self._call_view("getFarmSummaries", len(farm_ids), MAX_PAGE_SIZE)
+            farm_ids.extend(decode_id(item[0]) for item in raw_data)
+            if not raw_data or len(farm_ids) >= total:
+                return farm_ids
+
+    def get_farm_summaries(self, offset=0, limit=DEFAULT_PAGE_SIZE):
+        """Get one page of per-farm summaries (count, first/last timestamp, latest reading)"""
+        limit = max(1, min(limit, MAX_PAGE_SIZE))
+        return SensorDataCache().get_or_load(
+            ("summaries", None, offset, limit),
+            lambda: self._load_farm_summaries(offset, limit),
+        )
+
+    def _load_farm_summaries(self, offset, limit):
+        if CHAIN_INDEX_ENABLED:
+            indexed = read_chain_index(ChainIndexService.get_farm_summaries, offset, limit)
+            if indexed is not INDEX_UNAVAILABLE:
+                return indexed
+
+        if not getattr(self, "initialized", False):
+            print("Blockchain not initialized")
+            return None
+
+        try:
+            raw_data, total = self._call_view("getFarmSummaries", offset, limit)
+            return {
+                "items": format_farm_summaries(raw_data),
+                "total": total,
+                "offset": offset,
+                "limit": limit,
+            }
+
+        except Exception as e:
+            print(f"Error getting farm summaries from blockchain: {str(e)}")
+            return None
+
+    def get_sensor_data_for_farms(self, farm_ids, limit=DEFAULT_PAGE_SIZE):
+        """Get the latest page of sensor data of many farms in one contract call
+
+        Returns {farm_id: page} with pages shaped like get_sensor_data_page; pages
+        already in the read cache are not fetched again.
+        """
+        limit = max(1, min(limit, MAX_PAGE_SIZE))
+        keys = {farm_id: ("page", farm_id, None, limit) for farm_id in farm_ids}
+        return SensorDataCache().get_or_load_many(
+            keys, lambda missing: self._load_sensor_data_for_farms(missing, limit)
+        )
+
+    def _load_sensor_data_for_farms(self, farm_ids, limit):
+        if CHAIN_INDEX_ENABLED:
+            indexed = read_chain_index(ChainIndexService.get_latest_pages, farm_ids, limit)
+            if indexed is not INDEX_UNAVAILABLE:
+                return indexed
+
+        if not getattr(self, "initialized", False):
+            print("Blockchain not initialized")
+            return None
+
+        try:
+            pages, totals = self._call_view(
+                "getLatestDataByFarmIds", [encode_id(farm_id) for farm_id in farm_ids], limit
+            )
+            return format_latest_pages(farm_ids, pages, totals, limit)
+
+        except Exception as e:
+            print(f"Error getting data of several farms from blockchain: {str(e)}")
+            return None
+
+    def get_sensor_data_range(
+        self, farm_id, from_ts=None, to_ts=None, offset=None, limit=DEFAULT_PAGE_SIZE
+    ):
+        """Get one page of a farm's readings with from_ts <= timestamp <= to_ts
+
+        Either bound may be None. Without offset the latest page of the range is
+        returned.
+        """
+        limit = max(1, min(limit, MAX_PAGE_SIZE))
+        from_ts = max(0, from_ts or 0)
+        to_ts = MAX_TIMESTAMP if to_ts is None else min(max(0, to_ts), MAX_TIMESTAMP)
+        return SensorDataCache().get_or_load(
+            ("range", farm_id, from_ts, to_ts, offset, limit),
+            lambda: self._load_sensor_data_range(farm_id, from_ts, to_ts, offset, limit),
+        )
+
+    def _load_sensor_data_range(self, farm_id, from_ts, to_ts, offset, limit):
+        if CHAIN_INDEX_ENABLED:
+            indexed = read_chain_index(
+                ChainIndexService.get_readings_range, farm_id, from_ts, to_ts, offset, limit
+            )
+            if indexed is not INDEX_UNAVAILABLE:
+                return indexed
+
+        if not getattr(self, "initialized", False):
+            print("Blockchain not initialized")
+            return None
+
+        try:
+            encoded_id = encode_id(farm_id)
+            if offset is None:
+                total = self._call_view(
+                    "getDataCountByFarmIdInRange", encoded_id, from_ts, to_ts
+                )
+                offset = max(0, total - limit)
+            raw_data, total = self._call_view(
+                "getDataByFarmIdInRange", encoded_id, from_ts, to_ts, offset, limit
+            )
+
+            return {
+                "items": format_farm_data(raw_data),
+                "total": total,
+                "offset": offset,
+                "limit": limit,
+            }
+
+        except Exception as e:
+            print(f"Error getting data range from blockchain: {str(e)}")
+            return None
@@ -0,0 +1,115 @@
+import threading
+
+from eth_utils import keccak
+
+from app.model.farm_data import ChainIdentifier
+from app.services.database import SessionLocal
+
+ID_SIZE = 32
+UNKNOWN_ID_PREFIX = "unknown:"
+
+
+class ChainIdDictionary:
+    """Two-way mapping between farm/product ids and their bytes32 form on chain
+
+    Ids of up to 32 UTF-8 bytes are right-padded with zeros. Longer ids are
+    stored as their keccak256 hash, and the original is kept in the
+    chain_identifiers table so reads can turn the hash back into the id.
+    """
+
+    _instance = None
+
+    def __new__(cls):
+        if cls._instance is None:
+            cls._instance = super(ChainIdDictionary, cls).__new__(cls)
+            cls._instance._lock = threading.Lock()
+            cls._instance._values = {}
+        return cls._instance
+
+    def load(self):
+        """Read every registered hashed id, so lookups after startup stay in memory"""
+        db = SessionLocal()
+        try:
+            identifiers = db.query(ChainIdentifier.id_hash, ChainIdentifier.value).all()
+        finally:
+            db.close()
+        with self._lock:
+            for id_hash, value in identifiers:
+                self._values[bytes.fromhex(id_hash[2:])] = value
+        return len(identifiers)
+
+    def encode(self, value, register=False):
+        """Return the bytes32 form of an id
+
+        Hashed ids are registered in chain_identifiers when register is set,
+        which writers do before sending the transaction that carries the hash.
+        Readers only need the hash and never touch the database.
+        """
+        raw = str(value).encode("utf-8")
+        if len(raw) <= ID_SIZE and b"\x00" not in raw:
+            return raw.ljust(ID_SIZE, b"\x00")
+
+        id_hash = keccak(raw)
+        if not register:
+            return id_hash
+        with self._lock:
+            known = id_hash in self._values
+        if not known:
+            db = SessionLocal()
+            try:
+                db.merge(ChainIdentifier(id_hash="0x" + id_hash.hex(), value=value))
+                db.commit()
+            finally:
+                db.close()
+            with self._lock:
+                self._values[id_hash] = value
+        return id_hash
+
+    def decode(self, id_bytes):
+        """Return the id a bytes32 value stands for, or unknown_id() for an unregistered hash"""
+        id_bytes = bytes(id_bytes)
+        with self._lock:
+            if id_bytes in self._values:
+                return self._values[id_bytes]
+
+        try:
+            value = id_bytes.rstrip(b"\x00").decode("utf-8")
+            if "\x00" not in value:
+                return value
+        except UnicodeDecodeError:
+            pass
+
+        # A hash registered after load(), possibly by another process
+        db = SessionLocal()
+        try:
+            identifier = (
+                db.query(ChainIdentifier)
+                .filter(ChainIdentifier.id_hash == "0x" + id_bytes.hex())
+                .first()
+            )
+        finally:
+            db.close()
+
+        if identifier is None:
+            # Not cached, the hash may still be registered later
+            return unknown_id(id_bytes)
+        with self._lock:
+            self._values[id_bytes] = identifier.value
+        return identifier.value
+
+
+def unknown_id(id_bytes):
+    """Marker returned for a hashed id missing from chain_identifiers"""
+    return UNKNOWN_ID_PREFIX + "0x" + bytes(id_bytes).hex()
+
+
+def encode_id(value, register=False):
+    """Encode a farm or product id for the contract, register it when writing"""
+    if value is None:
+        return b"\x00" * ID_SIZE
+    return ChainIdDictionary().encode(value, register)
+
+
+def decode_id(id_bytes):
+    """Decode a bytes32 farm or product id read from the contract"""
+    return ChainIdDictionary().decode(id_bytes)
@@ -0,0 +1,194 @@
+from sqlalchemy import func
+from sqlalchemy.dialects.mysql import insert
+from sqlalchemy.orm import Session
+
+from app.config import INDEXER_START_BLOCK
+from app.model.farm_data import ChainIndexCheckpoint, ChainReading
+from app.services.database import SessionLocal
+
+CHECKPOINT_NAME = "iot_storage"
+
+
+def _farm_item(reading: ChainReading) -> dict:
+    """Format a mirrored reading like BlockchainService.get_sensor_data_by_farm_id"""
+    return {
+        "timestamp": reading.timestamp,
+        "farmId": reading.farm_id,
+        "temperature": reading.temperature,
+        "humidity": reading.humidity,
+        "waterLevel": reading.water_level,
+        "productId": reading.product_id,
+        "lightLevel": reading.light_level,
+    }
+
+
+def _all_item(reading: ChainReading) -> dict:
+    """Format a mirrored reading like BlockchainService.get_all_sensor_data"""
+    return {
+        "timestamp": reading.timestamp,
+        "farm_id": reading.farm_id,
+        "temperature": reading.temperature,
+        "humidity": reading.humidity,
+        "water_level": reading.water_level,
+        "product_id": reading.product_id,
+        "light_level": reading.light_level,
+    }
+
+
+class ChainIndexService:
+    @staticmethod
+    def upsert_readings(db: Session, rows: list[dict]) -> int:
+        """Write mirrored readings in one INSERT ... ON DUPLICATE KEY UPDATE
+
+        Replaying a block range overwrites its rows instead of failing, without
+        the SELECT per row of Session.merge. The caller commits.
+        """
+        if not rows:
+            return 0
+        statement = insert(ChainReading).values(rows)
+        db.execute(
+            statement.on_duplicate_key_update(
+                {
+                    column.name: statement.inserted[column.name]
+                    for column in ChainReading.__table__.columns
+                    if not column.primary_key
+                }
+            )
+        )
+        return len(rows)
+
+    @staticmethod
+    def get_checkpoint(db: Session) -> int:
+        """Get the last block whose events are in chain_readings"""
+        checkpoint = (
+            db.query(ChainIndexCheckpoint)
+            .filter(ChainIndexCheckpoint.name == CHECKPOINT_NAME)
+            .first()
+        )
+        return checkpoint.block_number if checkpoint else INDEXER_START_BLOCK - 1
+
+    @staticmethod
+    def get_readings_by_farm(db: Session, farm_id: str) -> list[dict]:
+        """Get a farm's full history from the index"""
+        readings = (
+            db.query(ChainReading)
+            .filter(ChainReading.farm_id == farm_id)
+            .order_by(ChainReading.index)
+            .all()
+        )
+        return [_farm_item(reading) for reading in readings]
+
+    @staticmethod
+    def get_readings_page(db: Session, farm_id: str, offset, limit: int) -> dict:
+        """Get one page of a farm's history from the index, the latest page when offset is None"""
+        total = (
+            db.query(func.count(ChainReading.index))
+            .filter(ChainReading.farm_id == farm_id)
+            .scalar()
+        )
+        if offset is None:
+            offset = max(0, total - limit)
+        readings = (
+            db.query(ChainReading)
+            .filter(ChainReading.farm_id == farm_id)
+            .order_by(ChainReading.index)
+            .offset(offset)
+            .limit(limit)
+            .all()
+        )
+        return {
+            "items": [_farm_item(reading) for reading in readings],
+            "total": total,
+            "offset": offset,
+            "limit": limit,
+        }
+
+    @staticmethod
+    def get_readings_range(
+        db: Session, farm_id: str, from_ts: int, to_ts: int, offset, limit: int
+    ) -> dict:
+        """Get one page of a farm's readings between two timestamps from the index"""
+        query = db.query(ChainReading).filter(
+            ChainReading.farm_id == farm_id,
+            ChainReading.timestamp >= from_ts,
+            ChainReading.timestamp <= to_ts,
+        )
+        total = query.count()
+        if offset is None:
+            offset = max(0, total - limit)
+        readings = query.order_by(ChainReading.index).offset(offset).limit(limit).all()
+        return {
+            "items": [_farm_item(reading) for reading in readings],
+            "total": total,
+            "offset": offset,
+            "limit": limit,
+        }
+
+    @staticmethod
+    def get_latest_pages(db: Session, farm_ids: list[str], limit: int) -> dict:
+        """Get the latest page of several farms' histories from the index"""
+        return {
+            farm_id: ChainIndexService.get_readings_page(db, farm_id, None, limit)
+            for farm_id in farm_ids
+        }
+
+    @staticmethod
+    def get_farm_summaries(db: Session, offset: int, limit: int) -> dict:
+        """Get one page of per-farm summaries, ordered like the contract's farm list"""
+        total = db.query(func.count(func.distinct(ChainReading.farm_id))).scalar()
+        groups = (
+            db.query(
+                ChainReading.farm_id,
+                func.count(ChainReading.index),
+                func.min(ChainReading.timestamp),
+                func.max(ChainReading.timestamp),
+                func.min(ChainReading.index),
+                func.max(ChainReading.index),
+            )
+            .group_by(ChainReading.farm_id)
+            .order_by(func.min(ChainReading.index))
+            .offset(offset)
+            .limit(limit)
+            .all()
+        )
+        latest_indexes = [group[5] for group in groups]
+        latest = {
+            reading.index: reading
+            for reading in db.query(ChainReading)
+            .filter(ChainReading.index.in_(latest_indexes))
+            .all()
+        }
+        items = [
+            {
+                "farm_id": farm_id,
+                "data_count": count,
+                "first_timestamp": first_timestamp,
+                "last_timestamp": last_timestamp,
+                "latest": _all_item(latest[latest_index]),
+            }
+            for farm_id, count, first_timestamp, last_timestamp, _, latest_index in groups
+        ]
+        return {"items": items, "total": total, "offset": offset, "limit": limit}
+
+    @staticmethod
+    def get_all_readings(db: Session) -> list[dict]:
+        """Get every reading from the index"""
+        readings = db.query(ChainReading).order_by(ChainReading.index).all()
+        return [_all_item(reading) for reading in readings]
+
+
+# Returned by read_chain_index when the database fails, the blockchain services
+# then read the contract instead
+INDEX_UNAVAILABLE = object()
+
+
+def read_chain_index(query, *args):
+    """Run a ChainIndexService query on its own session, for the blockchain services"""
+    db = SessionLocal()
+    try:
+        return query(db, *args)
+    except Exception as e:
+        print(f"Error reading chain index, falling back to the contract: {str(e)}")
+        return INDEX_UNAVAILABLE
+    finally:
+        db.close()
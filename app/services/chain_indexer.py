@@ -0,0 +1,101 @@
+import threading
+
+from app.config import (
+    INDEXER_POLL_INTERVAL,
+    INDEXER_CONFIRMATIONS,
+    INDEXER_BLOCK_RANGE,
+)
+from app.model.farm_data import ChainIndexCheckpoint
+from app.services.blockchain import BlockchainService
+from app.services.chain_ids import decode_id
+from app.services.chain_index_service import CHECKPOINT_NAME, ChainIndexService
+from app.services.database import SessionLocal
+from app.services.read_cache import SensorDataCache
+
+
+class ChainIndexer:
+    """Follows new blocks and mirrors DataStored events into chain_readings"""
+
+    _instance = None
+
+    def __new__(cls):
+        if cls._instance is None:
+            cls._instance = super(ChainIndexer, cls).__new__(cls)
+            cls._instance._stop_event = threading.Event()
+            cls._instance._thread = None
+        return cls._instance
+
+    def start(self):
+        """Start following the chain in the background"""
+        if self._thread and self._thread.is_alive():
+            return
+        self._stop_event.clear()
+        self._thread = threading.Thread(target=self._run, name="chain-indexer", daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        """Stop following the chain"""
+        self._stop_event.set()
+        if self._thread:
+            self._thread.join(timeout=INDEXER_POLL_INTERVAL * 2)
+
+    def _run(self):
+        while not self._stop_event.is_set():
+            try:
+                caught_up = self.sync_once()
+            except Exception as e:
+                print(f"Error indexing chain events: {str(e)}")
+                caught_up = True
+            if caught_up:
+                self._stop_event.wait(INDEXER_POLL_INTERVAL)
+
+    def sync_once(self) -> bool:
+        """Index the next range of blocks, return True when the index is caught up"""
+        blockchain_service = BlockchainService()
+        if not getattr(blockchain_service, "initialized", False):
+            return True
+
+        head = blockchain_service.get_block_number() - INDEXER_CONFIRMATIONS
+        db = SessionLocal()
+        try:
+            from_block = ChainIndexService.get_checkpoint(db) + 1
+            if from_block > head:
+                return True
+            to_block = min(head, from_block + INDEXER_BLOCK_RANGE - 1)
+
+            events = blockchain_service.get_data_stored_events(from_block, to_block)
+            indexed_farms = set()
+            rows = []
+            for event in events:
+                args = event["args"]
+                farm_id = decode_id(args["farmId"])
+                indexed_farms.add(farm_id)
+                rows.append(
+                    {
+                        "index": args["index"],
+                        "farm_id": farm_id,
+                        "product_id": decode_id(args["productId"]),
+                        "timestamp": args["timestamp"],
+                        "temperature": args["temperature"] / 100,
+                        "humidity": args["humidity"],
+                        "water_level": args["waterLevel"],
+                        "light_level": args["lightLevel"],
+                        "block_number": event["blockNumber"],
+                        "tx_hash": event["transactionHash"].to_0x_hex(),
+                        "log_index": event["logIndex"],
+                    }
+                )
+            # One upsert per block range, replays of a range stay idempotent
+            ChainIndexService.upsert_readings(db, rows)
+
+            # Events and checkpoint are committed together
+            db.merge(ChainIndexCheckpoint(name=CHECKPOINT_NAME, block_number=to_block))
+            db.commit()
+            # Cached reads come from this table, refresh them only once rows are visible
+            SensorDataCache().invalidate_farms(indexed_farms)
+            return to_block >= head
+        except Exception:
+            db.rollback()
+            raise
+        finally:
+            db.close()
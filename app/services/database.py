@@ -1,11 +1,15 @@
 import os
+import threading
+import time
 
 import pymysql
 from dotenv import load_dotenv
-from sqlalchemy import create_engine
+from sqlalchemy import create_engine, event, exc
+from sqlalchemy.engine import make_url
+from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine
 from sqlalchemy.ext.declarative import declarative_base
 from sqlalchemy.orm import sessionmaker
-from sqlalchemy.sql import text
+from sqlalchemy.pool import AsyncAdaptedQueuePool, QueuePool
 
 load_dotenv()
 
@@ -44,16 +48,127 @@ if DATABASE_URL and "?" not in DATABASE_URL:
 elif DATABASE_URL and "charset=utf8mb4" not in DATABASE_URL:
     DATABASE_URL += "&charset=utf8mb4"
 
+# Connection pool settings, size them for the number of worker threads
+DB_POOL_SIZE = int(os.getenv("DB_POOL_SIZE", "10"))
+DB_MAX_OVERFLOW = int(os.getenv("DB_MAX_OVERFLOW", "20"))
+DB_POOL_TIMEOUT = float(os.getenv("DB_POOL_TIMEOUT", "30"))
+DB_POOL_RECYCLE = int(os.getenv("DB_POOL_RECYCLE", "3600"))
+
+
+class InstrumentedPoolMixin:
+    """Records how long pool checkouts wait for a free connection"""
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self._stats_lock = threading.Lock()
+        self.checkouts = 0
+        self.wait_total = 0.0
+        self.wait_max = 0.0
+        self.timeouts = 0
+        self.invalidations = 0
+
+    def _do_get(self):
+        start = time.perf_counter()
+        try:
+            return super()._do_get()
+        except exc.TimeoutError:
+            with self._stats_lock:
+                self.timeouts += 1
+            raise
+        finally:
+            waited = time.perf_counter() - start
+            with self._stats_lock:
+                self.checkouts += 1
+                self.wait_total += waited
+                self.wait_max = max(self.wait_max, waited)
+
+    def recreate(self):
+        # Keep the counters when the engine recreates the pool
+        pool = super().recreate()
+        with self._stats_lock:
+            for name in ("checkouts", "wait_total", "wait_max", "timeouts", "invalidations"):
+                setattr(pool, name, getattr(self, name))
+        return pool
+
+    def record_invalidation(self):
+        with self._stats_lock:
+            self.invalidations += 1
+
+    def metrics(self):
+        with self._stats_lock:
+            return {
+                "size": self.size(),
+                "checked_out": self.checkedout(),
+                "checked_in": self.checkedin(),
+                "overflow": max(0, self.overflow()),
+                "max_overflow": self._max_overflow,
+                "timeout": self._timeout,
+                "checkouts": self.checkouts,
+                "wait_avg_ms": (
+                    round(self.wait_total / self.checkouts * 1000, 3) if self.checkouts else None
+                ),
+                "wait_max_ms": round(self.wait_max * 1000, 3),
+                "timeouts": self.timeouts,
+                "invalidations": self.invalidations,
+            }
+
+
+class InstrumentedQueuePool(InstrumentedPoolMixin, QueuePool):
+    pass
+
+
+class InstrumentedAsyncQueuePool(InstrumentedPoolMixin, AsyncAdaptedQueuePool):
+    pass
+
+
 # Create SQLAlchemy engine with a pool of connections
 engine = create_engine(
     DATABASE_URL,
-    pool_pre_ping=True,  # Check connection before using it
-    pool_recycle=3600,  # Recycle connections after 1 hour
+    poolclass=InstrumentedQueuePool,
+    pool_size=DB_POOL_SIZE,
+    max_overflow=DB_MAX_OVERFLOW,
+    pool_timeout=DB_POOL_TIMEOUT,
+    pool_pre_ping=True,  # Check connection when it is checked out of the pool
+    pool_recycle=DB_POOL_RECYCLE,  # Recycle connections after 1 hour by default
     echo=False  # Don't log SQL queries
 )
 
-# Create session factory
+
+# Async engine for route handlers, same database through the aiomysql driver
+ASYNC_DATABASE_URL = os.getenv("ASYNC_DATABASE_URL") or make_url(DATABASE_URL).set(
+    drivername="mysql+aiomysql"
+)
+async_engine = create_async_engine(
+    ASYNC_DATABASE_URL,
+    poolclass=InstrumentedAsyncQueuePool,
+    pool_size=DB_POOL_SIZE,
+    max_overflow=DB_MAX_OVERFLOW,
+    pool_timeout=DB_POOL_TIMEOUT,
+    pool_pre_ping=True,
+    pool_recycle=DB_POOL_RECYCLE,
+    echo=False
+)
+
+
+@event.listens_for(engine, "invalidate")
+def _count_invalidation(dbapi_connection, connection_record, exception):
+    engine.pool.record_invalidation()
+
+
+@event.listens_for(async_engine.sync_engine, "invalidate")
+def _count_async_invalidation(dbapi_connection, connection_record, exception):
+    async_engine.sync_engine.pool.record_invalidation()
+
+
+def get_pool_metrics():
+    """Return connection pool usage, for sizing the pools against the worker count"""
+    return {"sync": engine.pool.metrics(), "async": async_engine.sync_engine.pool.metrics()}
+
+
+# Create session factories
 SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
+# Objects stay usable after commit, async sessions cannot lazy load expired attributes
+AsyncSessionLocal = async_sessionmaker(async_engine, autoflush=False, expire_on_commit=False)
 
 # Create base class for models
 Base = declarative_base()
@@ -61,13 +176,15 @@ Base = declarative_base()
 
 # Dependency to get DB session
 def get_db():
+    # Stale connections are caught by pool_pre_ping at checkout
     db = SessionLocal()
     try:
-        # Test the connection
-        db.execute(text("SELECT 1"))
         yield db
-    except Exception as e:
-        print(f"Database connection error: {e}")
-        raise
     finally:
         db.close()
+
+
+# Dependency to get an async DB session, for handlers that await their queries
+async def get_async_db():
+    async with AsyncSessionLocal() as db:
+        yield db
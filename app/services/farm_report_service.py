@@ -1,8 +1,64 @@
-from typing import Optional, Type
+from datetime import datetime
+from itertools import islice
+from typing import Iterable, Optional, Tuple, Type
 
+from sqlalchemy import delete, func, insert, select
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import Session
 
-from app.model.farm_data import FarmReport
+from app.config import REPORT_INSERT_CHUNK_SIZE
+from app.model.farm_data import FarmReport, FarmReportRollup
+from app.services.pagination import keyset_page, keyset_select
+from app.services.rollup_service import ROLLUP_GRANULARITIES, bucket_start, format_rollup
+
+# Sort key of cursor pages, served by ix_farm_reports_created_at when unfiltered and by
+# the farm_id/product_id + created_at indexes otherwise
+REPORT_CURSOR_COLUMNS = (FarmReport.created_at, FarmReport.id)
+
+
+def latest_reports_query(farm_ids: list[str]):
+    """Select the reports holding the latest created_at of each given farm"""
+    latest = (
+        select(FarmReport.farm_id, func.max(FarmReport.created_at).label("created_at"))
+        .where(FarmReport.farm_id.in_(farm_ids))
+        .group_by(FarmReport.farm_id)
+        .subquery()
+    )
+    return (
+        select(FarmReport)
+        .join(
+            latest,
+            (FarmReport.farm_id == latest.c.farm_id)
+            & (FarmReport.created_at == latest.c.created_at),
+        )
+        .order_by(FarmReport.id)
+    )
+
+
+def reports_query(farm_id: Optional[str] = None, product_id: Optional[str] = None):
+    """Select reports, of one farm and/or one product when given"""
+    statement = select(FarmReport)
+    if farm_id is not None:
+        statement = statement.where(FarmReport.farm_id == farm_id)
+    if product_id is not None:
+        statement = statement.where(FarmReport.product_id == product_id)
+    return statement
+
+
+def rollups_query(farm_id: str, granularity: str, start: datetime, end: datetime):
+    """Select the rollup buckets of a farm overlapping [start, end], oldest first"""
+    if granularity not in ROLLUP_GRANULARITIES:
+        raise ValueError(f"Unknown rollup granularity {granularity}")
+    return (
+        select(FarmReportRollup)
+        .where(
+            FarmReportRollup.farm_id == farm_id,
+            FarmReportRollup.granularity == granularity,
+            FarmReportRollup.bucket_start >= bucket_start(start, granularity),
+            FarmReportRollup.bucket_start <= end,
+        )
+        .order_by(FarmReportRollup.bucket_start)
+    )
 
 
 class FarmReportService:
@@ -32,6 +88,34 @@ class FarmReportService:
         db.refresh(report)
         return report
 
+    @staticmethod
+    def create_reports_bulk(db: Session, rows: list[dict]) -> int:
+        """Insert many reports in one statement and one commit, return the number inserted
+
+        Rows are dicts keyed by column name (id, farm_id, product_id, temperature,
+        humidity, water_level, light_level). Nothing is refreshed, created_at is
+        filled in by the database.
+        """
+        if not rows:
+            return 0
+        db.execute(insert(FarmReport), rows)
+        db.commit()
+        return len(rows)
+
+    @staticmethod
+    def create_reports_chunked(
+            db: Session, rows: Iterable[dict], chunk_size: int = REPORT_INSERT_CHUNK_SIZE
+    ) -> int:
+        """Insert reports from any iterable, committing every chunk_size rows
+
+        Meant for large imports, a failure leaves the chunks already committed in place.
+        """
+        rows = iter(rows)
+        total = 0
+        while chunk := list(islice(rows, chunk_size)):
+            total += FarmReportService.create_reports_bulk(db, chunk)
+        return total
+
     @staticmethod
     def get_report(db: Session, report_id: str) -> Optional[FarmReport]:
         """Get report by ID"""
@@ -40,46 +124,81 @@ class FarmReportService:
     @staticmethod
     def get_reports(db: Session, skip: int = 0, limit: int = 100) -> list[Type[FarmReport]]:
         """Get list of reports"""
-        return db.query(FarmReport).offset(skip).limit(limit).all()
+        return list(db.scalars(reports_query().offset(skip).limit(limit)))
 
     @staticmethod
     def get_reports_by_farm(
             db: Session, farm_id: str, skip: int = 0, limit: int = 100
     ) -> list[Type[FarmReport]]:
         """Get list of reports by farm"""
-        return (
-            db.query(FarmReport)
-            .filter(FarmReport.farm_id == farm_id)
-            .offset(skip)
-            .limit(limit)
-            .all()
-        )
+        return list(db.scalars(reports_query(farm_id=farm_id).offset(skip).limit(limit)))
 
     @staticmethod
     def get_reports_by_product(
             db: Session, product_id: str, skip: int = 0, limit: int = 100
     ) -> list[Type[FarmReport]]:
         """Get list of reports by product"""
-        return (
-            db.query(FarmReport)
-            .filter(FarmReport.product_id == product_id)
-            .offset(skip)
-            .limit(limit)
-            .all()
-        )
+        return list(db.scalars(reports_query(product_id=product_id).offset(skip).limit(limit)))
 
     @staticmethod
     def get_reports_by_farm_and_product(
             db: Session, farm_id: str, product_id: str, skip: int = 0, limit: int = 100
     ) -> list[Type[FarmReport]]:
         """Get list of reports by farm and product"""
-        return (
-            db.query(FarmReport)
-            .filter(FarmReport.farm_id == farm_id, FarmReport.product_id == product_id)
-            .offset(skip)
-            .limit(limit)
-            .all()
-        )
+        statement = reports_query(farm_id=farm_id, product_id=product_id)
+        return list(db.scalars(statement.offset(skip).limit(limit)))
+
+    @staticmethod
+    def get_reports_page(
+            db: Session, cursor: Optional[str] = None, limit: int = 100
+    ) -> Tuple[list[FarmReport], Optional[str]]:
+        """Get a page of reports after cursor, oldest first, and the cursor of the next page"""
+        return FarmReportService._page(db, reports_query(), cursor, limit)
+
+    @staticmethod
+    def get_reports_by_farm_page(
+            db: Session, farm_id: str, cursor: Optional[str] = None, limit: int = 100
+    ) -> Tuple[list[FarmReport], Optional[str]]:
+        """Get a page of a farm's reports after cursor, oldest first"""
+        return FarmReportService._page(db, reports_query(farm_id=farm_id), cursor, limit)
+
+    @staticmethod
+    def get_reports_by_product_page(
+            db: Session, product_id: str, cursor: Optional[str] = None, limit: int = 100
+    ) -> Tuple[list[FarmReport], Optional[str]]:
+        """Get a page of a product's reports after cursor, oldest first"""
+        return FarmReportService._page(db, reports_query(product_id=product_id), cursor, limit)
+
+    @staticmethod
+    def get_reports_by_farm_and_product_page(
+            db: Session,
+            farm_id: str,
+            product_id: str,
+            cursor: Optional[str] = None,
+            limit: int = 100,
+    ) -> Tuple[list[FarmReport], Optional[str]]:
+        """Get a page of reports of a farm and product after cursor, oldest first"""
+        statement = reports_query(farm_id=farm_id, product_id=product_id)
+        return FarmReportService._page(db, statement, cursor, limit)
+
+    @staticmethod
+    def _page(db: Session, statement, cursor: Optional[str], limit: int):
+        rows = db.scalars(keyset_select(statement, REPORT_CURSOR_COLUMNS, cursor, limit))
+        return keyset_page(rows, REPORT_CURSOR_COLUMNS, limit)
+
+    @staticmethod
+    def get_rollups(
+            db: Session, farm_id: str, granularity: str, start: datetime, end: datetime
+    ) -> list[dict]:
+        """Get hourly or daily min/max/avg/count of a farm's metrics between start and end
+
+        Buckets are maintained by ReportRollupJob and trail the newest reports by
+        up to ROLLUP_LAG_SECONDS plus one poll interval.
+        """
+        return [
+            format_rollup(rollup)
+            for rollup in db.scalars(rollups_query(farm_id, granularity, start, end))
+        ]
 
     @staticmethod
     def update_report(
@@ -124,3 +243,165 @@ class FarmReportService:
             db.delete(report)
         db.commit()
         return count
+
+
+class AsyncFarmReportService:
+    """FarmReportService for AsyncSession, used by the async routes"""
+
+    @staticmethod
+    async def create_report(
+            db: AsyncSession,
+            report_id: str,
+            farm_id: str,
+            product_id: str,
+            temperature: float,
+            humidity: float,
+            water_level: float,
+            light_level: float,
+    ) -> FarmReport:
+        """Create a new farm report"""
+        report = FarmReport(
+            id=report_id,
+            farm_id=farm_id,
+            product_id=product_id,
+            temperature=temperature,
+            humidity=humidity,
+            water_level=water_level,
+            light_level=light_level,
+        )
+        db.add(report)
+        await db.commit()
+        await db.refresh(report)
+        return report
+
+    @staticmethod
+    async def get_report(db: AsyncSession, report_id: str) -> Optional[FarmReport]:
+        """Get report by ID"""
+        return await db.get(FarmReport, report_id)
+
+    @staticmethod
+    async def get_reports(db: AsyncSession, skip: int = 0, limit: int = 100) -> list[FarmReport]:
+        """Get list of reports"""
+        return list(await db.scalars(reports_query().offset(skip).limit(limit)))
+
+    @staticmethod
+    async def get_reports_by_farm(
+            db: AsyncSession, farm_id: str, skip: int = 0, limit: int = 100
+    ) -> list[FarmReport]:
+        """Get list of reports by farm"""
+        result = await db.scalars(reports_query(farm_id=farm_id).offset(skip).limit(limit))
+        return list(result)
+
+    @staticmethod
+    async def get_reports_by_product(
+            db: AsyncSession, product_id: str, skip: int = 0, limit: int = 100
+    ) -> list[FarmReport]:
+        """Get list of reports by product"""
+        result = await db.scalars(reports_query(product_id=product_id).offset(skip).limit(limit))
+        return list(result)
+
+    @staticmethod
+    async def get_reports_by_farm_and_product(
+            db: AsyncSession, farm_id: str, product_id: str, skip: int = 0, limit: int = 100
+    ) -> list[FarmReport]:
+        """Get list of reports by farm and product"""
+        statement = reports_query(farm_id=farm_id, product_id=product_id)
+        return list(await db.scalars(statement.offset(skip).limit(limit)))
+
+    @staticmethod
+    async def get_latest_reports(db: AsyncSession, farm_ids: list[str]) -> dict[str, FarmReport]:
+        """Get the latest report of each farm in one query, keyed by farm id"""
+        if not farm_ids:
+            return {}
+        result = await db.scalars(latest_reports_query(farm_ids))
+        # Reports sharing the latest created_at resolve to the highest id
+        return {report.farm_id: report for report in result}
+
+    @staticmethod
+    async def get_reports_page(
+            db: AsyncSession, cursor: Optional[str] = None, limit: int = 100
+    ) -> Tuple[list[FarmReport], Optional[str]]:
+        """Get a page of reports after cursor, oldest first, and the cursor of the next page"""
+        return await AsyncFarmReportService._page(db, reports_query(), cursor, limit)
+
+    @staticmethod
+    async def get_reports_by_farm_page(
+            db: AsyncSession, farm_id: str, cursor: Optional[str] = None, limit: int = 100
+    ) -> Tuple[list[FarmReport], Optional[str]]:
+        """Get a page of a farm's reports after cursor, oldest first"""
+        statement = reports_query(farm_id=farm_id)
+        return await AsyncFarmReportService._page(db, statement, cursor, limit)
+
+    @staticmethod
+    async def get_reports_by_product_page(
+            db: AsyncSession, product_id: str, cursor: Optional[str] = None, limit: int = 100
+    ) -> Tuple[list[FarmReport], Optional[str]]:
+        """Get a page of a product's reports after cursor, oldest first"""
+        statement = reports_query(product_id=product_id)
+        return await AsyncFarmReportService._page(db, statement, cursor, limit)
+
+    @staticmethod
+    async def get_reports_by_farm_and_product_page(
+            db: AsyncSession,
+            farm_id: str,
+            product_id: str,
+            cursor: Optional[str] = None,
+            limit: int = 100,
+    ) -> Tuple[list[FarmReport], Optional[str]]:
+        """Get a page of reports of a farm and product after cursor, oldest first"""
+        statement = reports_query(farm_id=farm_id, product_id=product_id)
+        return await AsyncFarmReportService._page(db, statement, cursor, limit)
+
+    @staticmethod
+    async def _page(db: AsyncSession, statement, cursor: Optional[str], limit: int):
+        rows = await db.scalars(keyset_select(statement, REPORT_CURSOR_COLUMNS, cursor, limit))
+        return keyset_page(rows, REPORT_CURSOR_COLUMNS, limit)
+
+    @staticmethod
+    async def get_rollups(
+            db: AsyncSession, farm_id: str, granularity: str, start: datetime, end: datetime
+    ) -> list[dict]:
+        """Get hourly or daily min/max/avg/count of a farm's metrics between start and end"""
+        result = await db.scalars(rollups_query(farm_id, granularity, start, end))
+        return [format_rollup(rollup) for rollup in result]
+
+    @staticmethod
+    async def update_report(
+            db: AsyncSession,
+            report_id: str,
+            temperature: Optional[float] = None,
+            humidity: Optional[float] = None,
+            water_level: Optional[float] = None,
+            light_level: Optional[float] = None,
+    ) -> Optional[FarmReport]:
+        """Update farm report"""
+        report = await db.get(FarmReport, report_id)
+        if report:
+            if temperature is not None:
+                report.temperature = temperature
+            if humidity is not None:
+                report.humidity = humidity
+            if water_level is not None:
+                report.water_level = water_level
+            if light_level is not None:
+                report.light_level = light_level
+            await db.commit()
+            await db.refresh(report)
+        return report
+
+    @staticmethod
+    async def delete_report(db: AsyncSession, report_id: str) -> bool:
+        """Delete farm report"""
+        report = await db.get(FarmReport, report_id)
+        if report:
+            await db.delete(report)
+            await db.commit()
+            return True
+        return False
+
+    @staticmethod
+    async def delete_farm_reports(db: AsyncSession, farm_id: str) -> int:
+        """Delete all reports of a farm and return the number of reports deleted"""
+        result = await db.execute(delete(FarmReport).where(FarmReport.farm_id == farm_id))
+        await db.commit()
+        return result.rowcount
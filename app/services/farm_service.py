@@ -1,6 +1,11 @@
-from typing import List, Optional
+from typing import List, Optional, Tuple
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import Session
 from app.model.farm_data import Farm
+from app.services.pagination import keyset_page, keyset_select
+
+FARM_CURSOR_COLUMNS = (Farm.id,)
 
 
 class FarmService:
@@ -25,6 +30,14 @@ class FarmService:
         """Lấy danh sách tất cả nông trại"""
         return db.query(Farm).offset(skip).limit(limit).all()
 
+    @staticmethod
+    def get_farms_page(
+        db: Session, cursor: Optional[str] = None, limit: int = 100
+    ) -> Tuple[List[Farm], Optional[str]]:
+        """Lấy một trang nông trại sau cursor, kèm cursor của trang tiếp theo"""
+        rows = db.scalars(keyset_select(select(Farm), FARM_CURSOR_COLUMNS, cursor, limit))
+        return keyset_page(rows, FARM_CURSOR_COLUMNS, limit)
+
     @staticmethod
     def update_farm(
         db: Session,
@@ -52,3 +65,77 @@ class FarmService:
             db.commit()
             return True
         return False
+
+
+class AsyncFarmService:
+    """FarmService cho AsyncSession, dùng trong các route async"""
+
+    @staticmethod
+    async def create_farm(
+        db: AsyncSession, farm_id: str, name: str, description: Optional[str] = None
+    ) -> Farm:
+        """Tạo nông trại mới"""
+        farm = Farm(id=farm_id, name=name, description=description)
+        db.add(farm)
+        await db.commit()
+        await db.refresh(farm)
+        return farm
+
+    @staticmethod
+    async def get_farm(db: AsyncSession, farm_id: str) -> Optional[Farm]:
+        """Lấy thông tin nông trại theo ID"""
+        return await db.get(Farm, farm_id)
+
+    @staticmethod
+    async def get_farms(db: AsyncSession, skip: int = 0, limit: int = 100) -> List[Farm]:
+        """Lấy danh sách tất cả nông trại"""
+        result = await db.scalars(select(Farm).offset(skip).limit(limit))
+        return list(result)
+
+    @staticmethod
+    async def get_farms_page(
+        db: AsyncSession, cursor: Optional[str] = None, limit: int = 100
+    ) -> Tuple[List[Farm], Optional[str]]:
+        """Lấy một trang nông trại sau cursor, kèm cursor của trang tiếp theo"""
+        rows = await db.scalars(
+            keyset_select(select(Farm), FARM_CURSOR_COLUMNS, cursor, limit)
+        )
+        return keyset_page(rows, FARM_CURSOR_COLUMNS, limit)
+
+    @staticmethod
+    async def get_all_farms(db: AsyncSession) -> List[Farm]:
+        """Lấy toàn bộ nông trại"""
+        return list(await db.scalars(select(Farm)))
+
+    @staticmethod
+    async def get_farms_by_user(db: AsyncSession, user_id: int) -> List[Farm]:
+        """Lấy danh sách nông trại của người dùng"""
+        return list(await db.scalars(select(Farm).where(Farm.user_id == user_id)))
+
+    @staticmethod
+    async def update_farm(
+        db: AsyncSession,
+        farm_id: str,
+        name: Optional[str] = None,
+        description: Optional[str] = None,
+    ) -> Optional[Farm]:
+        """Cập nhật thông tin nông trại"""
+        farm = await db.get(Farm, farm_id)
+        if farm:
+            if name:
+                farm.name = name
+            if description is not None:
+                farm.description = description
+            await db.commit()
+            await db.refresh(farm)
+        return farm
+
+    @staticmethod
+    async def delete_farm(db: AsyncSession, farm_id: str) -> bool:
+        """Xóa nông trại"""
+        farm = await db.get(Farm, farm_id)
+        if farm:
+            await db.delete(farm)
+            await db.commit()
+            return True
+        return False
@@ -0,0 +1,299 @@
+import json
+import os
+import sqlite3
+import threading
+import time
+
+from app.config import (
+    INGESTION_QUEUE_PATH,
+    INGESTION_WORKERS,
+    INGESTION_BATCH_SIZE,
+    INGESTION_MAX_ATTEMPTS,
+)
+from app.services.blockchain import BlockchainService
+from app.model.farm_data import FarmReport
+from app.services.database import SessionLocal
+from app.services.farm_report_service import FarmReportService
+
+# How long an idle worker sleeps before checking the queue again
+IDLE_POLL_INTERVAL = 1.0
+# How long a worker backs off after a batch that made no progress
+RETRY_BACKOFF = 5.0
+# Ceiling of the per-reading backoff while the chain is unreachable
+MAX_RETRY_BACKOFF = 300.0
+
+
+class IngestionQueue:
+    """Durable SQLite-backed queue of sensor readings waiting to be written
+
+    Chain writes are at least once: a crash between broadcasting a batch and
+    mark_on_chain sends its readings again on restart. Database writes are
+    idempotent through the report IDs assigned at enqueue time.
+    """
+
+    _instance = None
+
+    def __new__(cls):
+        if cls._instance is None:
+            cls._instance = super(IngestionQueue, cls).__new__(cls)
+            cls._instance._initialize_queue()
+        return cls._instance
+
+    def _initialize_queue(self):
+        """Open the queue file and requeue readings left in progress by a crash"""
+        os.makedirs(os.path.dirname(os.path.abspath(INGESTION_QUEUE_PATH)), exist_ok=True)
+        self._local = threading.local()
+        self._claim_lock = threading.Lock()
+        self._new_items = threading.Event()
+        self._stop_event = threading.Event()
+        self._workers = []
+
+        connection = self._connection()
+        connection.execute(
+            """
+            CREATE TABLE IF NOT EXISTS ingestion_queue (
+                id INTEGER PRIMARY KEY AUTOINCREMENT,
+                payload TEXT NOT NULL,
+                status TEXT NOT NULL DEFAULT 'pending',
+                attempts INTEGER NOT NULL DEFAULT 0,
+                tx_hash TEXT,
+                last_error TEXT,
+                created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+                retries INTEGER NOT NULL DEFAULT 0,
+                next_attempt_at REAL NOT NULL DEFAULT 0
+            )
+            """
+        )
+        # Queue files created before the retry backoff lack its columns
+        columns = {row[1] for row in connection.execute("PRAGMA table_info(ingestion_queue)")}
+        if "retries" not in columns:
+            connection.execute(
+                "ALTER TABLE ingestion_queue ADD COLUMN retries INTEGER NOT NULL DEFAULT 0"
+            )
+        if "next_attempt_at" not in columns:
+            connection.execute(
+                "ALTER TABLE ingestion_queue ADD COLUMN next_attempt_at REAL NOT NULL DEFAULT 0"
+            )
+        connection.execute(
+            "CREATE INDEX IF NOT EXISTS ix_ingestion_queue_status ON ingestion_queue (status, id)"
+        )
+        # Parked readings were called failed before they got their own state
+        connection.execute("UPDATE ingestion_queue SET status = 'dead' WHERE status = 'failed'")
+        # Anything still marked processing was interrupted, replay it
+        connection.execute(
+            "UPDATE ingestion_queue SET status = 'pending' WHERE status = 'processing'"
+        )
+
+    def _connection(self):
+        """Return this thread's SQLite connection"""
+        connection = getattr(self._local, "connection", None)
+        if connection is None:
+            connection = sqlite3.connect(
+                INGESTION_QUEUE_PATH, timeout=30, isolation_level=None
+            )
+            # WAL appends + fsync on commit: durable and cheap for a write-heavy queue
+            connection.execute("PRAGMA journal_mode=WAL")
+            connection.execute("PRAGMA synchronous=FULL")
+            self._local.connection = connection
+        return connection
+
+    def enqueue(self, payload):
+        """Durably append a reading and return its queue ID"""
+        cursor = self._connection().execute(
+            "INSERT INTO ingestion_queue (payload) VALUES (?)", (json.dumps(payload),)
+        )
+        self._new_items.set()
+        return cursor.lastrowid
+
+    def claim_batch(self, limit):
+        """Mark up to limit pending readings that are due as processing and return them"""
+        connection = self._connection()
+        with self._claim_lock:
+            connection.execute("BEGIN IMMEDIATE")
+            try:
+                rows = connection.execute(
+                    "SELECT id, payload, tx_hash FROM ingestion_queue "
+                    "WHERE status = 'pending' AND next_attempt_at <= ? ORDER BY id LIMIT ?",
+                    (time.time(), limit),
+                ).fetchall()
+                if rows:
+                    connection.executemany(
+                        "UPDATE ingestion_queue SET status = 'processing' WHERE id = ?",
+                        [(row[0],) for row in rows],
+                    )
+                connection.execute("COMMIT")
+            except Exception:
+                connection.execute("ROLLBACK")
+                raise
+        return [
+            {"id": row[0], "payload": json.loads(row[1]), "tx_hash": row[2]}
+            for row in rows
+        ]
+
+    def mark_on_chain(self, item_id, tx_hash):
+        """Remember that a reading reached the chain so a retry skips that step"""
+        self._connection().execute(
+            "UPDATE ingestion_queue SET tx_hash = ? WHERE id = ?", (tx_hash, item_id)
+        )
+
+    def mark_done(self, item_ids):
+        """Remove fully processed readings from the queue"""
+        self._connection().executemany(
+            "DELETE FROM ingestion_queue WHERE id = ?", [(item_id,) for item_id in item_ids]
+        )
+
+    def mark_failed(self, item_id, error):
+        """Retry a rejected reading with backoff, or move it to the dead state after
+        INGESTION_MAX_ATTEMPTS attempts, where it stays until looked at by hand"""
+        self._connection().execute(
+            "UPDATE ingestion_queue SET attempts = attempts + 1, last_error = ?, "
+            "status = CASE WHEN attempts + 1 >= ? THEN 'dead' ELSE 'pending' END, "
+            "next_attempt_at = ? + MIN(? * (1 << MIN(attempts, 16)), ?) "
+            "WHERE id = ?",
+            (
+                error,
+                INGESTION_MAX_ATTEMPTS,
+                time.time(),
+                RETRY_BACKOFF,
+                MAX_RETRY_BACKOFF,
+                item_id,
+            ),
+        )
+
+    def mark_retry(self, item_id, error):
+        """Return a reading the chain could not take right now, with exponential backoff
+
+        Unlike mark_failed this does not use up an attempt, so readings outlive
+        a node restart however long it takes.
+        """
+        self._connection().execute(
+            "UPDATE ingestion_queue SET retries = retries + 1, last_error = ?, "
+            "status = 'pending', next_attempt_at = ? + MIN(? * (1 << MIN(retries, 16)), ?) "
+            "WHERE id = ?",
+            (error, time.time(), RETRY_BACKOFF, MAX_RETRY_BACKOFF, item_id),
+        )
+
+    def stats(self):
+        """Count queued readings by status"""
+        rows = self._connection().execute(
+            "SELECT status, COUNT(*) FROM ingestion_queue GROUP BY status"
+        ).fetchall()
+        return dict(rows)
+
+    def start(self):
+        """Start the worker pool draining the queue"""
+        if any(worker.is_alive() for worker in self._workers):
+            return
+        self._stop_event.clear()
+        self._workers = [
+            threading.Thread(
+                target=self._run_worker, name=f"ingestion-worker-{i}", daemon=True
+            )
+            for i in range(INGESTION_WORKERS)
+        ]
+        for worker in self._workers:
+            worker.start()
+
+    def stop(self):
+        """Stop the worker pool, unfinished readings are replayed on next start"""
+        self._stop_event.set()
+        self._new_items.set()
+        for worker in self._workers:
+            worker.join(timeout=5)
+
+    def _run_worker(self):
+        while not self._stop_event.is_set():
+            try:
+                items = self.claim_batch(INGESTION_BATCH_SIZE)
+            except Exception as e:
+                print(f"Error reading ingestion queue: {str(e)}")
+                items = []
+
+            if not items:
+                self._new_items.wait(IDLE_POLL_INTERVAL)
+                self._new_items.clear()
+                continue
+
+            if not self.process_batch(items):
+                self._stop_event.wait(RETRY_BACKOFF)
+
+    @staticmethod
+    def _report_row(payload):
+        return {
+            "id": payload["report_id"],
+            "farm_id": payload["farm_id"],
+            "product_id": payload["product_id"],
+            "temperature": payload["temperature"],
+            "humidity": payload["humidity"],
+            "water_level": payload["water_level"],
+            "light_level": payload["light_level"],
+        }
+
+    def _store_reports(self, db, items):
+        """Insert the reports of readings already on chain, return the processed queue ids"""
+        try:
+            # Report IDs are assigned at enqueue time, so replays are idempotent
+            report_ids = [item["payload"]["report_id"] for item in items]
+            existing = {
+                report_id
+                for (report_id,) in db.query(FarmReport.id).filter(FarmReport.id.in_(report_ids))
+            }
+            FarmReportService.create_reports_bulk(
+                db,
+                [
+                    self._report_row(item["payload"])
+                    for item in items
+                    if item["payload"]["report_id"] not in existing
+                ],
+            )
+            return [item["id"] for item in items]
+        except Exception as e:
+            db.rollback()
+            print(f"Bulk report insert failed, retrying one by one: {str(e)}")
+
+        # One insert per reading, so a single bad reading does not fail the batch
+        done = []
+        for item in items:
+            payload = item["payload"]
+            try:
+                if not FarmReportService.get_report(db, payload["report_id"]):
+                    FarmReportService.create_reports_bulk(db, [self._report_row(payload)])
+                done.append(item["id"])
+            except Exception as e:
+                db.rollback()
+                self.mark_failed(item["id"], f"Database write failed: {str(e)}")
+        return done
+
+    def process_batch(self, items):
+        """Write a batch of queued readings to the chain and the database
+
+        Returns True when at least one reading was fully processed.
+        """
+        blockchain_service = BlockchainService()
+
+        # Only send readings that have not reached the chain on an earlier attempt
+        to_send = [item for item in items if not item["tx_hash"]]
+        if to_send:
+            results = blockchain_service.store_sensor_data_batch(
+                [item["payload"] for item in to_send]
+            )
+            for item, result in zip(to_send, results):
+                if result["success"]:
+                    item["tx_hash"] = result["transaction_hash"]
+                    self.mark_on_chain(item["id"], item["tx_hash"])
+                elif result.get("retryable"):
+                    self.mark_retry(item["id"], result.get("error", "Chain unavailable"))
+                else:
+                    self.mark_failed(item["id"], result.get("error", "Chain write failed"))
+
+        on_chain = [item for item in items if item["tx_hash"]]
+        done = []
+        if on_chain:
+            db = SessionLocal()
+            try:
+                done = self._store_reports(db, on_chain)
+            finally:
+                db.close()
+
+        self.mark_done(done)
+        return bool(done)
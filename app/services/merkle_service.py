@@ -0,0 +1,286 @@
+import threading
+from datetime import datetime
+
+from eth_abi import encode as abi_encode
+from eth_utils import keccak
+from sqlalchemy import select
+
+from app.config import MERKLE_ANCHOR_INTERVAL, MERKLE_BATCH_SIZE
+from app.model.farm_data import FarmReport, MerkleBatch, MerkleLeaf
+from app.services.blockchain import BlockchainService
+from app.services.database import SessionLocal
+
+
+# Version 1 hashed "|"-joined fields and untagged pairs. Version 2 tags leaves
+# and nodes and ABI-encodes the fields, so neither can be passed off as the other
+MERKLE_HASH_VERSION = 2
+LEAF_PREFIX = b"\x00"
+NODE_PREFIX = b"\x01"
+LEAF_TYPES = ["string", "string", "string", "int256", "int256", "int256", "int256"]
+
+
+def hash_report(report) -> str:
+    """Hash the canonical form of a farm report into a Merkle leaf
+
+    The fields are ABI-encoded, like abi.encode in Solidity, with the metrics
+    in hundredths, so no two reports share an encoding.
+    """
+    encoded = abi_encode(
+        LEAF_TYPES,
+        [
+            report.id,
+            report.farm_id,
+            report.product_id,
+            round(report.temperature * 100),
+            round(report.humidity * 100),
+            round(report.water_level * 100),
+            round(report.light_level * 100),
+        ],
+    )
+    return "0x" + keccak(LEAF_PREFIX + encoded).hex()
+
+
+def _hash_pair(left: bytes, right: bytes, version: int = MERKLE_HASH_VERSION) -> bytes:
+    # Sorted pairs, so a proof is just the list of sibling hashes
+    pair = min(left, right) + max(left, right)
+    return keccak(pair) if version == 1 else keccak(NODE_PREFIX + pair)
+
+
+def build_tree(
+    leaf_hashes: list[str], version: int = MERKLE_HASH_VERSION
+) -> list[list[bytes]]:
+    """Build all levels of a Merkle tree, from the leaves up to the root"""
+    level = [bytes.fromhex(leaf[2:]) for leaf in leaf_hashes]
+    levels = [level]
+    while len(level) > 1:
+        next_level = [
+            _hash_pair(level[i], level[i + 1], version) for i in range(0, len(level) - 1, 2)
+        ]
+        # An odd node is carried up unchanged
+        if len(level) % 2:
+            next_level.append(level[-1])
+        level = next_level
+        levels.append(level)
+    return levels
+
+
+def get_proof(levels: list[list[bytes]], index: int) -> list[str]:
+    """Return the sibling hashes needed to prove the leaf at index"""
+    proof = []
+    for level in levels[:-1]:
+        sibling = index ^ 1
+        if sibling < len(level):
+            proof.append("0x" + level[sibling].hex())
+        index //= 2
+    return proof
+
+
+def verify_proof(
+    leaf_hash: str, proof: list[str], root: str, version: int = MERKLE_HASH_VERSION
+) -> bool:
+    """Check a proof produced by get_proof against a root"""
+    node = bytes.fromhex(leaf_hash[2:])
+    for sibling in proof:
+        node = _hash_pair(node, bytes.fromhex(sibling[2:]), version)
+    return "0x" + node.hex() == root
+
+
+class MerkleService:
+    @staticmethod
+    def add_leaf(db, report: FarmReport) -> MerkleLeaf:
+        """Register a stored report to be included in the next anchored batch"""
+        leaf = MerkleLeaf(
+            report_id=report.id, farm_id=report.farm_id, leaf_hash=hash_report(report)
+        )
+        db.add(leaf)
+        db.commit()
+        return leaf
+
+    @staticmethod
+    async def add_leaf_async(db, report: FarmReport) -> MerkleLeaf:
+        """Same as add_leaf, on an AsyncSession"""
+        leaf = MerkleLeaf(
+            report_id=report.id, farm_id=report.farm_id, leaf_hash=hash_report(report)
+        )
+        db.add(leaf)
+        await db.commit()
+        return leaf
+
+    @staticmethod
+    def get_proof(db, farm_id: str, report_id: str):
+        """Return the inclusion proof of a report, or None if it is unknown"""
+        leaf = db.scalar(MerkleService._leaf_query(farm_id, report_id))
+        if not leaf:
+            return None
+
+        report = db.get(FarmReport, report_id)
+        batch = db.get(MerkleBatch, leaf.batch_id) if leaf.batch_id else None
+        leaf_hashes = db.scalars(MerkleService._batch_leaves_query(batch)).all() if batch else []
+        return MerkleService._proof(leaf, report, batch, leaf_hashes)
+
+    @staticmethod
+    async def get_proof_async(db, farm_id: str, report_id: str):
+        """Same as get_proof, on an AsyncSession"""
+        leaf = await db.scalar(MerkleService._leaf_query(farm_id, report_id))
+        if not leaf:
+            return None
+
+        report = await db.get(FarmReport, report_id)
+        batch = await db.get(MerkleBatch, leaf.batch_id) if leaf.batch_id else None
+        leaf_hashes = (
+            (await db.scalars(MerkleService._batch_leaves_query(batch))).all() if batch else []
+        )
+        return MerkleService._proof(leaf, report, batch, leaf_hashes)
+
+    @staticmethod
+    def _leaf_query(farm_id: str, report_id: str):
+        return select(MerkleLeaf).where(
+            MerkleLeaf.report_id == report_id, MerkleLeaf.farm_id == farm_id
+        )
+
+    @staticmethod
+    def _batch_leaves_query(batch: MerkleBatch):
+        return (
+            select(MerkleLeaf.leaf_hash)
+            .where(MerkleLeaf.batch_id == batch.id)
+            .order_by(MerkleLeaf.leaf_index)
+        )
+
+    @staticmethod
+    def _proof(leaf: MerkleLeaf, report, batch, leaf_hashes: list[str]) -> dict:
+        result = {
+            "report": {
+                "id": report.id,
+                "farm_id": report.farm_id,
+                "product_id": report.product_id,
+                "temperature": report.temperature,
+                "humidity": report.humidity,
+                "water_level": report.water_level,
+                "light_level": report.light_level,
+            }
+            if report
+            else None,
+            "leaf": leaf.leaf_hash,
+            "anchored": False,
+        }
+        if not batch:
+            return result
+
+        result.update(
+            {
+                "proof": get_proof(
+                    build_tree(leaf_hashes, batch.hash_version), leaf.leaf_index
+                ),
+                "hash_version": batch.hash_version,
+                "root": batch.root,
+                "leaf_index": leaf.leaf_index,
+                "batch_id": batch.id,
+                "anchor_id": batch.anchor_id,
+                "transaction_hash": batch.tx_hash,
+                "anchored": batch.anchored_at is not None,
+            }
+        )
+        return result
+
+
+class MerkleAnchorService:
+    _instance = None
+
+    def __new__(cls):
+        if cls._instance is None:
+            cls._instance = super(MerkleAnchorService, cls).__new__(cls)
+            cls._instance._stop_event = threading.Event()
+            cls._instance._thread = None
+        return cls._instance
+
+    def start(self):
+        """Start the periodic anchoring thread"""
+        if self._thread and self._thread.is_alive():
+            return
+        self._stop_event.clear()
+        self._thread = threading.Thread(
+            target=self._run, name="merkle-anchor", daemon=True
+        )
+        self._thread.start()
+
+    def stop(self):
+        """Stop the periodic anchoring thread"""
+        self._stop_event.set()
+        if self._thread:
+            self._thread.join(timeout=5)
+
+    def _run(self):
+        while not self._stop_event.wait(MERKLE_ANCHOR_INTERVAL):
+            try:
+                self.anchor_pending()
+            except Exception as e:
+                print(f"Error anchoring Merkle batches: {str(e)}")
+
+    def anchor_pending(self):
+        """Group unbatched leaves into batches and anchor every unanchored root"""
+        db = SessionLocal()
+        try:
+            while self._create_batch(db):
+                pass
+
+            blockchain_service = BlockchainService()
+            while True:
+                # Locked until committed, so another worker skips this batch
+                # instead of anchoring its root a second time
+                batch = (
+                    db.query(MerkleBatch)
+                    .filter(MerkleBatch.anchored_at.is_(None))
+                    .order_by(MerkleBatch.id)
+                    .with_for_update(skip_locked=True)
+                    .first()
+                )
+                if batch is None:
+                    break
+                anchored = blockchain_service.anchor_merkle_root(
+                    batch.root, batch.leaf_count
+                )
+                if not anchored:
+                    # Leave it for the next run
+                    db.rollback()
+                    break
+                batch.tx_hash, batch.anchor_id = anchored
+                batch.anchored_at = datetime.now()
+                db.commit()
+        except Exception:
+            db.rollback()
+            raise
+        finally:
+            db.close()
+
+    @staticmethod
+    def _create_batch(db) -> bool:
+        """Freeze up to MERKLE_BATCH_SIZE pending leaves into a new batch
+
+        The leaves stay locked until the batch is committed, so two workers
+        never put the same leaf into two batches.
+        """
+        leaves = (
+            db.query(MerkleLeaf)
+            .filter(MerkleLeaf.batch_id.is_(None))
+            .order_by(MerkleLeaf.created_at, MerkleLeaf.report_id)
+            .limit(MERKLE_BATCH_SIZE)
+            .with_for_update(skip_locked=True)
+            .all()
+        )
+        if not leaves:
+            db.rollback()
+            return False
+
+        levels = build_tree([leaf.leaf_hash for leaf in leaves])
+        batch = MerkleBatch(
+            root="0x" + levels[-1][0].hex(),
+            leaf_count=len(leaves),
+            hash_version=MERKLE_HASH_VERSION,
+        )
+        db.add(batch)
+        db.flush()
+        for index, leaf in enumerate(leaves):
+            leaf.batch_id = batch.id
+            leaf.leaf_index = index
+        db.commit()
+        return True
@@ -0,0 +1,79 @@
+import threading
+
+
+class NonceManager:
+    """Hand out transaction nonces for one account without asking the node each time"""
+
+    _managers = {}
+    _managers_lock = threading.Lock()
+
+    @classmethod
+    def for_address(cls, address):
+        """Return the process-wide manager of an account, shared by sync and async services"""
+        with cls._managers_lock:
+            if address not in cls._managers:
+                cls._managers[address] = cls(address)
+            return cls._managers[address]
+
+    def __init__(self, address):
+        self.address = address
+        self._lock = threading.Lock()
+        self._next_nonce = None
+        # Nonces handed out whose transaction is still being signed and sent
+        self._in_flight = 0
+        self._resync_pending = False
+
+    def allocate(self, web3):
+        """Reserve the next nonce, seeding from the node's pending count on first use
+
+        Every allocated nonce must be handed back with release() once its
+        transaction was sent or given up.
+        """
+        nonce = self._take()
+        while nonce is None:
+            self._seed(web3.eth.get_transaction_count(self.address, "pending"))
+            nonce = self._take()
+        return nonce
+
+    async def allocate_async(self, web3):
+        """Same as allocate, for an AsyncWeb3 client"""
+        nonce = self._take()
+        while nonce is None:
+            self._seed(await web3.eth.get_transaction_count(self.address, "pending"))
+            nonce = self._take()
+        return nonce
+
+    def release(self):
+        """Mark the send of an allocated nonce as finished, whether it succeeded or not"""
+        with self._lock:
+            self._in_flight -= 1
+            if self._in_flight == 0 and self._resync_pending:
+                self._next_nonce = None
+                self._resync_pending = False
+
+    def resync(self):
+        """Re-read the counter from the node once no allocated nonce is in flight
+
+        Resetting while other sends are in flight would hand their nonces out a
+        second time, so the reset waits for the last of them to be released.
+        """
+        with self._lock:
+            if self._in_flight:
+                self._resync_pending = True
+            else:
+                self._next_nonce = None
+
+    def _seed(self, nonce):
+        with self._lock:
+            # Another caller may have seeded the counter while we were fetching
+            if self._next_nonce is None:
+                self._next_nonce = nonce
+
+    def _take(self):
+        with self._lock:
+            if self._next_nonce is None:
+                return None
+            nonce = self._next_nonce
+            self._next_nonce += 1
+            self._in_flight += 1
+            return nonce
@@ -0,0 +1,71 @@
+import base64
+import json
+from datetime import datetime
+
+from sqlalchemy import DateTime, and_, or_
+
+
+class InvalidCursor(ValueError):
+    """Raised for a cursor token that was not produced by encode_cursor"""
+
+
+def encode_cursor(item, columns) -> str:
+    """Opaque token holding the sort key of the last item of a page"""
+    values = []
+    for column in columns:
+        value = getattr(item, column.key)
+        values.append(value.isoformat() if isinstance(value, datetime) else value)
+    raw = json.dumps(values, separators=(",", ":")).encode()
+    return base64.urlsafe_b64encode(raw).decode().rstrip("=")
+
+
+def decode_cursor(token: str, columns) -> list:
+    """Sort key values of a token, typed after the columns they belong to"""
+    try:
+        raw = base64.urlsafe_b64decode(token + "=" * (-len(token) % 4))
+        values = json.loads(raw)
+        if not isinstance(values, list) or len(values) != len(columns):
+            raise InvalidCursor("Invalid cursor")
+        return [
+            datetime.fromisoformat(value) if isinstance(column.type, DateTime) else value
+            for column, value in zip(columns, values)
+        ]
+    except InvalidCursor:
+        raise
+    except (ValueError, TypeError) as e:
+        # binascii, JSON and datetime parsing errors are all ValueErrors
+        raise InvalidCursor("Invalid cursor") from e
+
+
+def keyset_select(statement, columns, cursor=None, limit=100):
+    """Restrict a select to the page after cursor, ordered by columns
+
+    The columns must identify a row uniquely, the last one usually being the
+    primary key. Rows past the cursor are found through the index on the
+    columns rather than by skipping an offset, so every page costs the same.
+    One row more than limit is fetched to tell whether a next page exists.
+    """
+    if cursor:
+        values = decode_cursor(cursor, columns)
+        # (a, b) > (x, y) spelled out, MySQL only uses the index for this form
+        statement = statement.where(
+            or_(
+                *[
+                    and_(
+                        *[column == value for column, value in zip(columns[:i], values[:i])],
+                        columns[i] > values[i],
+                    )
+                    for i in range(len(columns))
+                ]
+            )
+        )
+    return statement.order_by(*columns).limit(limit + 1)
+
+
+def keyset_page(rows, columns, limit):
+    """Split the rows of keyset_select into (items, next_cursor), next_cursor None on the last page"""
+    rows = list(rows)
+    if len(rows) <= limit:
+        return rows, None
+    items = rows[:limit]
+    return items, encode_cursor(items[-1], columns)
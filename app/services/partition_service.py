@@ -0,0 +1,167 @@
+from datetime import date, datetime
+
+from app.config import (
+    REPORT_PARTITION_MONTHS_AHEAD,
+    REPORT_RETENTION_ACTION,
+    REPORT_RETENTION_MONTHS,
+)
+from app.services.database import engine
+
+REPORTS_TABLE = "farm_reports"
+# Catch-all partition above the monthly ones, so inserts never miss a partition
+OVERFLOW_PARTITION = "pmax"
+RETENTION_ACTIONS = ("archive", "drop")
+
+
+def add_months(month: date, count: int) -> date:
+    """First day of the month count months after (or before) month"""
+    index = month.year * 12 + month.month - 1 + count
+    return date(index // 12, index % 12 + 1, 1)
+
+
+def partition_name(month: date) -> str:
+    return f"p{month:%Y%m}"
+
+
+def partition_clause(month: date) -> str:
+    """Definition of the partition holding the reports of one month"""
+    return f"PARTITION {partition_name(month)} VALUES LESS THAN ('{add_months(month, 1)}')"
+
+
+class ReportPartitionService:
+    """Keeps the monthly RANGE partitions of farm_reports ahead of time and applies retention
+
+    Partition pYYYYMM holds reports created before the first day of the next
+    month, pmax catches anything past the last monthly partition. Expired
+    months are removed whole with DROP PARTITION, or first swapped into a
+    standalone archive table with EXCHANGE PARTITION.
+    """
+
+    @staticmethod
+    def list_partitions(conn):
+        """Return [{name, upper_bound, rows}] in partition order, upper_bound None for pmax"""
+        result = conn.exec_driver_sql(
+            "SELECT PARTITION_NAME, PARTITION_DESCRIPTION, TABLE_ROWS "
+            "FROM information_schema.PARTITIONS "
+            "WHERE TABLE_SCHEMA = DATABASE() AND TABLE_NAME = %s "
+            "ORDER BY PARTITION_ORDINAL_POSITION",
+            (REPORTS_TABLE,),
+        ).all()
+        if not result or result[0][0] is None:
+            raise RuntimeError(
+                f"{REPORTS_TABLE} is not partitioned, run the database migrations first"
+            )
+        partitions = []
+        for name, description, rows in result:
+            upper_bound = None
+            if description != "MAXVALUE":
+                upper_bound = datetime.fromisoformat(description.strip("'")).date()
+            partitions.append({"name": name, "upper_bound": upper_bound, "rows": rows})
+        return partitions
+
+    @staticmethod
+    def plan(partitions, today, months_ahead, retention_months):
+        """Return the months to create and the partitions past retention"""
+        current_month = today.replace(day=1)
+        bounds = [p["upper_bound"] for p in partitions if p["upper_bound"]]
+        # The month starting at the highest bound is the first one not covered yet
+        month = max(bounds) if bounds else current_month
+        create = []
+        while month <= add_months(current_month, months_ahead):
+            create.append(month)
+            month = add_months(month, 1)
+
+        expire = []
+        if retention_months > 0:
+            cutoff = add_months(current_month, -retention_months)
+            expire = [
+                p for p in partitions if p["upper_bound"] and p["upper_bound"] <= cutoff
+            ]
+        return create, expire
+
+    @staticmethod
+    def archive_statements(conn, partition, archive_table):
+        """Return the statements swapping an expired partition into archive_table
+
+        A run interrupted part way leaves the archive table behind, so steps an
+        earlier run already took are skipped. An archive table holding rows was
+        already exchanged, exchanging it again would swap its rows back into the
+        partition about to be dropped.
+        """
+        # No row: no such table, PARTITION_NAME None: created and unpartitioned
+        existing = conn.exec_driver_sql(
+            "SELECT PARTITION_NAME FROM information_schema.PARTITIONS "
+            "WHERE TABLE_SCHEMA = DATABASE() AND TABLE_NAME = %s LIMIT 1",
+            (archive_table,),
+        ).first()
+        statements = []
+        if existing is None:
+            statements.append(f"CREATE TABLE IF NOT EXISTS {archive_table} LIKE {REPORTS_TABLE}")
+        if existing is None or existing[0] is not None:
+            statements.append(f"ALTER TABLE {archive_table} REMOVE PARTITIONING")
+        elif conn.exec_driver_sql(f"SELECT 1 FROM {archive_table} LIMIT 1").first():
+            if conn.exec_driver_sql(
+                f"SELECT 1 FROM {REPORTS_TABLE} PARTITION ({partition}) LIMIT 1"
+            ).first():
+                raise RuntimeError(
+                    f"Both {archive_table} and partition {partition} hold rows, "
+                    f"merge them before expiring {partition}"
+                )
+            return statements
+        statements.append(
+            f"ALTER TABLE {REPORTS_TABLE} EXCHANGE PARTITION {partition} WITH TABLE {archive_table}"
+        )
+        return statements
+
+    def run(
+        self,
+        months_ahead=REPORT_PARTITION_MONTHS_AHEAD,
+        retention_months=REPORT_RETENTION_MONTHS,
+        action=REPORT_RETENTION_ACTION,
+        dry_run=False,
+        today=None,
+    ):
+        """Create upcoming partitions and expire old ones, return what was (or would be) done"""
+        if action not in RETENTION_ACTIONS:
+            raise ValueError(f"Unknown retention action {action}")
+
+        with engine.connect() as conn:
+            partitions = self.list_partitions(conn)
+            create, expire = self.plan(
+                partitions, today or date.today(), months_ahead, retention_months
+            )
+
+            statements = []
+            if create:
+                definitions = ", ".join(partition_clause(month) for month in create)
+                statements.append(
+                    f"ALTER TABLE {REPORTS_TABLE} REORGANIZE PARTITION {OVERFLOW_PARTITION} "
+                    f"INTO ({definitions}, "
+                    f"PARTITION {OVERFLOW_PARTITION} VALUES LESS THAN (MAXVALUE))"
+                )
+            archived = []
+            for partition in expire:
+                if action == "archive":
+                    archive_table = f"{REPORTS_TABLE}_archive_{partition['name'][1:]}"
+                    statements.extend(
+                        self.archive_statements(conn, partition["name"], archive_table)
+                    )
+                    archived.append(archive_table)
+                statements.append(
+                    f"ALTER TABLE {REPORTS_TABLE} DROP PARTITION {partition['name']}"
+                )
+
+            if not dry_run:
+                # MySQL commits DDL implicitly, each statement stands on its own
+                for statement in statements:
+                    print(f"Running: {statement}")
+                    conn.exec_driver_sql(statement)
+
+        return {
+            "dry_run": dry_run,
+            "created": [partition_name(month) for month in create],
+            "expired": [partition["name"] for partition in expire],
+            "expired_rows": sum(partition["rows"] or 0 for partition in expire),
+            "archive_tables": archived,
+            "statements": statements,
+        }
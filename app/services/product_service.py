@@ -1,6 +1,11 @@
-from typing import List, Optional
+from typing import List, Optional, Tuple
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import Session
 from app.model.farm_data import Product
+from app.services.pagination import keyset_page, keyset_select
+
+PRODUCT_CURSOR_COLUMNS = (Product.id,)
 
 
 class ProductService:
@@ -44,6 +49,20 @@ class ProductService:
             .all()
         )
 
+    @staticmethod
+    def get_products_page(
+        db: Session,
+        cursor: Optional[str] = None,
+        limit: int = 100,
+        is_harvested: Optional[bool] = None,
+    ) -> Tuple[List[Product], Optional[str]]:
+        """Lấy một trang sản phẩm sau cursor, có thể lọc theo trạng thái thu hoạch"""
+        statement = select(Product)
+        if is_harvested is not None:
+            statement = statement.where(Product.is_harvested == is_harvested)
+        rows = db.scalars(keyset_select(statement, PRODUCT_CURSOR_COLUMNS, cursor, limit))
+        return keyset_page(rows, PRODUCT_CURSOR_COLUMNS, limit)
+
     @staticmethod
     def update_product(
         db: Session,
@@ -86,3 +105,113 @@ class ProductService:
             db.commit()
             return True
         return False
+
+
+class AsyncProductService:
+    """ProductService cho AsyncSession, dùng trong các route async"""
+
+    @staticmethod
+    async def create_product(
+        db: AsyncSession,
+        product_id: str,
+        name: str,
+        description: Optional[str] = None,
+        is_harvested: bool = False,
+    ) -> Product:
+        """Tạo sản phẩm mới"""
+        product = Product(
+            id=product_id, name=name, description=description, is_harvested=is_harvested
+        )
+        db.add(product)
+        await db.commit()
+        await db.refresh(product)
+        return product
+
+    @staticmethod
+    async def get_product(db: AsyncSession, product_id: str) -> Optional[Product]:
+        """Lấy thông tin sản phẩm theo ID"""
+        return await db.get(Product, product_id)
+
+    @staticmethod
+    async def get_products_by_ids(db: AsyncSession, product_ids: List[str]) -> List[Product]:
+        """Lấy nhiều sản phẩm theo danh sách ID trong một truy vấn"""
+        if not product_ids:
+            return []
+        return list(await db.scalars(select(Product).where(Product.id.in_(product_ids))))
+
+    @staticmethod
+    async def get_products(db: AsyncSession, skip: int = 0, limit: int = 100) -> List[Product]:
+        """Lấy danh sách tất cả sản phẩm"""
+        return list(await db.scalars(select(Product).offset(skip).limit(limit)))
+
+    @staticmethod
+    async def get_harvested_products(
+        db: AsyncSession, is_harvested: bool = True, skip: int = 0, limit: int = 100
+    ) -> List[Product]:
+        """Lấy danh sách sản phẩm theo trạng thái thu hoạch"""
+        result = await db.scalars(
+            select(Product)
+            .where(Product.is_harvested == is_harvested)
+            .offset(skip)
+            .limit(limit)
+        )
+        return list(result)
+
+    @staticmethod
+    async def get_products_page(
+        db: AsyncSession,
+        cursor: Optional[str] = None,
+        limit: int = 100,
+        is_harvested: Optional[bool] = None,
+    ) -> Tuple[List[Product], Optional[str]]:
+        """Lấy một trang sản phẩm sau cursor, có thể lọc theo trạng thái thu hoạch"""
+        statement = select(Product)
+        if is_harvested is not None:
+            statement = statement.where(Product.is_harvested == is_harvested)
+        rows = await db.scalars(
+            keyset_select(statement, PRODUCT_CURSOR_COLUMNS, cursor, limit)
+        )
+        return keyset_page(rows, PRODUCT_CURSOR_COLUMNS, limit)
+
+    @staticmethod
+    async def update_product(
+        db: AsyncSession,
+        product_id: str,
+        name: Optional[str] = None,
+        description: Optional[str] = None,
+        is_harvested: Optional[bool] = None,
+    ) -> Optional[Product]:
+        """Cập nhật thông tin sản phẩm"""
+        product = await db.get(Product, product_id)
+        if product:
+            if name:
+                product.name = name
+            if description is not None:
+                product.description = description
+            if is_harvested is not None:
+                product.is_harvested = is_harvested
+            await db.commit()
+            await db.refresh(product)
+        return product
+
+    @staticmethod
+    async def update_product_harvest_status(
+        db: AsyncSession, product_id: str, is_harvested: bool
+    ) -> Optional[Product]:
+        """Cập nhật trạng thái thu hoạch của sản phẩm"""
+        product = await db.get(Product, product_id)
+        if product:
+            product.is_harvested = is_harvested
+            await db.commit()
+            await db.refresh(product)
+        return product
+
+    @staticmethod
+    async def delete_product(db: AsyncSession, product_id: str) -> bool:
+        """Xóa sản phẩm"""
+        product = await db.get(Product, product_id)
+        if product:
+            await db.delete(product)
+            await db.commit()
+            return True
+        return False
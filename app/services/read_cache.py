@@ -0,0 +1,173 @@
+import threading
+from collections import OrderedDict
+
+from app.config import READ_CACHE_SIZE
+
+
+class SensorDataCache:
+    """Size-bounded LRU cache of decoded sensor data reads
+
+    Keys are (kind, farm_id, *args), farm_id is None for reads spanning every
+    farm. Each entry remembers the block it was read at. The cache only serves
+    entries while a BlockTracker is running, since that is what invalidates a
+    farm when a new block stores data for it. Cached values are shared between
+    callers and must be treated as read-only.
+    """
+
+    _instance = None
+
+    def __new__(cls):
+        if cls._instance is None:
+            cls._instance = super(SensorDataCache, cls).__new__(cls)
+            cls._instance._initialize_cache()
+        return cls._instance
+
+    def _initialize_cache(self):
+        self.max_size = READ_CACHE_SIZE
+        self.active = False
+        self.latest_block = None
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+        # Bumped on every invalidation so a load that raced with it is not stored
+        self._generation = 0
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.invalidations = 0
+
+    @property
+    def enabled(self):
+        return self.active and self.max_size > 0
+
+    def lookup(self, key):
+        """Return (True, value) for a cached read, (False, generation) otherwise
+
+        The generation has to be passed back to store() once the read is loaded.
+        """
+        with self._lock:
+            if key in self._entries:
+                self._entries.move_to_end(key)
+                self.hits += 1
+                return True, self._entries[key][0]
+            self.misses += 1
+            return False, self._generation
+
+    def store(self, key, value, generation):
+        """Cache a loaded read unless the cache was invalidated while loading it"""
+        with self._lock:
+            if generation != self._generation:
+                return
+            self._entries[key] = (value, self.latest_block)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_size:
+                self._entries.popitem(last=False)
+                self.evictions += 1
+
+    def get_or_load(self, key, loader):
+        """Return a cached read or call loader and cache its result"""
+        if not self.enabled:
+            return loader()
+        hit, value = self.lookup(key)
+        if hit:
+            return value
+        result = loader()
+        # None means the read failed or found nothing, try again next time
+        if result is not None:
+            self.store(key, result, value)
+        return result
+
+    async def get_or_load_async(self, key, loader):
+        """Same as get_or_load, for a coroutine function loader"""
+        if not self.enabled:
+            return await loader()
+        hit, value = self.lookup(key)
+        if hit:
+            return value
+        result = await loader()
+        if result is not None:
+            self.store(key, result, value)
+        return result
+
+    def get_or_load_many(self, keys, loader):
+        """Return cached reads for a {name: key} mapping, loading the misses in one call
+
+        loader receives the list of missed names and returns {name: value}, or
+        None when the reads failed.
+        """
+        results, generations = self._lookup_many(keys)
+        if generations:
+            loaded = loader(list(generations))
+            if loaded is None:
+                return None
+            self._store_many(keys, loaded, generations, results)
+        return results
+
+    async def get_or_load_many_async(self, keys, loader):
+        """Same as get_or_load_many, for a coroutine function loader"""
+        results, generations = self._lookup_many(keys)
+        if generations:
+            loaded = await loader(list(generations))
+            if loaded is None:
+                return None
+            self._store_many(keys, loaded, generations, results)
+        return results
+
+    def _lookup_many(self, keys):
+        results = {}
+        generations = {}
+        for name, key in keys.items():
+            if self.enabled:
+                hit, value = self.lookup(key)
+                if hit:
+                    results[name] = value
+                    continue
+                generations[name] = value
+            else:
+                generations[name] = None
+        return results, generations
+
+    def _store_many(self, keys, loaded, generations, results):
+        for name, value in loaded.items():
+            results[name] = value
+            if self.enabled and value is not None:
+                self.store(keys[name], value, generations[name])
+
+    def invalidate_farms(self, farm_ids):
+        """Drop cached reads of the given farms and every cross-farm read"""
+        farm_ids = set(farm_ids)
+        if not farm_ids:
+            return
+        with self._lock:
+            self._generation += 1
+            self.invalidations += 1
+            stale = [
+                key for key in self._entries if key[1] is None or key[1] in farm_ids
+            ]
+            for key in stale:
+                del self._entries[key]
+
+    def invalidate_farm(self, farm_id):
+        self.invalidate_farms([farm_id])
+
+    def clear(self):
+        """Drop every cached read"""
+        with self._lock:
+            self._generation += 1
+            self.invalidations += 1
+            self._entries.clear()
+
+    def stats(self):
+        """Return hit/miss counters and occupancy"""
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "enabled": self.enabled,
+                "size": len(self._entries),
+                "max_size": self.max_size,
+                "latest_block": self.latest_block,
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_rate": round(self.hits / lookups, 4) if lookups else None,
+                "evictions": self.evictions,
+                "invalidations": self.invalidations,
+            }
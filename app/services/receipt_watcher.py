@@ -0,0 +1,111 @@
+import threading
+import time
+from collections import OrderedDict
+
+from app.config import RECEIPT_POLL_INTERVAL, RECEIPT_TIMEOUT
+from app.services.blockchain import BlockchainService
+from app.services.read_cache import SensorDataCache
+
+# Keep results of finished transactions around for status lookups
+MAX_FINISHED_TRANSACTIONS = 10000
+
+
+class ReceiptWatcher:
+    _instance = None
+
+    def __new__(cls):
+        if cls._instance is None:
+            cls._instance = super(ReceiptWatcher, cls).__new__(cls)
+            cls._instance._initialize_watcher()
+        return cls._instance
+
+    def _initialize_watcher(self):
+        """Initialize watcher state"""
+        self.blockchain_service = BlockchainService()
+        self._lock = threading.Lock()
+        self._pending = {}
+        self._finished = OrderedDict()
+        self._stop_event = threading.Event()
+        self._thread = None
+
+    def start(self):
+        """Start the background polling thread"""
+        if self._thread and self._thread.is_alive():
+            return
+        self._stop_event.clear()
+        self._thread = threading.Thread(
+            target=self._run, name="receipt-watcher", daemon=True
+        )
+        self._thread.start()
+
+    def stop(self):
+        """Stop the background polling thread"""
+        self._stop_event.set()
+        if self._thread:
+            self._thread.join(timeout=RECEIPT_POLL_INTERVAL * 2)
+
+    def track(self, tx_hash, farm_id=None):
+        """Register a broadcast transaction to be confirmed in the background
+
+        When farm_id is given, its cached reads are invalidated once the
+        transaction is mined.
+        """
+        with self._lock:
+            self._pending[tx_hash] = {
+                "status": "pending",
+                "block_number": None,
+                "submitted_at": time.time(),
+                "farm_id": farm_id,
+            }
+
+    def get_status(self, tx_hash):
+        """Return the known status of a tracked transaction, or None"""
+        with self._lock:
+            status = self._pending.get(tx_hash) or self._finished.get(tx_hash)
+            return dict(status) if status else None
+
+    def _run(self):
+        while not self._stop_event.wait(RECEIPT_POLL_INTERVAL):
+            try:
+                self.check_pending()
+            except Exception as e:
+                print(f"Error checking transaction receipts: {str(e)}")
+
+    def check_pending(self):
+        """Look up receipts of every pending transaction in one batch"""
+        with self._lock:
+            tx_hashes = list(self._pending.keys())
+        if not tx_hashes:
+            return
+
+        statuses = self.blockchain_service.get_transaction_statuses(tx_hashes)
+        now = time.time()
+
+        dropped = False
+        mined_farms = set()
+        with self._lock:
+            for tx_hash in tx_hashes:
+                entry = self._pending.get(tx_hash)
+                if entry is None:
+                    continue
+                status = statuses.get(tx_hash, {"status": "pending"})
+                if status["status"] == "pending":
+                    if now - entry["submitted_at"] < RECEIPT_TIMEOUT:
+                        continue
+                    # Never mined within the timeout, the node probably dropped it
+                    status = {"status": "failed", "block_number": None}
+                    dropped = True
+
+                entry.update(status)
+                if status["status"] == "mined" and entry["farm_id"]:
+                    mined_farms.add(entry["farm_id"])
+                self._finished[tx_hash] = self._pending.pop(tx_hash)
+
+            while len(self._finished) > MAX_FINISHED_TRANSACTIONS:
+                self._finished.popitem(last=False)
+
+        SensorDataCache().invalidate_farms(mined_farms)
+
+        if dropped:
+            # A dropped transaction leaves a nonce gap in its account's lane
+            self.blockchain_service.signer_pool.resync_all()
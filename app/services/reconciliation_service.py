@@ -0,0 +1,271 @@
+import threading
+import time
+from collections import Counter
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timedelta
+
+from sqlalchemy import func, select
+
+from app.config import (
+    MAX_PAGE_SIZE,
+    RECONCILE_WORKERS,
+    RECONCILE_GRACE_SECONDS,
+    RECONCILE_SAMPLE_SIZE,
+    RECONCILE_SKEW_SECONDS,
+)
+from app.model.farm_data import Farm, FarmReport, MerkleLeaf
+from app.services.blockchain import BlockchainService
+from app.services.database import SessionLocal
+from app.services.farm_report_service import FarmReportService
+from app.utils import generate_random_report_id
+
+
+def report_key(product_id, temperature_centi, humidity, water_level, light_level):
+    """Normalize a reading the way it is stored on chain, so both sides compare equal"""
+    return (
+        product_id or "",
+        temperature_centi,
+        int(humidity),
+        int(water_level),
+        int(light_level),
+    )
+
+
+def diff_readings(db_readings, db_late, chain_readings, chain_late):
+    """Multiset diff of a farm's two histories, return (missing_on_chain, missing_in_db)
+
+    db_readings maps each key to the ids of reports older than the cutoff and
+    chain_readings counts the on-chain keys older than it. db_late and
+    chain_late count what lies between the cutoff and cutoff + skew. Those are
+    not checked themselves, but they still match readings of the other side,
+    which keeps a reading written on both sides but stamped either side of the
+    cutoff from being reported missing.
+    """
+    missing_on_chain = []
+    for key, report_ids in db_readings.items():
+        surplus = len(report_ids) - chain_readings.get(key, 0) - chain_late.get(key, 0)
+        if surplus > 0:
+            missing_on_chain.extend(report_ids[-surplus:])
+    missing_in_db = []
+    for key, count in chain_readings.items():
+        surplus = count - len(db_readings.get(key, ())) - db_late.get(key, 0)
+        missing_in_db.extend([key] * max(0, surplus))
+    return missing_on_chain, missing_in_db
+
+
+def _key_to_reading(farm_id, key):
+    product_id, temperature, humidity, water_level, light_level = key
+    return {
+        "farm_id": farm_id,
+        "product_id": product_id,
+        "temperature": temperature / 100,
+        "humidity": humidity,
+        "water_level": water_level,
+        "light_level": light_level,
+    }
+
+
+class ReconciliationService:
+    """Compares farm_reports with the on-chain history of each farm
+
+    Readings carry no shared id, so each farm's two histories are compared as
+    multisets of (product, temperature, humidity, water level, light level).
+    Reports anchored through Merkle batches are not stored per reading on chain
+    and are left out, as is anything newer than RECONCILE_GRACE_SECONDS. Each
+    side is checked against RECONCILE_SKEW_SECONDS more of the other, since a
+    report's created_at and its block timestamp never quite agree.
+    """
+
+    _instance = None
+
+    def __new__(cls):
+        if cls._instance is None:
+            cls._instance = super(ReconciliationService, cls).__new__(cls)
+            cls._instance._lock = threading.Lock()
+            cls._instance._thread = None
+            cls._instance.last_report = None
+        return cls._instance
+
+    @property
+    def running(self):
+        return bool(self._thread and self._thread.is_alive())
+
+    def start(self, farm_ids=None, repair=False):
+        """Run a reconciliation in the background, return False if one is already running"""
+        with self._lock:
+            if self.running:
+                return False
+            self._thread = threading.Thread(
+                target=self.run,
+                args=(farm_ids, repair),
+                name="reconciliation",
+                daemon=True,
+            )
+            self._thread.start()
+            return True
+
+    def run(self, farm_ids=None, repair=False, workers=RECONCILE_WORKERS):
+        """Reconcile the given farms (all farms by default) and return the diff report"""
+        started = time.perf_counter()
+        blockchain_service = BlockchainService()
+        if farm_ids is None:
+            farm_ids = self.list_farm_ids(blockchain_service)
+
+        with ThreadPoolExecutor(max_workers=max(1, workers)) as executor:
+            results = list(
+                executor.map(lambda farm_id: self.reconcile_farm(farm_id, repair), farm_ids)
+            )
+
+        drifted = [result for result in results if result["status"] != "ok"]
+        report = {
+            "started_at": datetime.now().isoformat(timespec="seconds"),
+            "duration_seconds": round(time.perf_counter() - started, 2),
+            "repair": repair,
+            "farms_checked": len(results),
+            "farms_with_drift": sum(result["status"] == "drift" for result in results),
+            "farms_failed": sum(result["status"] == "error" for result in results),
+            "missing_on_chain": sum(result["missing_on_chain"] for result in results),
+            "missing_in_db": sum(result["missing_in_db"] for result in results),
+            "farms": drifted,
+        }
+        self.last_report = report
+        return report
+
+    @staticmethod
+    def list_farm_ids(blockchain_service):
+        """Farm ids known to the database or the contract"""
+        db = SessionLocal()
+        try:
+            farm_ids = {farm_id for (farm_id,) in db.query(Farm.id).all()}
+            farm_ids.update(
+                farm_id for (farm_id,) in db.query(FarmReport.farm_id).distinct().all()
+            )
+        finally:
+            db.close()
+        farm_ids.update(blockchain_service.get_chain_farm_ids())
+        return sorted(farm_ids)
+
+    def reconcile_farm(self, farm_id, repair=False):
+        """Diff one farm's reports against its on-chain readings"""
+        result = {
+            "farm_id": farm_id,
+            "status": "ok",
+            "db_count": 0,
+            "chain_count": 0,
+            "missing_on_chain": 0,
+            "missing_in_db": 0,
+        }
+        db = SessionLocal()
+        try:
+            # created_at is set by the database clock, block timestamps by the node's
+            db_cutoff = db.scalar(select(func.current_timestamp())) - timedelta(
+                seconds=RECONCILE_GRACE_SECONDS
+            )
+            chain_cutoff = int(time.time()) - RECONCILE_GRACE_SECONDS
+            skew = timedelta(seconds=RECONCILE_SKEW_SECONDS)
+
+            # Report ids per normalized reading, read in pages
+            db_readings = {}
+            db_late = Counter()
+            anchored = db.query(MerkleLeaf.report_id).filter(MerkleLeaf.farm_id == farm_id)
+            query = (
+                db.query(FarmReport)
+                .filter(
+                    FarmReport.farm_id == farm_id,
+                    FarmReport.created_at <= db_cutoff + skew,
+                    FarmReport.id.notin_(anchored),
+                )
+                .order_by(FarmReport.id)
+            )
+            for report in query.yield_per(MAX_PAGE_SIZE):
+                key = report_key(
+                    report.product_id,
+                    # Truncated like encode_reading does before writing to the chain
+                    int(float(report.temperature) * 100),
+                    report.humidity,
+                    report.water_level,
+                    report.light_level,
+                )
+                if report.created_at > db_cutoff:
+                    db_late[key] += 1
+                    continue
+                db_readings.setdefault(key, []).append(report.id)
+                result["db_count"] += 1
+
+            chain_readings = Counter()
+            chain_late = Counter()
+            for items in BlockchainService().iter_chain_history(farm_id):
+                for item in items:
+                    if item["timestamp"] > chain_cutoff + RECONCILE_SKEW_SECONDS:
+                        continue
+                    key = report_key(
+                        item["productId"],
+                        round(item["temperature"] * 100),
+                        item["humidity"],
+                        item["waterLevel"],
+                        item["lightLevel"],
+                    )
+                    if item["timestamp"] > chain_cutoff:
+                        chain_late[key] += 1
+                        continue
+                    chain_readings[key] += 1
+                    result["chain_count"] += 1
+
+            missing_on_chain, missing_in_db = diff_readings(
+                db_readings, db_late, chain_readings, chain_late
+            )
+
+            result["missing_on_chain"] = len(missing_on_chain)
+            result["missing_in_db"] = len(missing_in_db)
+            if missing_on_chain or missing_in_db:
+                result["status"] = "drift"
+                result["missing_on_chain_sample"] = missing_on_chain[:RECONCILE_SAMPLE_SIZE]
+                result["missing_in_db_sample"] = [
+                    _key_to_reading(farm_id, key)
+                    for key in missing_in_db[:RECONCILE_SAMPLE_SIZE]
+                ]
+
+            if repair and result["status"] == "drift":
+                result["repaired"] = self._repair(db, farm_id, missing_on_chain, missing_in_db)
+
+        except Exception as e:
+            print(f"Error reconciling farm {farm_id}: {str(e)}")
+            db.rollback()
+            result["status"] = "error"
+            result["error"] = str(e)
+        finally:
+            db.close()
+        return result
+
+    @staticmethod
+    def _repair(db, farm_id, missing_on_chain, missing_in_db):
+        """Copy readings missing on one side from the other"""
+        repaired = {"to_chain": 0, "to_db": 0}
+
+        if missing_in_db:
+            repaired["to_db"] = FarmReportService.create_reports_chunked(
+                db,
+                (
+                    {"id": generate_random_report_id(), **_key_to_reading(farm_id, key)}
+                    for key in missing_in_db
+                ),
+            )
+
+        if missing_on_chain:
+            reports = db.query(FarmReport).filter(FarmReport.id.in_(missing_on_chain)).all()
+            results = BlockchainService().store_sensor_data_batch(
+                [
+                    {
+                        "farm_id": report.farm_id,
+                        "product_id": report.product_id,
+                        "temperature": report.temperature,
+                        "humidity": report.humidity,
+                        "water_level": report.water_level,
+                        "light_level": report.light_level,
+                    }
+                    for report in reports
+                ]
+            )
+            repaired["to_chain"] = sum(result["success"] for result in results)
+
+        return repaired
@@ -0,0 +1,185 @@
+import threading
+from datetime import datetime, timedelta
+
+from sqlalchemy import and_, func, or_, select, tuple_
+
+from app.config import ROLLUP_BATCH_SIZE, ROLLUP_LAG_SECONDS, ROLLUP_POLL_INTERVAL
+from app.model.farm_data import FarmReport, FarmReportRollup, RollupWatermark
+from app.services.database import SessionLocal
+
+ROLLUP_GRANULARITIES = ("hour", "day")
+ROLLUP_METRICS = ("temperature", "humidity", "water_level", "light_level")
+WATERMARK_NAME = "farm_reports"
+
+
+def bucket_start(moment: datetime, granularity: str) -> datetime:
+    """Start of the hour or day a timestamp falls in"""
+    if granularity == "hour":
+        return moment.replace(minute=0, second=0, microsecond=0)
+    if granularity == "day":
+        return moment.replace(hour=0, minute=0, second=0, microsecond=0)
+    raise ValueError(f"Unknown rollup granularity {granularity}")
+
+
+def format_rollup(rollup: FarmReportRollup) -> dict:
+    """Public form of a rollup row, with averages instead of sums"""
+    result = {
+        "bucket_start": rollup.bucket_start.isoformat(),
+        "count": rollup.count,
+    }
+    for metric in ROLLUP_METRICS:
+        result[metric] = {
+            "min": getattr(rollup, f"{metric}_min"),
+            "max": getattr(rollup, f"{metric}_max"),
+            "avg": getattr(rollup, f"{metric}_sum") / rollup.count if rollup.count else None,
+        }
+    return result
+
+
+def _fold(rollup: FarmReportRollup, report) -> None:
+    """Add one report to a rollup bucket"""
+    first = not rollup.count
+    rollup.count = (rollup.count or 0) + 1
+    for metric in ROLLUP_METRICS:
+        value = getattr(report, metric)
+        if first:
+            setattr(rollup, f"{metric}_min", value)
+            setattr(rollup, f"{metric}_max", value)
+            setattr(rollup, f"{metric}_sum", value)
+        else:
+            setattr(rollup, f"{metric}_min", min(getattr(rollup, f"{metric}_min"), value))
+            setattr(rollup, f"{metric}_max", max(getattr(rollup, f"{metric}_max"), value))
+            setattr(rollup, f"{metric}_sum", getattr(rollup, f"{metric}_sum") + value)
+
+
+def rollup_batch_query(after_created_at, after_report_id, cutoff, batch_size):
+    """Reports past the (created_at, id) watermark up to cutoff, in watermark order
+
+    Served by ix_farm_reports_created_at, which ends with the id through the
+    primary key.
+    """
+    statement = select(FarmReport).where(FarmReport.created_at <= cutoff)
+    if after_created_at is not None:
+        statement = statement.where(
+            or_(
+                FarmReport.created_at > after_created_at,
+                and_(
+                    FarmReport.created_at == after_created_at,
+                    FarmReport.id > after_report_id,
+                ),
+            )
+        )
+    return statement.order_by(FarmReport.created_at, FarmReport.id).limit(batch_size)
+
+
+class ReportRollupJob:
+    """Folds new farm_reports into hourly and daily rollups past a (created_at, id) watermark
+
+    The watermark row is locked for the whole batch, so several app workers
+    running the job never fold the same reports twice.
+    """
+
+    _instance = None
+
+    def __new__(cls):
+        if cls._instance is None:
+            cls._instance = super(ReportRollupJob, cls).__new__(cls)
+            cls._instance._stop_event = threading.Event()
+            cls._instance._thread = None
+        return cls._instance
+
+    def start(self):
+        """Start maintaining the rollups in the background"""
+        if self._thread and self._thread.is_alive():
+            return
+        self._stop_event.clear()
+        self._thread = threading.Thread(target=self._run, name="report-rollups", daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        """Stop maintaining the rollups"""
+        self._stop_event.set()
+        if self._thread:
+            self._thread.join(timeout=5)
+
+    def _run(self):
+        while not self._stop_event.is_set():
+            try:
+                caught_up = self.sync_once()
+            except Exception as e:
+                print(f"Error updating report rollups: {str(e)}")
+                caught_up = True
+            if caught_up:
+                self._stop_event.wait(ROLLUP_POLL_INTERVAL)
+
+    def sync_once(self, batch_size=ROLLUP_BATCH_SIZE) -> bool:
+        """Fold the next batch of reports into the rollups, return True when caught up"""
+        db = SessionLocal()
+        try:
+            watermark = (
+                db.query(RollupWatermark)
+                .filter(RollupWatermark.name == WATERMARK_NAME)
+                .with_for_update()
+                .first()
+            )
+            if watermark is None:
+                watermark = RollupWatermark(name=WATERMARK_NAME)
+                db.add(watermark)
+                db.flush()
+
+            # created_at is set by the database clock, so the cutoff is too
+            cutoff = db.scalar(select(func.current_timestamp())) - timedelta(
+                seconds=ROLLUP_LAG_SECONDS
+            )
+            reports = (
+                db.execute(
+                    rollup_batch_query(
+                        watermark.created_at, watermark.report_id, cutoff, batch_size
+                    )
+                )
+                .scalars()
+                .all()
+            )
+            if not reports:
+                db.rollback()
+                return True
+
+            keys = {
+                (report.farm_id, granularity, bucket_start(report.created_at, granularity))
+                for report in reports
+                for granularity in ROLLUP_GRANULARITIES
+            }
+            rollups = {
+                (rollup.farm_id, rollup.granularity, rollup.bucket_start): rollup
+                for rollup in db.query(FarmReportRollup).filter(
+                    tuple_(
+                        FarmReportRollup.farm_id,
+                        FarmReportRollup.granularity,
+                        FarmReportRollup.bucket_start,
+                    ).in_(list(keys))
+                )
+            }
+            for report in reports:
+                for granularity in ROLLUP_GRANULARITIES:
+                    key = (
+                        report.farm_id,
+                        granularity,
+                        bucket_start(report.created_at, granularity),
+                    )
+                    if key not in rollups:
+                        rollups[key] = FarmReportRollup(
+                            farm_id=key[0], granularity=key[1], bucket_start=key[2], count=0
+                        )
+                        db.add(rollups[key])
+                    _fold(rollups[key], report)
+
+            watermark.created_at = reports[-1].created_at
+            watermark.report_id = reports[-1].id
+            # Rollups and watermark move together
+            db.commit()
+            return len(reports) < batch_size
+        except Exception:
+            db.rollback()
+            raise
+        finally:
+            db.close()
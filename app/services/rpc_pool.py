@@ -0,0 +1,149 @@
+import hashlib
+import itertools
+import threading
+import time
+
+from web3 import Web3
+
+from app.config import (
+    BESU_URLS,
+    RPC_PROBE_INTERVAL,
+    RPC_MAX_LATENCY,
+    RPC_MAX_ERROR_RATE,
+    RPC_TIMEOUT,
+)
+
+# Weight of the newest sample in the latency moving average
+LATENCY_SMOOTHING = 0.3
+# Calls needed in a probe window before the error rate is trusted
+MIN_CALLS_FOR_ERROR_RATE = 10
+
+
+class RpcEndpoint:
+    """One Besu RPC node with its health statistics"""
+
+    def __init__(self, url):
+        self.url = url
+        self.web3 = Web3(Web3.HTTPProvider(url, request_kwargs={"timeout": RPC_TIMEOUT}))
+        self.healthy = True
+        self.latency = None
+        self._lock = threading.Lock()
+        self._calls = 0
+        self._errors = 0
+
+    def record(self, success, latency=None):
+        """Record the outcome of a call made through this endpoint"""
+        with self._lock:
+            self._calls += 1
+            if not success:
+                self._errors += 1
+            if latency is not None:
+                self.latency = (
+                    latency
+                    if self.latency is None
+                    else LATENCY_SMOOTHING * latency + (1 - LATENCY_SMOOTHING) * self.latency
+                )
+
+    def take_error_rate(self):
+        """Return the error rate since the last probe and start a new window"""
+        with self._lock:
+            calls, errors = self._calls, self._errors
+            self._calls = self._errors = 0
+        if calls < MIN_CALLS_FOR_ERROR_RATE:
+            return 0.0
+        return errors / calls
+
+    def status(self):
+        return {
+            "url": self.url,
+            "healthy": self.healthy,
+            "latency_ms": round(self.latency * 1000, 1) if self.latency is not None else None,
+        }
+
+
+class RpcEndpointPool:
+    """Health-checked set of Besu RPC endpoints"""
+
+    _instance = None
+
+    def __new__(cls):
+        if cls._instance is None:
+            cls._instance = super(RpcEndpointPool, cls).__new__(cls)
+            cls._instance._initialize_pool()
+        return cls._instance
+
+    def _initialize_pool(self):
+        self.endpoints = [RpcEndpoint(url) for url in BESU_URLS]
+        self._round_robin = itertools.cycle(range(len(self.endpoints)))
+        self._round_robin_lock = threading.Lock()
+        self._stop_event = threading.Event()
+        self._thread = None
+
+    def _healthy_endpoints(self):
+        healthy = [endpoint for endpoint in self.endpoints if endpoint.healthy]
+        # With every node ejected, keep trying all of them rather than failing outright
+        return healthy or self.endpoints
+
+    def read_endpoints(self):
+        """Return healthy endpoints in the order reads should try them"""
+        healthy = self._healthy_endpoints()
+        with self._round_robin_lock:
+            start = next(self._round_robin) % len(healthy)
+        return healthy[start:] + healthy[:start]
+
+    def read_endpoint(self):
+        """Return the next healthy endpoint for an eth_call"""
+        return self.read_endpoints()[0]
+
+    def write_endpoint(self, address):
+        """Return the endpoint an account's transactions are pinned to
+
+        Rendezvous hashing keeps an account on the same node until that node is
+        ejected, so its nonce sequence reaches one txpool in order.
+        """
+        return max(
+            self._healthy_endpoints(),
+            key=lambda endpoint: hashlib.sha256(
+                f"{endpoint.url}:{address}".encode()
+            ).digest(),
+        )
+
+    def start(self):
+        """Start the background health probe"""
+        if len(self.endpoints) < 2 or (self._thread and self._thread.is_alive()):
+            return
+        self._stop_event.clear()
+        self._thread = threading.Thread(target=self._run, name="rpc-probe", daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        """Stop the background health probe"""
+        self._stop_event.set()
+        if self._thread:
+            self._thread.join(timeout=RPC_PROBE_INTERVAL * 2)
+
+    def _run(self):
+        while not self._stop_event.wait(RPC_PROBE_INTERVAL):
+            self.probe()
+
+    def probe(self):
+        """Measure every endpoint and eject or readmit it"""
+        for endpoint in self.endpoints:
+            error_rate = endpoint.take_error_rate()
+            start = time.perf_counter()
+            try:
+                endpoint.web3.eth.block_number
+                latency = time.perf_counter() - start
+                endpoint.record(True, latency)
+                healthy = latency <= RPC_MAX_LATENCY and error_rate <= RPC_MAX_ERROR_RATE
+            except Exception as e:
+                print(f"RPC endpoint {endpoint.url} probe failed: {str(e)}")
+                healthy = False
+
+            if healthy != endpoint.healthy:
+                print(f"RPC endpoint {endpoint.url} {'readmitted' if healthy else 'ejected'}")
+            endpoint.healthy = healthy
+
+    def status(self):
+        """Return the health of every endpoint"""
+        return [endpoint.status() for endpoint in self.endpoints]
@@ -0,0 +1,44 @@
+import hashlib
+
+from eth_account import Account
+
+from app.services.nonce_manager import NonceManager
+
+
+class SignerPool:
+    """Set of signing accounts, each with its own nonce lane"""
+
+    def __init__(self, private_keys):
+        if not private_keys:
+            raise ValueError("Signer pool needs at least one private key")
+        self.accounts = [Account.from_key(private_key) for private_key in private_keys]
+
+    @property
+    def default_account(self):
+        """Account used for transactions that do not belong to a farm"""
+        return self.accounts[0]
+
+    def account_for(self, farm_id):
+        """Pick the account of a farm by rendezvous hashing
+
+        Every farm always maps to the same account, and adding or removing an
+        account only moves the farms that hashed to it.
+        """
+        if len(self.accounts) == 1:
+            return self.accounts[0]
+        return max(
+            self.accounts,
+            key=lambda account: hashlib.sha256(
+                f"{account.address}:{farm_id}".encode()
+            ).digest(),
+        )
+
+    @staticmethod
+    def nonce_manager(account):
+        """Return the nonce lane of an account"""
+        return NonceManager.for_address(account.address)
+
+    def resync_all(self):
+        """Re-read every account's nonce from the node on next use"""
+        for account in self.accounts:
+            self.nonce_manager(account).resync()
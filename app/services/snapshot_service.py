@@ -0,0 +1,269 @@
+import json
+import os
+import threading
+from datetime import datetime, timedelta, timezone
+from urllib.parse import quote
+
+import numpy as np
+from sqlalchemy import and_, func, or_, select
+
+from app.config import MAX_PAGE_SIZE, SNAPSHOT_DIR, SNAPSHOT_LAG_SECONDS, SNAPSHOT_PART_ROWS
+from app.model.farm_data import FarmReport
+from app.services.blockchain import BlockchainService
+from app.services.database import SessionLocal
+
+SNAPSHOT_SOURCES = ("chain", "reports")
+
+# Typed column layout of the part files, by source. Chain columns follow the
+# unsigned widths of the Reading struct so no on-chain value can overflow
+CHAIN_COLUMNS = {
+    "timestamp": np.int64,
+    "temperature": np.float32,
+    "humidity": np.uint16,
+    "water_level": np.uint32,
+    "light_level": np.uint32,
+    "product_id": np.str_,
+}
+REPORT_COLUMNS = {
+    "report_id": np.str_,
+    "timestamp": np.int64,
+    "temperature": np.float32,
+    "humidity": np.float32,
+    "water_level": np.float32,
+    "light_level": np.float32,
+    "product_id": np.str_,
+}
+
+
+def _month(timestamp):
+    return datetime.fromtimestamp(timestamp, tz=timezone.utc).strftime("%Y-%m")
+
+
+def split_parts(rows, part_rows=SNAPSHOT_PART_ROWS):
+    """Split rows into runs of one month, at most part_rows each"""
+    start = 0
+    for end in range(1, len(rows) + 1):
+        if (
+            end == len(rows)
+            or end - start >= part_rows
+            or rows[end]["month"] != rows[start]["month"]
+        ):
+            yield rows[start:end]
+            start = end
+
+
+class SnapshotService:
+    """Writes sensor history into .npz files partitioned by farm and month
+
+    Layout: SNAPSHOT_DIR/<source>/farm=<farm_id>/month=<YYYY-MM>/part-<key>.npz,
+    one typed array per column. Chain readings are bucketed by the UTC month of
+    their block timestamp. Reports are bucketed by the calendar month of
+    created_at, like the farm_reports partitions. Their timestamp column reads
+    created_at as local time, the way the API compares it. manifest.json keeps
+    a per-farm watermark so the next run only appends what was stored since.
+    Part names derive from the watermark they start at, so a run interrupted
+    before its manifest update is rewritten in place rather than duplicated.
+    """
+
+    _instance = None
+
+    def __new__(cls):
+        if cls._instance is None:
+            cls._instance = super(SnapshotService, cls).__new__(cls)
+            cls._instance._lock = threading.Lock()
+            cls._instance._thread = None
+            cls._instance.last_result = None
+        return cls._instance
+
+    @property
+    def running(self):
+        return bool(self._thread and self._thread.is_alive())
+
+    def start(self, source="chain", farm_ids=None):
+        """Take a snapshot in the background, return False if one is already running"""
+        with self._lock:
+            if self.running:
+                return False
+            self._thread = threading.Thread(
+                target=self.run, args=(source, farm_ids), name="snapshot", daemon=True
+            )
+            self._thread.start()
+            return True
+
+    def run(self, source="chain", farm_ids=None):
+        """Append everything new since the last snapshot of the given farms (default all)"""
+        if source not in SNAPSHOT_SOURCES:
+            raise ValueError(f"Unknown snapshot source {source}")
+
+        root = os.path.join(SNAPSHOT_DIR, source)
+        manifest = self.load_manifest(source)
+        if farm_ids is None:
+            farm_ids = self._list_farm_ids(source)
+
+        written = {}
+        for farm_id in farm_ids:
+            try:
+                if source == "chain":
+                    rows = self._snapshot_chain_farm(root, manifest, farm_id)
+                else:
+                    rows = self._snapshot_report_farm(root, manifest, farm_id)
+                written[farm_id] = rows
+            except Exception as e:
+                print(f"Error taking snapshot of farm {farm_id}: {str(e)}")
+                written[farm_id] = f"error: {str(e)}"
+
+        self.last_result = {
+            "source": source,
+            "finished_at": datetime.now().isoformat(timespec="seconds"),
+            "rows_written": written,
+        }
+        return self.last_result
+
+    @staticmethod
+    def load_manifest(source):
+        """Return the manifest of a source, empty when no snapshot was taken yet"""
+        path = os.path.join(SNAPSHOT_DIR, source, "manifest.json")
+        if not os.path.exists(path):
+            return {"source": source, "farms": {}}
+        with open(path) as f:
+            return json.load(f)
+
+    @staticmethod
+    def _save_manifest(root, manifest):
+        manifest["updated_at"] = datetime.now().isoformat(timespec="seconds")
+        os.makedirs(root, exist_ok=True)
+        path = os.path.join(root, "manifest.json")
+        with open(path + ".tmp", "w") as f:
+            json.dump(manifest, f, indent=4)
+        # Atomic, a crash leaves either the old or the new watermark
+        os.replace(path + ".tmp", path)
+
+    @staticmethod
+    def _list_farm_ids(source):
+        if source == "chain":
+            return BlockchainService().get_chain_farm_ids()
+        db = SessionLocal()
+        try:
+            return [farm_id for (farm_id,) in db.query(FarmReport.farm_id).distinct().all()]
+        finally:
+            db.close()
+
+    @staticmethod
+    def _write_part(root, farm_id, rows, columns, part_key):
+        """Write rows of one month as typed column arrays"""
+        directory = os.path.join(
+            root, f"farm={quote(farm_id, safe='')}", f"month={rows[0]['month']}"
+        )
+        os.makedirs(directory, exist_ok=True)
+        arrays = {
+            name: np.array([row[name] for row in rows], dtype=dtype)
+            for name, dtype in columns.items()
+        }
+        path = os.path.join(directory, f"part-{part_key}.npz")
+        with open(path + ".tmp", "wb") as f:
+            np.savez_compressed(f, **arrays)
+        os.replace(path + ".tmp", path)
+
+    def _snapshot_chain_farm(self, root, manifest, farm_id):
+        """Append a farm's on-chain readings past its stored position"""
+        state = manifest["farms"].setdefault(farm_id, {"offset": 0, "parts": 0})
+        written = 0
+        buffer = []
+
+        def flush(rows):
+            nonlocal written
+            for part in split_parts(rows):
+                self._write_part(root, farm_id, part, CHAIN_COLUMNS, f"{state['offset']:012d}")
+                state["offset"] += len(part)
+                state["parts"] += 1
+                written += len(part)
+                self._save_manifest(root, manifest)
+
+        for items in BlockchainService().iter_chain_history(
+            farm_id, MAX_PAGE_SIZE, state["offset"]
+        ):
+            buffer.extend(
+                {
+                    "timestamp": item["timestamp"],
+                    "temperature": item["temperature"],
+                    "humidity": item["humidity"],
+                    "water_level": item["waterLevel"],
+                    "light_level": item["lightLevel"],
+                    "product_id": item["productId"],
+                    "month": _month(item["timestamp"]),
+                }
+                for item in items
+            )
+            if len(buffer) >= SNAPSHOT_PART_ROWS:
+                flush(buffer)
+                buffer = []
+        if buffer:
+            flush(buffer)
+        return written
+
+    def _snapshot_report_farm(self, root, manifest, farm_id):
+        """Append a farm's reports created after its stored (created_at, id) watermark"""
+        state = manifest["farms"].setdefault(
+            farm_id, {"created_at": None, "report_id": None, "parts": 0}
+        )
+        written = 0
+        db = SessionLocal()
+        try:
+            # A report committed late with an earlier (created_at, id) than the
+            # watermark would be skipped for good, so the newest ones wait
+            cutoff = db.scalar(select(func.current_timestamp())) - timedelta(
+                seconds=SNAPSHOT_LAG_SECONDS
+            )
+            while True:
+                query = db.query(FarmReport).filter(
+                    FarmReport.farm_id == farm_id, FarmReport.created_at <= cutoff
+                )
+                if state["created_at"]:
+                    created_at = datetime.fromisoformat(state["created_at"])
+                    query = query.filter(
+                        or_(
+                            FarmReport.created_at > created_at,
+                            and_(
+                                FarmReport.created_at == created_at,
+                                FarmReport.id > state["report_id"],
+                            ),
+                        )
+                    )
+                reports = (
+                    query.order_by(FarmReport.created_at, FarmReport.id)
+                    .limit(SNAPSHOT_PART_ROWS)
+                    .all()
+                )
+                if not reports:
+                    return written
+
+                rows = [
+                    {
+                        "report_id": report.id,
+                        "timestamp": int(report.created_at.timestamp()),
+                        "temperature": report.temperature,
+                        "humidity": report.humidity,
+                        "water_level": report.water_level,
+                        "light_level": report.light_level,
+                        "product_id": report.product_id,
+                        "created_at": report.created_at,
+                        "month": report.created_at.strftime("%Y-%m"),
+                    }
+                    for report in reports
+                ]
+                for part in split_parts(rows):
+                    first = part[0]
+                    self._write_part(
+                        root,
+                        farm_id,
+                        part,
+                        REPORT_COLUMNS,
+                        f"{first['timestamp']}-{quote(first['report_id'], safe='')}",
+                    )
+                    state["created_at"] = part[-1]["created_at"].isoformat()
+                    state["report_id"] = part[-1]["report_id"]
+                    state["parts"] += 1
+                    written += len(part)
+                    self._save_manifest(root, manifest)
+        finally:
+            db.close()
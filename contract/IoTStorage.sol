@@ -2,44 +2,289 @@
 pragma solidity ^0.8.17;
 
 contract IoTStorage {
-    struct Farm {
+    // Field order packs the numeric fields into one slot, a reading takes 3 slots.
+    // Ids up to 32 bytes are stored as right-padded UTF-8, longer ids as the
+    // keccak256 of their UTF-8 bytes with the original kept off-chain.
+    struct Reading {
+        uint64 timestamp;
+        uint32 temperature;
+        uint16 humidity;
+        uint32 waterLevel;
+        uint32 lightLevel;
+        bytes32 farmId;
+        bytes32 productId;
+    }
+
+    struct MerkleAnchor {
+        bytes32 root;
+        uint256 leafCount;
         uint256 timestamp;
-        string farmId;
-        uint256 temperature;
-        uint256 humidity;
-        uint256 waterLevel;
-        string productId;
-        uint256 lightLevel;
     }
 
-    Farm[] public farms;
+    struct FarmSummary {
+        uint64 count;
+        uint64 firstTimestamp;
+        uint64 lastTimestamp;
+        uint64 latestIndex;
+    }
+
+    struct FarmSummaryView {
+        bytes32 farmId;
+        uint64 count;
+        uint64 firstTimestamp;
+        uint64 lastTimestamp;
+        Reading latest;
+    }
+
+    Reading[] public readings;
+    MerkleAnchor[] public anchors;
+    bytes32[] private farmIds;
 
-    mapping(string => Farm[]) private farmMapping;
-    mapping(string => bool) private farmExists;
+    // Per-farm histories are lists of indexes into readings, not copies
+    mapping(bytes32 => uint64[]) private farmIndexes;
+    mapping(bytes32 => FarmSummary) private farmSummaries;
+
+    event DataStored(
+        uint256 indexed index,
+        bytes32 indexed farmId,
+        uint64 timestamp,
+        uint32 temperature,
+        uint16 humidity,
+        uint32 waterLevel,
+        bytes32 productId,
+        uint32 lightLevel
+    );
+    event RootAnchored(uint256 indexed anchorId, bytes32 root, uint256 leafCount);
 
     function storeData(
-        string memory farmId,
-        uint256 temperature,
-        uint256 humidity,
-        uint256 waterLevel,
-        string memory productId,
-        uint256 lightLevel
+        bytes32 farmId,
+        uint32 temperature,
+        uint16 humidity,
+        uint32 waterLevel,
+        bytes32 productId,
+        uint32 lightLevel
     ) public returns (uint256) {
-        uint256 index = farms.length;
-        Farm memory farm = Farm(block.timestamp, farmId, temperature, humidity, waterLevel, productId, lightLevel);
-        farms.push(farm);
-        farmMapping[farmId].push(farm);
-        farmExists[farmId] = true;
+        return _storeData(farmId, temperature, humidity, waterLevel, productId, lightLevel);
+    }
+
+    function storeDataBatch(
+        bytes32[] calldata batchFarmIds,
+        uint32[] calldata temperatures,
+        uint16[] calldata humidities,
+        uint32[] calldata waterLevels,
+        bytes32[] calldata productIds,
+        uint32[] calldata lightLevels
+    ) public returns (uint256) {
+        uint256 count = batchFarmIds.length;
+        require(
+            temperatures.length == count &&
+                humidities.length == count &&
+                waterLevels.length == count &&
+                productIds.length == count &&
+                lightLevels.length == count,
+            "Array lengths do not match"
+        );
+        uint256 firstIndex = readings.length;
+        for (uint256 i = 0; i < count; i++) {
+            _storeData(batchFarmIds[i], temperatures[i], humidities[i], waterLevels[i], productIds[i], lightLevels[i]);
+        }
+        return firstIndex;
+    }
+
+    function _storeData(
+        bytes32 farmId,
+        uint32 temperature,
+        uint16 humidity,
+        uint32 waterLevel,
+        bytes32 productId,
+        uint32 lightLevel
+    ) internal returns (uint256) {
+        uint64 index = uint64(readings.length);
+        uint64 timestamp = uint64(block.timestamp);
+        readings.push(Reading(timestamp, temperature, humidity, waterLevel, lightLevel, farmId, productId));
+        farmIndexes[farmId].push(index);
+
+        FarmSummary storage summary = farmSummaries[farmId];
+        if (summary.count == 0) {
+            farmIds.push(farmId);
+            summary.firstTimestamp = timestamp;
+        }
+        summary.count += 1;
+        summary.lastTimestamp = timestamp;
+        summary.latestIndex = index;
+
+        emit DataStored(index, farmId, timestamp, temperature, humidity, waterLevel, productId, lightLevel);
         return index;
     }
 
-    function getAllData() public view returns (Farm[] memory) {
-        return farms;
+    function anchorRoot(bytes32 root, uint256 leafCount) public returns (uint256) {
+        uint256 anchorId = anchors.length;
+        anchors.push(MerkleAnchor(root, leafCount, block.timestamp));
+        emit RootAnchored(anchorId, root, leafCount);
+        return anchorId;
+    }
+
+    function getAllData() public view returns (Reading[] memory) {
+        return readings;
+    }
+
+    function getDataByFarmId(bytes32 farmId) public view returns (Reading[] memory) {
+        uint64[] storage indexes = farmIndexes[farmId];
+        require(indexes.length > 0, "Device ID does not exist");
+        return _collect(indexes, 0, indexes.length);
+    }
+
+    function getDataCount() public view returns (uint256) {
+        return readings.length;
+    }
+
+    function getDataCountByFarmId(bytes32 farmId) public view returns (uint256) {
+        return farmIndexes[farmId].length;
+    }
+
+    function getFarmCount() public view returns (uint256) {
+        return farmIds.length;
+    }
+
+    function getFarmSummaries(
+        uint256 offset,
+        uint256 limit
+    ) public view returns (FarmSummaryView[] memory page, uint256 total) {
+        total = farmIds.length;
+        if (offset >= total) {
+            return (new FarmSummaryView[](0), total);
+        }
+        uint256 end = _end(offset, limit, total);
+        page = new FarmSummaryView[](end - offset);
+        for (uint256 i = offset; i < end; i++) {
+            bytes32 farmId = farmIds[i];
+            FarmSummary storage summary = farmSummaries[farmId];
+            page[i - offset] = FarmSummaryView(
+                farmId,
+                summary.count,
+                summary.firstTimestamp,
+                summary.lastTimestamp,
+                readings[summary.latestIndex]
+            );
+        }
+        return (page, total);
+    }
+
+    function getAllDataPaged(uint256 offset, uint256 limit) public view returns (Reading[] memory page, uint256 total) {
+        total = readings.length;
+        if (offset >= total) {
+            return (new Reading[](0), total);
+        }
+        uint256 end = _end(offset, limit, total);
+        page = new Reading[](end - offset);
+        for (uint256 i = offset; i < end; i++) {
+            page[i - offset] = readings[i];
+        }
+        return (page, total);
+    }
+
+    function getDataByFarmIdPaged(
+        bytes32 farmId,
+        uint256 offset,
+        uint256 limit
+    ) public view returns (Reading[] memory page, uint256 total) {
+        uint64[] storage indexes = farmIndexes[farmId];
+        total = indexes.length;
+        if (offset >= total) {
+            return (new Reading[](0), total);
+        }
+        return (_collect(indexes, offset, _end(offset, limit, total)), total);
+    }
+
+    function getDataCountByFarmIdInRange(
+        bytes32 farmId,
+        uint64 fromTimestamp,
+        uint64 toTimestamp
+    ) public view returns (uint256) {
+        uint64[] storage indexes = farmIndexes[farmId];
+        uint256 start = _lowerBound(indexes, fromTimestamp);
+        uint256 end = _upperBound(indexes, toTimestamp);
+        return end > start ? end - start : 0;
+    }
+
+    // Readings with fromTimestamp <= timestamp <= toTimestamp, paged within the range
+    function getDataByFarmIdInRange(
+        bytes32 farmId,
+        uint64 fromTimestamp,
+        uint64 toTimestamp,
+        uint256 offset,
+        uint256 limit
+    ) public view returns (Reading[] memory page, uint256 total) {
+        uint64[] storage indexes = farmIndexes[farmId];
+        uint256 start = _lowerBound(indexes, fromTimestamp);
+        uint256 end = _upperBound(indexes, toTimestamp);
+        total = end > start ? end - start : 0;
+        if (offset >= total) {
+            return (new Reading[](0), total);
+        }
+        return (_collect(indexes, start + offset, start + _end(offset, limit, total)), total);
+    }
+
+    // Latest readings of several farms in one call, at most limitPerFarm each
+    function getLatestDataByFarmIds(
+        bytes32[] calldata ids,
+        uint256 limitPerFarm
+    ) public view returns (Reading[][] memory pages, uint256[] memory totals) {
+        pages = new Reading[][](ids.length);
+        totals = new uint256[](ids.length);
+        for (uint256 i = 0; i < ids.length; i++) {
+            uint64[] storage indexes = farmIndexes[ids[i]];
+            uint256 total = indexes.length;
+            uint256 start = total > limitPerFarm ? total - limitPerFarm : 0;
+            pages[i] = _collect(indexes, start, total);
+            totals[i] = total;
+        }
+        return (pages, totals);
+    }
+
+    function _collect(uint64[] storage indexes, uint256 start, uint256 end) internal view returns (Reading[] memory) {
+        Reading[] memory page = new Reading[](end - start);
+        for (uint256 i = start; i < end; i++) {
+            page[i - start] = readings[indexes[i]];
+        }
+        return page;
+    }
+
+    // Readings are appended in block.timestamp order, so each farm's index list
+    // is sorted by timestamp and can be binary searched
+
+    // First position whose reading has timestamp >= target
+    function _lowerBound(uint64[] storage indexes, uint64 target) internal view returns (uint256) {
+        uint256 low = 0;
+        uint256 high = indexes.length;
+        while (low < high) {
+            uint256 mid = (low + high) / 2;
+            if (readings[indexes[mid]].timestamp < target) {
+                low = mid + 1;
+            } else {
+                high = mid;
+            }
+        }
+        return low;
+    }
+
+    // First position whose reading has timestamp > target
+    function _upperBound(uint64[] storage indexes, uint64 target) internal view returns (uint256) {
+        uint256 low = 0;
+        uint256 high = indexes.length;
+        while (low < high) {
+            uint256 mid = (low + high) / 2;
+            if (readings[indexes[mid]].timestamp <= target) {
+                low = mid + 1;
+            } else {
+                high = mid;
+            }
+        }
+        return low;
     }
 
-    function getDataByFarmId(string memory farmId) public view returns (Farm[] memory) {
-        require(farmExists[farmId], "Device ID does not exist");
-        Farm[] memory result = farmMapping[farmId];
-        return result;
+    function _end(uint256 offset, uint256 limit, uint256 total) internal pure returns (uint256) {
+        uint256 end = offset + limit;
+        return end > total ? total : end;
     }
-}
\ No newline at end of file
+}
@@ -0,0 +1,49 @@
+import sqlalchemy as sa
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision = "20261018_090000_add_merkle_anchor_tables"
+down_revision = "20250420_015800_add_qr_code_url"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        "merkle_batches",
+        sa.Column("id", sa.Integer(), primary_key=True, autoincrement=True),
+        sa.Column("root", sa.String(66), nullable=False),
+        sa.Column("leaf_count", sa.Integer(), nullable=False),
+        sa.Column("anchor_id", sa.Integer(), nullable=True),
+        sa.Column("tx_hash", sa.String(66), nullable=True),
+        sa.Column("anchored_at", sa.DateTime(), nullable=True),
+        sa.Column(
+            "created_at", sa.DateTime(), server_default=sa.text("CURRENT_TIMESTAMP")
+        ),
+    )
+
+    op.create_table(
+        "merkle_leaves",
+        sa.Column("report_id", sa.String(255), primary_key=True),
+        sa.Column("farm_id", sa.String(255), nullable=False),
+        sa.Column("leaf_hash", sa.String(66), nullable=False),
+        sa.Column(
+            "batch_id",
+            sa.Integer(),
+            sa.ForeignKey("merkle_batches.id"),
+            nullable=True,
+        ),
+        sa.Column("leaf_index", sa.Integer(), nullable=True),
+        sa.Column(
+            "created_at", sa.DateTime(), server_default=sa.text("CURRENT_TIMESTAMP")
+        ),
+    )
+    op.create_index("ix_merkle_leaves_farm_id", "merkle_leaves", ["farm_id"])
+    op.create_index("ix_merkle_leaves_batch_id", "merkle_leaves", ["batch_id"])
+
+
+def downgrade() -> None:
+    op.drop_index("ix_merkle_leaves_batch_id", table_name="merkle_leaves")
+    op.drop_index("ix_merkle_leaves_farm_id", table_name="merkle_leaves")
+    op.drop_table("merkle_leaves")
+    op.drop_table("merkle_batches")
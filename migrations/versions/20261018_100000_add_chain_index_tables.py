@@ -0,0 +1,50 @@
+import sqlalchemy as sa
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision = "20261018_100000_add_chain_index_tables"
+down_revision = "20261018_090000_add_merkle_anchor_tables"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        "chain_readings",
+        sa.Column("index", sa.BigInteger(), primary_key=True, autoincrement=False),
+        sa.Column("farm_id", sa.String(255), nullable=False),
+        sa.Column("product_id", sa.String(255), nullable=True),
+        sa.Column("timestamp", sa.BigInteger(), nullable=False),
+        sa.Column("temperature", sa.Float(), nullable=False),
+        sa.Column("humidity", sa.Integer(), nullable=False),
+        sa.Column("water_level", sa.Integer(), nullable=False),
+        sa.Column("light_level", sa.Integer(), nullable=False),
+        sa.Column("block_number", sa.BigInteger(), nullable=False),
+        sa.Column("tx_hash", sa.String(66), nullable=False),
+        sa.Column("log_index", sa.Integer(), nullable=False),
+    )
+    op.create_index(
+        "ix_chain_readings_farm_id_index", "chain_readings", ["farm_id", "index"]
+    )
+    op.create_index(
+        "ix_chain_readings_farm_id_timestamp", "chain_readings", ["farm_id", "timestamp"]
+    )
+
+    op.create_table(
+        "chain_index_checkpoints",
+        sa.Column("name", sa.String(64), primary_key=True),
+        sa.Column("block_number", sa.BigInteger(), nullable=False),
+        sa.Column(
+            "updated_at",
+            sa.DateTime(),
+            server_default=sa.text("CURRENT_TIMESTAMP"),
+            onupdate=sa.text("CURRENT_TIMESTAMP"),
+        ),
+    )
+
+
+def downgrade() -> None:
+    op.drop_table("chain_index_checkpoints")
+    op.drop_index("ix_chain_readings_farm_id_timestamp", table_name="chain_readings")
+    op.drop_index("ix_chain_readings_farm_id_index", table_name="chain_readings")
+    op.drop_table("chain_readings")
@@ -0,0 +1,23 @@
+import sqlalchemy as sa
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision = "20261018_110000_add_chain_identifiers_table"
+down_revision = "20261018_100000_add_chain_index_tables"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        "chain_identifiers",
+        sa.Column("id_hash", sa.String(66), primary_key=True),
+        sa.Column("value", sa.String(255), nullable=False),
+        sa.Column(
+            "created_at", sa.DateTime(), server_default=sa.text("CURRENT_TIMESTAMP")
+        ),
+    )
+
+
+def downgrade() -> None:
+    op.drop_table("chain_identifiers")
@@ -0,0 +1,31 @@
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision = "20261018_120000_add_farm_reports_indexes"
+down_revision = "20261018_110000_add_chain_identifiers_table"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.create_index(
+        "ix_farm_reports_farm_id_created_at", "farm_reports", ["farm_id", "created_at"]
+    )
+    op.create_index(
+        "ix_farm_reports_product_id_created_at",
+        "farm_reports",
+        ["product_id", "created_at"],
+    )
+    op.create_index(
+        "ix_farm_reports_farm_id_product_id_created_at",
+        "farm_reports",
+        ["farm_id", "product_id", "created_at"],
+    )
+
+
+def downgrade() -> None:
+    op.drop_index(
+        "ix_farm_reports_farm_id_product_id_created_at", table_name="farm_reports"
+    )
+    op.drop_index("ix_farm_reports_product_id_created_at", table_name="farm_reports")
+    op.drop_index("ix_farm_reports_farm_id_created_at", table_name="farm_reports")
@@ -0,0 +1,70 @@
+from datetime import date
+
+import sqlalchemy as sa
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision = "20261018_130000_partition_farm_reports"
+down_revision = "20261018_120000_add_farm_reports_indexes"
+branch_labels = None
+depends_on = None
+
+# Monthly partitions created ahead of the current month, later ones are
+# added by scripts/maintain_partitions.py
+MONTHS_AHEAD = 3
+
+
+def _add_months(month, count):
+    index = month.year * 12 + month.month - 1 + count
+    return date(index // 12, index % 12 + 1, 1)
+
+
+def upgrade() -> None:
+    conn = op.get_bind()
+
+    # The partitioning column has to be part of every unique key, so of the
+    # primary key, and a primary key column cannot be NULL
+    op.execute(
+        "UPDATE farm_reports SET created_at = COALESCE(updated_at, CURRENT_TIMESTAMP) "
+        "WHERE created_at IS NULL"
+    )
+    op.alter_column(
+        "farm_reports",
+        "created_at",
+        existing_type=sa.DateTime(),
+        nullable=False,
+        existing_server_default=sa.text("CURRENT_TIMESTAMP"),
+    )
+    op.execute("ALTER TABLE farm_reports DROP PRIMARY KEY, ADD PRIMARY KEY (id, created_at)")
+
+    current_month = date.today().replace(day=1)
+    oldest = conn.execute(sa.text("SELECT MIN(created_at) FROM farm_reports")).scalar()
+    month = min(oldest.date().replace(day=1), current_month) if oldest else current_month
+
+    # One partition per month from the oldest report on, the first one also
+    # takes anything older, pmax anything past the last month
+    partitions = []
+    while month <= _add_months(current_month, MONTHS_AHEAD):
+        partitions.append(
+            f"PARTITION p{month:%Y%m} VALUES LESS THAN ('{_add_months(month, 1)}')"
+        )
+        month = _add_months(month, 1)
+    partitions.append("PARTITION pmax VALUES LESS THAN (MAXVALUE)")
+
+    op.execute(
+        "ALTER TABLE farm_reports PARTITION BY RANGE COLUMNS(created_at) ("
+        + ", ".join(partitions)
+        + ")"
+    )
+
+
+def downgrade() -> None:
+    op.execute("ALTER TABLE farm_reports REMOVE PARTITIONING")
+    op.execute("ALTER TABLE farm_reports DROP PRIMARY KEY, ADD PRIMARY KEY (id)")
+    op.alter_column(
+        "farm_reports",
+        "created_at",
+        existing_type=sa.DateTime(),
+        nullable=True,
+        existing_server_default=sa.text("CURRENT_TIMESTAMP"),
+    )
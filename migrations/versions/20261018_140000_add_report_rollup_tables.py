@@ -0,0 +1,43 @@
+import sqlalchemy as sa
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision = "20261018_140000_add_report_rollup_tables"
+down_revision = "20261018_130000_partition_farm_reports"
+branch_labels = None
+depends_on = None
+
+METRICS = ("temperature", "humidity", "water_level", "light_level")
+
+
+def upgrade() -> None:
+    op.create_table(
+        "farm_report_rollups",
+        sa.Column("farm_id", sa.String(255), primary_key=True),
+        sa.Column("granularity", sa.String(8), primary_key=True),
+        sa.Column("bucket_start", sa.DateTime(), primary_key=True),
+        sa.Column("count", sa.Integer(), nullable=False),
+        *[
+            sa.Column(f"{metric}_{aggregate}", sa.Float(), nullable=False)
+            for metric in METRICS
+            for aggregate in ("min", "max", "sum")
+        ],
+    )
+
+    op.create_table(
+        "rollup_watermarks",
+        sa.Column("name", sa.String(64), primary_key=True),
+        sa.Column("created_at", sa.DateTime(), nullable=True),
+        sa.Column("report_id", sa.String(255), nullable=True),
+        sa.Column(
+            "updated_at",
+            sa.DateTime(),
+            server_default=sa.text("CURRENT_TIMESTAMP"),
+            onupdate=sa.text("CURRENT_TIMESTAMP"),
+        ),
+    )
+
+
+def downgrade() -> None:
+    op.drop_table("rollup_watermarks")
+    op.drop_table("farm_report_rollups")
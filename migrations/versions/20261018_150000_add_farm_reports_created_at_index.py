@@ -0,0 +1,17 @@
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision = "20261018_150000_add_farm_reports_created_at_index"
+down_revision = "20261018_140000_add_report_rollup_tables"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    # InnoDB appends the primary key to secondary indexes, so this one also
+    # serves ORDER BY created_at, id without a filesort
+    op.create_index("ix_farm_reports_created_at", "farm_reports", ["created_at"])
+
+
+def downgrade() -> None:
+    op.drop_index("ix_farm_reports_created_at", table_name="farm_reports")
@@ -0,0 +1,47 @@
+import sqlalchemy as sa
+from alembic import op
+from eth_abi import encode
+from eth_utils import keccak
+
+# revision identifiers, used by Alembic.
+revision = "20261018_160000_add_merkle_hash_version"
+down_revision = "20261018_150000_add_farm_reports_created_at_index"
+branch_labels = None
+depends_on = None
+
+# Version 2 leaf encoding, as of app.services.merkle_service.hash_report
+LEAF_TYPES = ["string", "string", "string", "int256", "int256", "int256", "int256"]
+
+
+def upgrade() -> None:
+    conn = op.get_bind()
+
+    # Existing batches keep the version 1 scheme their roots were anchored with
+    op.add_column(
+        "merkle_batches",
+        sa.Column("hash_version", sa.Integer(), nullable=False, server_default=sa.text("1")),
+    )
+
+    # Leaves not in a batch yet go into version 2 batches, rehash them
+    rows = conn.execute(
+        sa.text(
+            "SELECT l.report_id, r.farm_id, r.product_id, r.temperature, r.humidity, "
+            "r.water_level, r.light_level "
+            "FROM merkle_leaves l JOIN farm_reports r ON r.id = l.report_id "
+            "WHERE l.batch_id IS NULL"
+        )
+    ).all()
+    for report_id, farm_id, product_id, *metrics in rows:
+        encoded = encode(
+            LEAF_TYPES,
+            [report_id, farm_id, product_id, *[round(value * 100) for value in metrics]],
+        )
+        conn.execute(
+            sa.text("UPDATE merkle_leaves SET leaf_hash = :leaf_hash WHERE report_id = :report_id"),
+            {"leaf_hash": "0x" + keccak(b"\x00" + encoded).hex(), "report_id": report_id},
+        )
+
+
+def downgrade() -> None:
+    # Unbatched leaves keep their version 2 hashes
+    op.drop_column("merkle_batches", "hash_version")
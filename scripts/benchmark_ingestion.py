@@ -0,0 +1,75 @@
+"""Benchmark sensor data ingestion rate against the configured Besu node.
+
+Usage:
+    python scripts/benchmark_ingestion.py [--count 50] [--farm-id bench-farm]
+
+Compares the old flow (send one transaction, wait for its receipt, repeat)
+with the pipelined flow (send every transaction back to back using the local
+nonce manager, then wait for all receipts).
+"""
+
+import argparse
+import os
+import random
+import sys
+import time
+
+# Add root directory to sys.path to import modules from app
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app.services.blockchain import BlockchainService
+
+
+def make_reading(farm_id):
+    """Generate one random sensor reading"""
+    return {
+        "farm_id": farm_id,
+        "temperature": round(random.uniform(20, 35), 2),
+        "humidity": random.randint(30, 90),
+        "water_level": random.randint(20, 100),
+        "light_level": random.randint(200, 800),
+        "product_id": "BENCH-PRODUCT",
+    }
+
+
+def run_sequential(service, readings):
+    """Send readings one by one, waiting for each receipt"""
+    start = time.perf_counter()
+    stored = 0
+    for reading in readings:
+        if service.store_sensor_data(reading["farm_id"], reading):
+            stored += 1
+    return stored, time.perf_counter() - start
+
+
+def run_pipelined(service, readings):
+    """Send all readings back to back, then wait for the receipts"""
+    start = time.perf_counter()
+    tx_hashes = [
+        service.submit_sensor_data(reading["farm_id"], reading) for reading in readings
+    ]
+    receipts = service.wait_for_receipts(tx_hashes)
+    stored = sum(1 for receipt in receipts if receipt and receipt["status"] == 1)
+    return stored, time.perf_counter() - start
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Sensor data ingestion benchmark")
+    parser.add_argument("--count", type=int, default=50, help="Readings per run")
+    parser.add_argument("--farm-id", default="bench-farm", help="Farm ID to write to")
+    args = parser.parse_args()
+
+    service = BlockchainService()
+    if not getattr(service, "initialized", False):
+        print("❌ Blockchain not initialized, is the node running?")
+        sys.exit(1)
+
+    for name, runner in (("sequential", run_sequential), ("pipelined", run_pipelined)):
+        readings = [make_reading(args.farm_id) for _ in range(args.count)]
+        stored, elapsed = runner(service, readings)
+        rate = stored / elapsed if elapsed else 0
+        print(f"{name:>10}: {stored}/{args.count} readings in {elapsed:.2f}s ({rate:.1f} readings/s)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,200 @@
+"""Seed farm_reports with synthetic rows and check the plans of its hot queries.
+
+Usage:
+    python scripts/benchmark_report_queries.py [--rows 2000000] [--farms 500] [--products 50] [--keep]
+
+Inserts the rows (ids prefixed with "bench-") into the configured database,
+runs EXPLAIN on the farm, product, latest-report, cursor page and rollup
+queries and times them. Exits with status 1 when a plan does not use the
+expected index or falls back to a full table scan. Seeded rows are deleted
+afterwards unless --keep is given, so point DATABASE_URL at a scratch database.
+"""
+
+import argparse
+import os
+import random
+import sys
+import time
+from datetime import datetime, timedelta
+
+from sqlalchemy import delete, select
+
+# Add root directory to sys.path to import modules from app
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app.model.farm_data import FarmReport
+from app.services.database import engine
+from app.services.farm_report_service import REPORT_CURSOR_COLUMNS, latest_reports_query
+from app.services.pagination import encode_cursor, keyset_select
+from app.services.rollup_service import rollup_batch_query
+
+ID_PREFIX = "bench-"
+SEED_CHUNK = 10000
+
+
+def farm_id(n):
+    return f"{ID_PREFIX}farm-{n}"
+
+
+def product_id(n):
+    return f"{ID_PREFIX}product-{n}"
+
+
+def seed(rows, farms, products):
+    """Insert synthetic reports spread over the last year, in chunks"""
+    start = time.perf_counter()
+    now = datetime.now()
+    table = FarmReport.__table__
+    with engine.begin() as conn:
+        for offset in range(0, rows, SEED_CHUNK):
+            conn.execute(
+                table.insert(),
+                [
+                    {
+                        "id": f"{ID_PREFIX}{n:010d}",
+                        "farm_id": farm_id(n % farms),
+                        "product_id": product_id(random.randrange(products)),
+                        "temperature": round(random.uniform(20, 35), 2),
+                        "humidity": random.randint(30, 90),
+                        "water_level": random.randint(20, 100),
+                        "light_level": random.randint(200, 800),
+                        "created_at": now - timedelta(seconds=random.randrange(365 * 86400)),
+                    }
+                    for n in range(offset, min(offset + SEED_CHUNK, rows))
+                ],
+            )
+        # Fresh statistics, so the optimizer sees the real cardinalities
+        conn.exec_driver_sql("ANALYZE TABLE farm_reports")
+    print(f"Seeded {rows} rows in {time.perf_counter() - start:.1f}s")
+
+
+def cleanup():
+    start = time.perf_counter()
+    with engine.begin() as conn:
+        conn.execute(delete(FarmReport).where(FarmReport.id.startswith(ID_PREFIX)))
+    print(f"Removed seeded rows in {time.perf_counter() - start:.1f}s")
+
+
+def hot_queries(farms):
+    """(name, statement, expected index) of the queries the routes run"""
+    farm = farm_id(random.randrange(farms))
+    product = product_id(0)
+    now = datetime.now()
+    # Cursor of a page in the middle of the seeded year
+    cursor = encode_cursor(
+        FarmReport(id=ID_PREFIX, created_at=now - timedelta(days=180)), REPORT_CURSOR_COLUMNS
+    )
+    return [
+        (
+            "reports by farm, newest first",
+            select(FarmReport)
+            .where(FarmReport.farm_id == farm)
+            .order_by(FarmReport.created_at.desc())
+            .limit(100),
+            "ix_farm_reports_farm_id_created_at",
+        ),
+        (
+            "reports by product, newest first",
+            select(FarmReport)
+            .where(FarmReport.product_id == product)
+            .order_by(FarmReport.created_at.desc())
+            .limit(100),
+            "ix_farm_reports_product_id_created_at",
+        ),
+        (
+            "reports by farm and product, newest first",
+            select(FarmReport)
+            .where(FarmReport.farm_id == farm, FarmReport.product_id == product)
+            .order_by(FarmReport.created_at.desc())
+            .limit(100),
+            "ix_farm_reports_farm_id_product_id_created_at",
+        ),
+        (
+            "latest report of 20 farms",
+            latest_reports_query([farm_id(n) for n in range(min(farms, 20))]),
+            "ix_farm_reports_farm_id_created_at",
+        ),
+        (
+            "report cursor page",
+            keyset_select(select(FarmReport), REPORT_CURSOR_COLUMNS, cursor, 100),
+            "ix_farm_reports_created_at",
+        ),
+        (
+            "report cursor page of a farm",
+            keyset_select(
+                select(FarmReport).where(FarmReport.farm_id == farm),
+                REPORT_CURSOR_COLUMNS,
+                cursor,
+                100,
+            ),
+            "ix_farm_reports_farm_id_created_at",
+        ),
+        (
+            "rollup batch past a watermark",
+            rollup_batch_query(
+                now - timedelta(days=180), ID_PREFIX, now - timedelta(minutes=1), 5000
+            ),
+            "ix_farm_reports_created_at",
+        ),
+    ]
+
+
+def check_plan(conn, statement, expected):
+    """Return the EXPLAIN rows of farm_reports and whether they all use an index"""
+    compiled = statement.compile(
+        dialect=engine.dialect, compile_kwargs={"literal_binds": True}
+    )
+    plan = conn.exec_driver_sql(f"EXPLAIN {compiled}").mappings().all()
+    rows = [row for row in plan if row["table"] == "farm_reports"]
+    ok = bool(rows) and all(
+        row["type"] != "ALL" and row["key"] is not None for row in rows
+    ) and any(row["key"] == expected for row in rows)
+    return rows, ok
+
+
+def run_checks(farms, repeat):
+    failures = 0
+    with engine.connect() as conn:
+        for name, statement, expected in hot_queries(farms):
+            rows, ok = check_plan(conn, statement, expected)
+            start = time.perf_counter()
+            for _ in range(repeat):
+                conn.execute(statement).all()
+            elapsed = (time.perf_counter() - start) / repeat * 1000
+
+            keys = ", ".join(f"{row['type']}:{row['key']}" for row in rows)
+            print(f"{'✅' if ok else '❌'} {name:<42} {elapsed:8.2f} ms  [{keys}]")
+            if not ok:
+                print(f"   expected index {expected}")
+                failures += 1
+    return failures
+
+
+def main():
+    parser = argparse.ArgumentParser(description="farm_reports index benchmark")
+    parser.add_argument("--rows", type=int, default=2000000, help="Reports to seed")
+    parser.add_argument("--farms", type=int, default=500, help="Distinct farms")
+    parser.add_argument("--products", type=int, default=50, help="Distinct products")
+    parser.add_argument("--repeat", type=int, default=20, help="Timed runs per query")
+    parser.add_argument(
+        "--no-seed", action="store_true", help="Reuse rows kept by an earlier --keep run"
+    )
+    parser.add_argument("--keep", action="store_true", help="Keep the seeded rows")
+    args = parser.parse_args()
+
+    if not args.no_seed:
+        seed(args.rows, args.farms, args.products)
+    try:
+        failures = run_checks(args.farms, args.repeat)
+    finally:
+        if not args.keep:
+            cleanup()
+
+    if failures:
+        print(f"❌ {failures} queries do not use their index")
+        sys.exit(1)
+    print("✅ All queries use their index")
+
+
+if __name__ == "__main__":
+    main()
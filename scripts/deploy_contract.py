@@ -38,9 +38,13 @@ def load_contract_data(json_path: str) -> tuple:
         contract_bytecode = contract_json["contracts"]["IoTStorage.sol"]["IoTStorage"][
             "evm"
         ]["bytecode"]["object"]
-        return contract_abi, contract_bytecode
     except Exception as e:
         raise ContractOperationError(f"Error reading contract file: {e}")
+    if not contract_bytecode:
+        raise ContractOperationError(
+            "Contract has no bytecode, run contract/compile_contract.py first"
+        )
+    return contract_abi, contract_bytecode
 
 
 def connect_web3(provider_url: str) -> Web3:
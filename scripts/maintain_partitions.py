@@ -0,0 +1,74 @@
+"""Create upcoming farm_reports partitions and expire the ones past retention.
+
+Usage:
+    python scripts/maintain_partitions.py [--months-ahead 3] [--retention-months 12] [--action archive|drop] [--dry-run]
+
+Defaults come from REPORT_PARTITION_MONTHS_AHEAD, REPORT_RETENTION_MONTHS and
+REPORT_RETENTION_ACTION. Meant to run from cron, for example once a day.
+"""
+
+import argparse
+import os
+import sys
+
+# Add root directory to sys.path to import modules from app
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app.config import (
+    REPORT_PARTITION_MONTHS_AHEAD,
+    REPORT_RETENTION_ACTION,
+    REPORT_RETENTION_MONTHS,
+)
+from app.services.partition_service import RETENTION_ACTIONS, ReportPartitionService
+
+
+def main():
+    parser = argparse.ArgumentParser(description="farm_reports partition maintenance")
+    parser.add_argument(
+        "--months-ahead",
+        type=int,
+        default=REPORT_PARTITION_MONTHS_AHEAD,
+        help="Months to keep partitioned ahead of the current one",
+    )
+    parser.add_argument(
+        "--retention-months",
+        type=int,
+        default=REPORT_RETENTION_MONTHS,
+        help="Months kept besides the current one, 0 keeps everything",
+    )
+    parser.add_argument(
+        "--action",
+        choices=RETENTION_ACTIONS,
+        default=REPORT_RETENTION_ACTION,
+        help="What to do with expired partitions",
+    )
+    parser.add_argument(
+        "--dry-run", action="store_true", help="Print the statements without running them"
+    )
+    args = parser.parse_args()
+
+    try:
+        result = ReportPartitionService().run(
+            months_ahead=args.months_ahead,
+            retention_months=args.retention_months,
+            action=args.action,
+            dry_run=args.dry_run,
+        )
+    except Exception as e:
+        print(f"❌ Partition maintenance failed: {str(e)}")
+        sys.exit(1)
+
+    if args.dry_run:
+        for statement in result["statements"]:
+            print(statement)
+    print(f"✅ Created partitions: {', '.join(result['created']) or 'none'}")
+    print(
+        f"✅ Expired partitions: {', '.join(result['expired']) or 'none'}"
+        f" ({result['expired_rows']} rows, action {args.action})"
+    )
+    if result["archive_tables"]:
+        print(f"   Archived into: {', '.join(result['archive_tables'])}")
+
+
+if __name__ == "__main__":
+    main()
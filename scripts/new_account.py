@@ -1,3 +1,4 @@
+import argparse
 import json
 import os
 from os import path
@@ -5,34 +6,75 @@ from os import path
 from eth_account import Account
 
 base_dir = os.path.abspath(os.path.dirname(__file__))
-# Create new account
-acct = Account.create()
-
-# Encrypt private key with password "123456" in keystore format (V3)
 PASSWORD = "123456"
-encrypted = Account.encrypt(acct.key, PASSWORD)
 
-# write password to file
-with open(path.join(base_dir, "../scripts/password.txt"), "w") as f:
-    f.write(PASSWORD)
 
-# Write file keystore (JSON)
-with open(path.join(base_dir, "../scripts/keystore.json"), "w") as f:
-    json.dump(encrypted, f, indent=4)
+def create_main_account():
+    """Create the deployer / EthSigner account and its key files"""
+    # Create new account
+    acct = Account.create()
+
+    # Encrypt private key with password "123456" in keystore format (V3)
+    encrypted = Account.encrypt(acct.key, PASSWORD)
+
+    # write password to file
+    with open(path.join(base_dir, "../scripts/password.txt"), "w") as f:
+        f.write(PASSWORD)
+
+    # Write file keystore (JSON)
+    with open(path.join(base_dir, "../scripts/keystore.json"), "w") as f:
+        json.dump(encrypted, f, indent=4)
+
+    # Write file containing private key in hex format (plain text)
+    with open(path.join(base_dir, "../scripts/besu_key.txt"), "w") as f2:
+        f2.write(acct.key.hex())
+
+    with open(path.join(base_dir, "../scripts/account_info.json"), "w") as f:
+        account = {
+            "address": acct.address,
+            "private_key": acct.key.hex(),
+            "password": PASSWORD,
+        }
+        json.dump(account, f, indent=4)
+
+    print("Account info has been created successfully.")
+    print(f"Account Address: {acct.address}")
+    print(f"Private Key: {acct.key.hex()}")
+
+
+def create_signer_pool(count):
+    """Create count signing accounts used by BlockchainService to spread farms"""
+    accounts = []
+    for _ in range(count):
+        acct = Account.create()
+        accounts.append(
+            {
+                "address": acct.address,
+                "private_key": acct.key.hex(),
+                "password": PASSWORD,
+            }
+        )
+
+    with open(path.join(base_dir, "../scripts/accounts.json"), "w") as f:
+        json.dump(accounts, f, indent=4)
 
-# Write file containing private key in hex format (plain text)
-with open(path.join(base_dir, "../scripts/besu_key.txt"), "w") as f2:
-    f2.write(acct.key.hex())
+    print(f"{count} signing accounts have been created successfully.")
+    for account in accounts:
+        print(f"Account Address: {account['address']}")
 
 
-with open(path.join(base_dir, "../scripts/account_info.json"), "w") as f:
-    account = {
-        "address": acct.address,
-        "private_key": acct.key.hex(),
-        "password": PASSWORD,
-    }
-    json.dump(account, f, indent=4)
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Create blockchain accounts")
+    parser.add_argument(
+        "--count",
+        type=int,
+        default=0,
+        help="Create a pool of N signing accounts in scripts/accounts.json "
+        "instead of the main account",
+    )
+    args = parser.parse_args()
 
-print("Account info has been created successfully.")
-print(f"Account Address: {acct.address}")
-print(f"Private Key: {acct.key.hex()}")
+    if args.count > 0:
+        create_signer_pool(args.count)
+    else:
+        create_main_account()
@@ -0,0 +1,68 @@
+"""Compare farm_reports in MySQL with the on-chain history of every farm.
+
+Usage:
+    python scripts/reconcile.py [--farm-id FARM ...] [--workers 8] [--repair] [--output report.json]
+
+Exits with status 1 when drift was found (and not repaired) or a farm failed,
+so it can run from cron as a nightly check.
+"""
+
+import argparse
+import json
+import os
+import sys
+
+# Add root directory to sys.path to import modules from app
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app.config import RECONCILE_WORKERS
+from app.services.blockchain import BlockchainService
+from app.services.reconciliation_service import ReconciliationService
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Chain vs database reconciliation")
+    parser.add_argument(
+        "--farm-id", action="append", dest="farm_ids", help="Farm to check, repeatable (default: all)"
+    )
+    parser.add_argument(
+        "--workers", type=int, default=RECONCILE_WORKERS, help="Farms reconciled in parallel"
+    )
+    parser.add_argument(
+        "--repair", action="store_true", help="Copy missing readings to the other side"
+    )
+    parser.add_argument("--output", help="Write the full JSON report to this file")
+    args = parser.parse_args()
+
+    if not getattr(BlockchainService(), "initialized", False):
+        print("❌ Blockchain not initialized, is the node running?")
+        sys.exit(1)
+
+    report = ReconciliationService().run(args.farm_ids, args.repair, args.workers)
+
+    print(
+        f"Checked {report['farms_checked']} farms in {report['duration_seconds']}s: "
+        f"{report['farms_with_drift']} with drift, {report['farms_failed']} failed, "
+        f"{report['missing_on_chain']} readings missing on chain, "
+        f"{report['missing_in_db']} missing in the database"
+    )
+    for farm in report["farms"]:
+        line = f"  {farm['farm_id']}: {farm['status']}"
+        if farm["status"] == "error":
+            line += f" ({farm['error']})"
+        else:
+            line += f" missing_on_chain={farm['missing_on_chain']} missing_in_db={farm['missing_in_db']}"
+        if "repaired" in farm:
+            line += f" repaired={farm['repaired']}"
+        print(line)
+
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump(report, f, indent=4)
+
+    if report["farms_failed"] or (report["farms_with_drift"] and not args.repair):
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,51 @@
+"""Append sensor history to the columnar .npz snapshot under SNAPSHOT_DIR.
+
+Usage:
+    python scripts/snapshot.py [--source chain|reports] [--farm-id FARM ...]
+
+Each run only writes what was stored since the previous one. Load a farm's
+data with numpy, e.g.:
+    parts = sorted(glob.glob("data/snapshots/chain/farm=F1/month=*/part-*.npz"))
+    temperature = np.concatenate([np.load(p)["temperature"] for p in parts])
+"""
+
+import argparse
+import os
+import sys
+
+# Add root directory to sys.path to import modules from app
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app.config import SNAPSHOT_DIR
+from app.services.blockchain import BlockchainService
+from app.services.snapshot_service import SNAPSHOT_SOURCES, SnapshotService
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Columnar snapshot of sensor history")
+    parser.add_argument(
+        "--source", choices=SNAPSHOT_SOURCES, default="chain", help="History to snapshot"
+    )
+    parser.add_argument(
+        "--farm-id", action="append", dest="farm_ids", help="Farm to snapshot, repeatable (default: all)"
+    )
+    args = parser.parse_args()
+
+    if args.source == "chain" and not getattr(BlockchainService(), "initialized", False):
+        print("❌ Blockchain not initialized, is the node running?")
+        sys.exit(1)
+
+    result = SnapshotService().run(args.source, args.farm_ids)
+
+    failed = False
+    for farm_id, rows in result["rows_written"].items():
+        print(f"  {farm_id}: {rows}")
+        failed = failed or isinstance(rows, str)
+    print(f"Snapshot written to {os.path.join(SNAPSHOT_DIR, args.source)}")
+
+    if failed:
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,12 @@
+from app.services.chain_index_service import INDEX_UNAVAILABLE, read_chain_index
+
+
+def test_read_chain_index_returns_the_query_result():
+    assert read_chain_index(lambda db, farm_id: [farm_id], "farm-1") == ["farm-1"]
+
+
+def test_read_chain_index_reports_a_failing_database():
+    def query(db):
+        raise ConnectionError("MySQL server has gone away")
+
+    assert read_chain_index(query) is INDEX_UNAVAILABLE
@@ -0,0 +1,36 @@
+import json
+import re
+from pathlib import Path
+
+CONTRACT_DIR = Path(__file__).resolve().parent.parent / "contract"
+
+
+def _abi():
+    artifact = json.loads((CONTRACT_DIR / "IoTStorage.json").read_text())
+    return artifact["contracts"]["IoTStorage.sol"]["IoTStorage"]["abi"]
+
+
+def _source():
+    return (CONTRACT_DIR / "IoTStorage.sol").read_text()
+
+
+def test_abi_lists_every_external_function_and_public_variable():
+    source = _source()
+    functions = set(re.findall(r"function\s+([A-Za-z]\w*)\s*\(", source))
+    functions = {name for name in functions if not name.startswith("_")}
+    functions |= set(re.findall(r"\bpublic\s+(\w+)\s*;", source))
+
+    abi_functions = {item["name"] for item in _abi() if item["type"] == "function"}
+    assert abi_functions == functions
+
+
+def test_abi_lists_every_event():
+    events = set(re.findall(r"event\s+(\w+)\s*\(", _source()))
+    assert {item["name"] for item in _abi() if item["type"] == "event"} == events
+
+
+def test_store_data_takes_bytes32_ids_and_packed_fields():
+    store_data = next(item for item in _abi() if item.get("name") == "storeData")
+    assert [arg["type"] for arg in store_data["inputs"]] == [
+        "bytes32", "uint32", "uint16", "uint32", "bytes32", "uint32"
+    ]
@@ -0,0 +1,81 @@
+from types import SimpleNamespace
+
+import pytest
+from eth_utils import keccak
+
+from app.services.merkle_service import (
+    LEAF_PREFIX,
+    NODE_PREFIX,
+    build_tree,
+    get_proof,
+    hash_report,
+    verify_proof,
+)
+
+
+def report(report_id="r-1", farm_id="farm-1", product_id="p-1", temperature=25.5):
+    return SimpleNamespace(
+        id=report_id,
+        farm_id=farm_id,
+        product_id=product_id,
+        temperature=temperature,
+        humidity=60.0,
+        water_level=40.0,
+        light_level=500.0,
+    )
+
+
+def leaves(count):
+    return [hash_report(report(report_id=f"r-{n}")) for n in range(count)]
+
+
+@pytest.mark.parametrize("count", [1, 2, 3, 5, 8, 13])
+def test_every_leaf_proves_against_the_root(count):
+    leaf_hashes = leaves(count)
+    levels = build_tree(leaf_hashes)
+    root = "0x" + levels[-1][0].hex()
+
+    for index, leaf_hash in enumerate(leaf_hashes):
+        assert verify_proof(leaf_hash, get_proof(levels, index), root)
+
+
+def test_proof_fails_for_another_leaf_or_root():
+    leaf_hashes = leaves(4)
+    levels = build_tree(leaf_hashes)
+    root = "0x" + levels[-1][0].hex()
+    proof = get_proof(levels, 0)
+
+    assert not verify_proof(leaf_hashes[1], proof, root)
+    assert not verify_proof(leaf_hashes[0], proof, "0x" + "00" * 32)
+
+
+def test_leaf_and_node_hashes_are_domain_separated():
+    leaf_hashes = leaves(2)
+    node = build_tree(leaf_hashes)[1][0]
+    pair = b"".join(sorted(bytes.fromhex(leaf[2:]) for leaf in leaf_hashes))
+
+    # The bytes under an internal node, hashed the way a leaf is, give another hash
+    assert keccak(LEAF_PREFIX + pair) != node
+    assert keccak(NODE_PREFIX + pair) == node
+
+
+def test_version_1_trees_still_verify():
+    leaf_hashes = leaves(3)
+    levels = build_tree(leaf_hashes, version=1)
+    root = "0x" + levels[-1][0].hex()
+    left, right = sorted(bytes.fromhex(leaf[2:]) for leaf in leaf_hashes[:2])
+    assert levels[1][0] == keccak(left + right)
+
+    assert verify_proof(leaf_hashes[2], get_proof(levels, 2), root, version=1)
+    assert not verify_proof(leaf_hashes[2], get_proof(levels, 2), root)
+
+
+def test_separator_in_ids_does_not_collide():
+    assert hash_report(report(report_id="a|b", farm_id="c")) != hash_report(
+        report(report_id="a", farm_id="b|c")
+    )
+
+
+def test_metric_precision_is_hundredths():
+    assert hash_report(report(temperature=25.501)) == hash_report(report(temperature=25.5))
+    assert hash_report(report(temperature=25.51)) != hash_report(report(temperature=25.5))
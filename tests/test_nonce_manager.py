@@ -0,0 +1,63 @@
+from app.services.nonce_manager import NonceManager
+
+
+class FakeEth:
+    def __init__(self, pending):
+        self.pending = pending
+        self.calls = 0
+
+    def get_transaction_count(self, address, block_identifier):
+        assert block_identifier == "pending"
+        self.calls += 1
+        return self.pending
+
+
+class FakeWeb3:
+    def __init__(self, pending):
+        self.eth = FakeEth(pending)
+
+
+def test_allocate_seeds_once_then_counts_locally():
+    web3 = FakeWeb3(7)
+    manager = NonceManager("0xabc")
+
+    assert [manager.allocate(web3) for _ in range(3)] == [7, 8, 9]
+    assert web3.eth.calls == 1
+
+
+def test_for_address_shares_one_manager_per_account():
+    assert NonceManager.for_address("0x1") is NonceManager.for_address("0x1")
+    assert NonceManager.for_address("0x1") is not NonceManager.for_address("0x2")
+
+
+def test_resync_without_sends_in_flight_rereads_the_node():
+    web3 = FakeWeb3(3)
+    manager = NonceManager("0xabc")
+    manager.allocate(web3)
+    manager.release()
+
+    web3.eth.pending = 10
+    manager.resync()
+
+    assert manager.allocate(web3) == 10
+
+
+def test_resync_waits_for_sends_in_flight():
+    web3 = FakeWeb3(0)
+    manager = NonceManager("0xabc")
+    first = manager.allocate(web3)
+    second = manager.allocate(web3)
+
+    # The first send failed, the second one is still on its way to the node
+    manager.resync()
+    manager.release()
+    web3.eth.pending = 0
+
+    # Re-reading now would hand out nonce 0 or 1 again
+    third = manager.allocate(web3)
+    assert len({first, second, third}) == 3
+
+    manager.release()
+    manager.release()
+    web3.eth.pending = 1
+    assert manager.allocate(web3) == 1
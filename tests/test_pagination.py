@@ -0,0 +1,74 @@
+from datetime import datetime
+from types import SimpleNamespace
+
+import pytest
+from sqlalchemy import select
+from sqlalchemy.dialects import mysql
+
+from app.model.farm_data import FarmReport
+from app.services.pagination import (
+    InvalidCursor,
+    decode_cursor,
+    encode_cursor,
+    keyset_page,
+    keyset_select,
+)
+
+TABLE = FarmReport.__table__
+COLUMNS = (TABLE.c.created_at, TABLE.c.id)
+
+
+def item(n):
+    return SimpleNamespace(created_at=datetime(2026, 10, 18, 12, 0, n, 250), id=f"report-{n}")
+
+
+def test_cursor_round_trip():
+    token = encode_cursor(item(7), COLUMNS)
+    assert "=" not in token
+    assert decode_cursor(token, COLUMNS) == [item(7).created_at, "report-7"]
+
+
+@pytest.mark.parametrize(
+    "token",
+    [
+        "not base64!",
+        "bm90IGpzb24",  # "not json"
+        "eyJhIjoxfQ",  # {"a":1}
+        "WyIyMDI2LTEwLTE4Il0",  # ["2026-10-18"], one value for two columns
+        "WyJub3QgYSBkYXRlIiwieCJd",  # ["not a date","x"]
+    ],
+)
+def test_decode_rejects_foreign_tokens(token):
+    with pytest.raises(InvalidCursor):
+        decode_cursor(token, COLUMNS)
+
+
+def test_page_without_more_rows_has_no_cursor():
+    items, cursor = keyset_page([item(1), item(2)], COLUMNS, 2)
+    assert [i.id for i in items] == ["report-1", "report-2"]
+    assert cursor is None
+
+
+def test_page_with_extra_row_points_at_last_item():
+    items, cursor = keyset_page([item(1), item(2), item(3)], COLUMNS, 2)
+    assert [i.id for i in items] == ["report-1", "report-2"]
+    assert decode_cursor(cursor, COLUMNS) == [item(2).created_at, "report-2"]
+
+
+def test_keyset_select_spells_out_the_row_comparison():
+    cursor = encode_cursor(item(5), COLUMNS)
+    sql = str(
+        keyset_select(select(TABLE), COLUMNS, cursor, 10).compile(dialect=mysql.dialect())
+    )
+    where = sql.split("WHERE")[1]
+    assert (
+        "farm_reports.created_at > %s "
+        "OR farm_reports.created_at = %s AND farm_reports.id > %s"
+    ) in where
+    assert "ORDER BY farm_reports.created_at, farm_reports.id" in sql
+    assert sql.rstrip().endswith("LIMIT %s")
+
+
+def test_keyset_select_first_page_has_no_filter():
+    sql = str(keyset_select(select(TABLE), COLUMNS, None, 10).compile(dialect=mysql.dialect()))
+    assert "WHERE" not in sql
@@ -0,0 +1,116 @@
+from datetime import date
+
+import pytest
+
+from app.services.partition_service import (
+    ReportPartitionService,
+    add_months,
+    partition_clause,
+)
+
+
+class FakeResult:
+    def __init__(self, row):
+        self.row = row
+
+    def first(self):
+        return self.row
+
+
+class FakeConn:
+    """Answers the archive checks from a table state: None, "partitioned" or row counts"""
+
+    def __init__(self, archive=None, archive_rows=0, partition_rows=0):
+        self.archive = archive
+        self.archive_rows = archive_rows
+        self.partition_rows = partition_rows
+
+    def exec_driver_sql(self, sql, params=None):
+        if "information_schema" in sql:
+            if self.archive is None:
+                return FakeResult(None)
+            return FakeResult(("p0" if self.archive == "partitioned" else None,))
+        if "PARTITION (" in sql:
+            return FakeResult((1,) if self.partition_rows else None)
+        return FakeResult((1,) if self.archive_rows else None)
+
+
+def partition(month, rows=0):
+    return {"name": f"p{month:%Y%m}", "upper_bound": add_months(month, 1), "rows": rows}
+
+
+def test_add_months_crosses_years():
+    assert add_months(date(2026, 11, 1), 3) == date(2027, 2, 1)
+    assert add_months(date(2026, 1, 1), -1) == date(2025, 12, 1)
+    assert add_months(date(2026, 1, 1), -13) == date(2024, 12, 1)
+
+
+def test_partition_clause_bounds_by_next_month():
+    assert partition_clause(date(2026, 12, 1)) == (
+        "PARTITION p202612 VALUES LESS THAN ('2027-01-01')"
+    )
+
+
+def test_plan_creates_from_highest_bound():
+    partitions = [partition(date(2026, 9, 1)), partition(date(2026, 10, 1))]
+    partitions.append({"name": "pmax", "upper_bound": None, "rows": 0})
+    create, expire = ReportPartitionService.plan(partitions, date(2026, 10, 18), 2, 0)
+    assert create == [date(2026, 11, 1), date(2026, 12, 1)]
+    assert expire == []
+
+
+def test_plan_is_empty_when_ahead():
+    partitions = [partition(date(2026, 10, 1)), partition(date(2026, 11, 1))]
+    create, _ = ReportPartitionService.plan(partitions, date(2026, 10, 18), 1, 0)
+    assert create == []
+
+
+def test_plan_expires_past_retention():
+    partitions = [partition(date(2026, m, 1)) for m in range(1, 11)]
+    _, expire = ReportPartitionService.plan(partitions, date(2026, 10, 18), 0, 6)
+    assert [p["name"] for p in expire] == ["p202601", "p202602", "p202603"]
+
+
+def test_archive_from_scratch():
+    statements = ReportPartitionService.archive_statements(
+        FakeConn(), "p202601", "farm_reports_archive_202601"
+    )
+    assert [s.split(" farm_reports")[0] for s in statements] == [
+        "CREATE TABLE IF NOT EXISTS",
+        "ALTER TABLE",
+        "ALTER TABLE",
+    ]
+    assert "REMOVE PARTITIONING" in statements[1]
+    assert "EXCHANGE PARTITION p202601" in statements[2]
+
+
+def test_archive_rerun_after_create():
+    statements = ReportPartitionService.archive_statements(
+        FakeConn(archive="partitioned"), "p202601", "farm_reports_archive_202601"
+    )
+    assert len(statements) == 2
+    assert "REMOVE PARTITIONING" in statements[0]
+
+
+def test_archive_rerun_after_remove_partitioning():
+    statements = ReportPartitionService.archive_statements(
+        FakeConn(archive="plain"), "p202601", "farm_reports_archive_202601"
+    )
+    assert len(statements) == 1
+    assert "EXCHANGE PARTITION" in statements[0]
+
+
+def test_archive_rerun_after_exchange_does_not_swap_back():
+    statements = ReportPartitionService.archive_statements(
+        FakeConn(archive="plain", archive_rows=5), "p202601", "farm_reports_archive_202601"
+    )
+    assert statements == []
+
+
+def test_archive_refuses_when_both_hold_rows():
+    with pytest.raises(RuntimeError):
+        ReportPartitionService.archive_statements(
+            FakeConn(archive="plain", archive_rows=5, partition_rows=3),
+            "p202601",
+            "farm_reports_archive_202601",
+        )
@@ -0,0 +1,41 @@
+from collections import Counter
+
+from app.services.reconciliation_service import diff_readings, report_key
+
+KEY = report_key("p-1", 2550, 60, 40, 500)
+OTHER = report_key("p-1", 2600, 60, 40, 500)
+
+
+def test_report_key_normalizes_both_sides_alike():
+    # farm_reports stores floats and may lack a product, the chain stores ints and ""
+    assert report_key(None, 2550, 60.0, 40.0, 500.0) == report_key("", 2550, 60, 40, 500)
+    assert report_key("p-1", 2550, "60", 40, 500) == KEY
+
+
+def test_matching_histories_have_no_drift():
+    assert diff_readings({KEY: ["r-1", "r-2"]}, Counter(), Counter({KEY: 2}), Counter()) == (
+        [],
+        [],
+    )
+
+
+def test_surplus_on_either_side_is_reported():
+    missing_on_chain, missing_in_db = diff_readings(
+        {KEY: ["r-1", "r-2"]}, Counter(), Counter({KEY: 1, OTHER: 1}), Counter()
+    )
+    assert missing_on_chain == ["r-2"]
+    assert missing_in_db == [OTHER]
+
+
+def test_report_stamped_after_the_cutoff_still_matches_its_reading():
+    # Written to the database after the receipt, the report is past the cutoff
+    assert diff_readings({}, Counter({KEY: 1}), Counter({KEY: 1}), Counter()) == ([], [])
+
+
+def test_block_stamped_after_the_cutoff_still_matches_its_report():
+    # Queued before the transaction was mined, the block is past the cutoff
+    assert diff_readings({KEY: ["r-1"]}, Counter(), Counter(), Counter({KEY: 1})) == ([], [])
+
+
+def test_late_readings_are_not_checked_themselves():
+    assert diff_readings({}, Counter({KEY: 1}), Counter(), Counter({OTHER: 1})) == ([], [])
@@ -0,0 +1,81 @@
+from datetime import datetime
+from types import SimpleNamespace
+
+import pytest
+
+from app.services.rollup_service import ROLLUP_METRICS, _fold, bucket_start, format_rollup
+
+MOMENT = datetime(2026, 10, 18, 14, 37, 12, 345678)
+
+
+def report(temperature, humidity, water_level, light_level):
+    return SimpleNamespace(
+        temperature=temperature,
+        humidity=humidity,
+        water_level=water_level,
+        light_level=light_level,
+    )
+
+
+def empty_rollup():
+    return SimpleNamespace(bucket_start=bucket_start(MOMENT, "hour"), count=0)
+
+
+def test_bucket_start_hour_and_day():
+    assert bucket_start(MOMENT, "hour") == datetime(2026, 10, 18, 14)
+    assert bucket_start(MOMENT, "day") == datetime(2026, 10, 18)
+
+
+def test_bucket_start_rejects_unknown_granularity():
+    with pytest.raises(ValueError):
+        bucket_start(MOMENT, "week")
+
+
+def test_fold_first_report_sets_every_aggregate():
+    rollup = empty_rollup()
+    _fold(rollup, report(21.5, 40, 300, 800))
+    assert rollup.count == 1
+    assert (rollup.temperature_min, rollup.temperature_max, rollup.temperature_sum) == (
+        21.5,
+        21.5,
+        21.5,
+    )
+
+
+def test_fold_tracks_min_max_and_sum():
+    rollup = empty_rollup()
+    for values in [(20, 40, 300, 800), (25, 35, 310, 900), (18, 45, 290, 700)]:
+        _fold(rollup, report(*values))
+    assert rollup.count == 3
+    assert (rollup.temperature_min, rollup.temperature_max, rollup.temperature_sum) == (18, 25, 63)
+    assert (rollup.humidity_min, rollup.humidity_max, rollup.humidity_sum) == (35, 45, 120)
+
+
+def test_fold_order_does_not_matter():
+    readings = [report(n, 100 - n, n * 2, n * 3) for n in (5, 1, 9, 3)]
+    forward, backward = empty_rollup(), empty_rollup()
+    for reading in readings:
+        _fold(forward, reading)
+    for reading in reversed(readings):
+        _fold(backward, reading)
+    assert vars(forward) == vars(backward)
+
+
+def test_format_rollup_averages():
+    rollup = empty_rollup()
+    _fold(rollup, report(20, 40, 300, 800))
+    _fold(rollup, report(22, 50, 320, 600))
+    result = format_rollup(rollup)
+    assert result["bucket_start"] == "2026-10-18T14:00:00"
+    assert result["count"] == 2
+    assert set(ROLLUP_METRICS) <= set(result)
+    assert result["temperature"] == {"min": 20, "max": 22, "avg": 21}
+    assert result["light_level"] == {"min": 600, "max": 800, "avg": 700}
+
+
+def test_format_empty_rollup_has_no_average():
+    rollup = SimpleNamespace(bucket_start=MOMENT, count=0)
+    for metric in ROLLUP_METRICS:
+        for name in ("min", "max", "sum"):
+            setattr(rollup, f"{metric}_{name}", None)
+    assert format_rollup(rollup)["temperature"]["avg"] is None
@@ -0,0 +1,44 @@
+import pytest
+from eth_account import Account
+
+from app.services.signer_pool import SignerPool
+
+KEYS = ["0x" + f"{n:064x}" for n in range(1, 6)]
+FARMS = [f"farm-{n}" for n in range(200)]
+
+
+def test_needs_a_key():
+    with pytest.raises(ValueError):
+        SignerPool([])
+
+
+def test_single_account_takes_every_farm():
+    pool = SignerPool(KEYS[:1])
+    assert {pool.account_for(farm).address for farm in FARMS} == {pool.default_account.address}
+
+
+def test_farm_always_maps_to_the_same_account():
+    first, second = SignerPool(KEYS), SignerPool(list(reversed(KEYS)))
+    for farm in FARMS:
+        assert first.account_for(farm).address == second.account_for(farm).address
+
+
+def test_farms_spread_over_every_account():
+    pool = SignerPool(KEYS)
+    assigned = [pool.account_for(farm).address for farm in FARMS]
+    assert set(assigned) == {account.address for account in pool.accounts}
+
+
+def test_removing_an_account_only_moves_its_farms():
+    full, reduced = SignerPool(KEYS), SignerPool(KEYS[:-1])
+    removed = Account.from_key(KEYS[-1]).address
+    for farm in FARMS:
+        before = full.account_for(farm).address
+        if before != removed:
+            assert reduced.account_for(farm).address == before
+
+
+def test_nonce_lane_is_shared_per_account():
+    pool = SignerPool(KEYS)
+    account = pool.accounts[0]
+    assert pool.nonce_manager(account) is SignerPool(KEYS).nonce_manager(account)
@@ -0,0 +1,44 @@
+from app.services.snapshot_service import _month, split_parts
+
+JAN_31_LATE = 1769903999  # 2026-01-31 23:59:59 UTC
+FEB_1 = 1769904000  # 2026-02-01 00:00:00 UTC
+
+
+def rows_of(months):
+    return [{"n": n, "month": month} for n, month in enumerate(months)]
+
+
+def test_month_is_utc():
+    assert _month(JAN_31_LATE) == "2026-01"
+    assert _month(FEB_1) == "2026-02"
+
+
+def test_no_rows_no_parts():
+    assert list(split_parts([])) == []
+
+
+def test_parts_split_at_month_boundary():
+    rows = rows_of(["2026-01"] * 3 + ["2026-02"] * 2)
+    parts = list(split_parts(rows, part_rows=10))
+    assert [[row["month"] for row in part] for part in parts] == [
+        ["2026-01"] * 3,
+        ["2026-02"] * 2,
+    ]
+
+
+def test_parts_split_at_part_size():
+    rows = rows_of(["2026-01"] * 7)
+    parts = list(split_parts(rows, part_rows=3))
+    assert [len(part) for part in parts] == [3, 3, 1]
+    assert [row["n"] for part in parts for row in part] == list(range(7))
+
+
+def test_part_size_restarts_at_month_boundary():
+    rows = rows_of(["2026-01"] * 4 + ["2026-02"] * 4)
+    parts = list(split_parts(rows, part_rows=3))
+    assert [(part[0]["month"], len(part)) for part in parts] == [
+        ("2026-01", 3),
+        ("2026-01", 1),
+        ("2026-02", 3),
+        ("2026-02", 1),
+    ]